@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import psycopg
+
+from backend.common.config import settings
+from backend.common.db_ops import CHANGE_CHANNEL
+
+
+class _Entry:
+    __slots__ = ("payload", "etag", "expires_at", "generation")
+
+    def __init__(self, payload: Any, etag: str, expires_at: float, generation: int) -> None:
+        self.payload = payload
+        self.etag = etag
+        self.expires_at = expires_at
+        self.generation = generation
+
+
+def compute_etag(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return '"' + hashlib.sha1(raw).hexdigest() + '"'
+
+
+class ResponseCache:
+    """In-process cache for read endpoints.
+
+    Entries expire after their own TTL, or as soon as their namespace is
+    invalidated (trader tick commits bump the "ticks" namespace, settings
+    writes bump the "settings" namespace).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._generations: Dict[str, int] = {}
+        self._inflight: Dict[str, Tuple[int, "asyncio.Future[Tuple[Any, str]]"]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    async def get_or_compute(
+        self, namespace: str, key: str, ttl_sec: float, compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        full_key = self._key(namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generations.get(namespace, 0)
+            entry = self._entries.get(full_key)
+            if entry and entry.generation == generation and entry.expires_at > now:
+                self.hits += 1
+                return entry.payload, entry.etag
+            self.misses += 1
+            inflight = self._inflight.get(full_key)
+            if inflight is None or inflight[0] != generation:
+                task = asyncio.ensure_future(self._compute(namespace, full_key, ttl_sec, generation, compute))
+                inflight = (generation, task)
+                self._inflight[full_key] = inflight
+        # Concurrent misses for the same key share one DB round trip
+        return await asyncio.shield(inflight[1])
+
+    async def _compute(
+        self, namespace: str, full_key: str, ttl_sec: float, generation: int, compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        try:
+            payload = await compute()
+            etag = compute_etag(payload)
+            with self._lock:
+                # Only store if nothing invalidated the namespace while we were computing
+                if self._generations.get(namespace, 0) == generation and ttl_sec > 0:
+                    self._entries[full_key] = _Entry(payload, etag, time.monotonic() + ttl_sec, generation)
+            return payload, etag
+        finally:
+            with self._lock:
+                current = self._inflight.get(full_key)
+                if current is not None and current[0] == generation:
+                    del self._inflight[full_key]
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                for ns in list(self._generations.keys()):
+                    self._generations[ns] += 1
+                self._entries.clear()
+            else:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                prefix = f"{namespace}:"
+                for k in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[k]
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "listener_connected": _listener_state["connected"],
+            }
+
+
+_listener_state = {"connected": False}
+
+
+async def _listen_loop(cache: ResponseCache) -> None:
+    # LISTEN needs a dedicated session outside the pool; reconnect with backoff if it drops.
+    backoff = 1.0
+    while True:
+        try:
+            conn = await psycopg.AsyncConnection.connect(settings.database_url, autocommit=True)
+            async with conn:
+                await conn.execute(f"listen {CHANGE_CHANNEL}")
+                _listener_state["connected"] = True
+                backoff = 1.0
+                # Anything may have changed while we were disconnected
+                cache.invalidate("settings")
+                cache.invalidate("ticks")
+                async for notify in conn.notifies():
+                    # settings writes notify "settings:<mode>" from a trigger; /runs/latest embeds hold_hours
+                    if notify.payload.startswith("settings:"):
+                        cache.invalidate("settings")
+                    cache.invalidate("ticks")
+        except asyncio.CancelledError:
+            _listener_state["connected"] = False
+            raise
+        except Exception as exc:
+            print(f"[api] cache listener error: {exc}")
+        _listener_state["connected"] = False
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
+
+
+def start_change_listener(cache: ResponseCache) -> Optional["asyncio.Task[None]"]:
+    if not settings.database_url:
+        return None
+    return asyncio.create_task(_listen_loop(cache), name="cache-listener")
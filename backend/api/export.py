@@ -0,0 +1,220 @@
+from typing import AsyncIterator, Optional
+
+from psycopg import sql
+
+from backend.common.db import get_async_conn
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet export is optional
+    pa = None
+    pq = None
+
+
+# Column kinds drive the parquet casts; CSV goes through COPY unchanged.
+EXPORT_TABLES: dict[str, dict] = {
+    "runs": {
+        "ts_column": "start_ts",
+        "columns": [
+            ("run_id", "uuid"),
+            ("exchange", "text"),
+            ("mode", "text"),
+            ("entry_time_utc", "text"),
+            ("start_ts", "ts"),
+            ("end_ts", "ts"),
+            ("status", "text"),
+            ("strategy_tag", "text"),
+            ("num_legs", "int"),
+            ("margin_per_leg_usdt", "num"),
+            ("leverage", "num"),
+            ("max_pump_pct", "num"),
+            ("global_kill_dd_pct", "num"),
+            ("initial_balance", "num"),
+            ("current_balance", "num"),
+        ],
+    },
+    "legs": {
+        "ts_column": "entry_ts",
+        "columns": [
+            ("leg_id", "uuid"),
+            ("run_id", "uuid"),
+            ("symbol", "text"),
+            ("side", "text"),
+            ("entry_price", "num"),
+            ("entry_ts", "ts"),
+            ("qty", "num"),
+            ("exit_price", "num"),
+            ("exit_ts", "ts"),
+            ("exit_reason", "text"),
+            ("max_favorable_pnl_usdt", "num"),
+            ("max_adverse_pnl_usdt", "num"),
+            ("fees_usdt", "num"),
+            ("funding_usdt", "num"),
+            ("status", "text"),
+        ],
+    },
+    "snapshots": {
+        "ts_column": "ts",
+        "columns": [
+            ("ts", "ts"),
+            ("run_id", "uuid"),
+            ("exchange", "text"),
+            ("symbol", "text"),
+            ("price", "num"),
+            ("unrealized_pnl_usdt", "num"),
+            ("entry_price", "num"),
+            ("position_size", "num"),
+            ("margin_usdt", "num"),
+            ("leverage", "num"),
+            ("fees_usdt", "num"),
+            ("funding_usdt", "num"),
+        ],
+    },
+    "orders": {
+        "ts_column": "ts",
+        "columns": [
+            ("order_id", "uuid"),
+            ("run_id", "uuid"),
+            ("symbol", "text"),
+            ("side", "text"),
+            ("action", "text"),
+            ("intent_price", "num"),
+            ("fill_price", "num"),
+            ("qty", "num"),
+            ("status", "text"),
+            ("exchange_order_id", "text"),
+            ("ts", "ts"),
+        ],
+    },
+}
+
+_PARQUET_CASTS = {"uuid": "::text", "num": "::float8", "text": "::text", "int": "", "ts": ""}
+
+PARQUET_BATCH_ROWS = 50_000
+
+
+def build_export_query(
+    table: str,
+    parquet: bool,
+    run_id: Optional[str] = None,
+    mode: Optional[str] = None,
+    strategy: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> tuple[sql.Composed, list[object]]:
+    spec = EXPORT_TABLES[table]
+    select_items = []
+    for name, kind in spec["columns"]:
+        if parquet:
+            select_items.append(
+                sql.SQL("{}{} as {}").format(sql.Identifier(name), sql.SQL(_PARQUET_CASTS[kind]), sql.Identifier(name))
+            )
+        else:
+            select_items.append(sql.Identifier(name))
+
+    clauses: list[sql.Composable] = []
+    params: list[object] = []
+    if run_id:
+        clauses.append(sql.SQL("run_id = %s"))
+        params.append(run_id)
+    if mode or strategy:
+        run_clauses = []
+        if mode:
+            run_clauses.append("mode = %s")
+            params.append(mode)
+        if strategy:
+            run_clauses.append("lower(strategy_tag) = lower(%s)")
+            params.append(strategy)
+        run_where = " and ".join(run_clauses)
+        if table == "runs":
+            clauses.append(sql.SQL(run_where))
+        else:
+            clauses.append(sql.SQL(f"run_id in (select run_id from runs where {run_where})"))
+    ts_column = sql.Identifier(spec["ts_column"])
+    if date_from:
+        clauses.append(sql.SQL("{} >= %s").format(ts_column))
+        params.append(date_from)
+    if date_to:
+        clauses.append(sql.SQL("{} <= %s").format(ts_column))
+        params.append(date_to)
+
+    query = sql.SQL("select {} from {}").format(sql.SQL(", ").join(select_items), sql.Identifier(table))
+    if clauses:
+        query = query + sql.SQL(" where ") + sql.SQL(" and ").join(clauses)
+    query = query + sql.SQL(" order by {}").format(ts_column)
+    return query, params
+
+
+async def stream_csv(query: sql.Composed, params: list[object]) -> AsyncIterator[bytes]:
+    # COPY streams straight from Postgres; rows never become Python objects
+    copy_sql = sql.SQL("copy ({}) to stdout with (format csv, header)").format(query)
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            async with cur.copy(copy_sql, params) as copy:
+                async for chunk in copy:
+                    yield bytes(chunk)
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands back bytes as they are written."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Must be the absolute offset: parquet footers reference it
+        return self._pos
+
+    def flush(self) -> None:
+        return
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def _parquet_schema(table: str) -> "pa.Schema":
+    types = {
+        "uuid": pa.string(),
+        "text": pa.string(),
+        "num": pa.float64(),
+        "int": pa.int64(),
+        "ts": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_TABLES[table]["columns"]])
+
+
+async def stream_parquet(table: str, query: sql.Composed, params: list[object]) -> AsyncIterator[bytes]:
+    schema = _parquet_schema(table)
+    names = schema.names
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    async with get_async_conn() as conn:
+        # Named cursor = server-side cursor; only one batch is in memory at a time
+        async with conn.cursor(name=f"export_{table}") as cur:
+            await cur.execute(query, params)
+            while True:
+                rows = await cur.fetchmany(PARQUET_BATCH_ROWS)
+                if not rows:
+                    break
+                batch = pa.table({name: [r[i] for r in rows] for i, name in enumerate(names)}, schema=schema)
+                writer.write_table(batch)
+                yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    return pa is not None
@@ -0,0 +1,151 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from psycopg import sql
+
+
+# Newest-first keyset pages over (ts, id). Each filter is an equality the table's indexes lead
+# with ("run_id" on (run_id, ts), "type"/"level" on events, "mode" on runs) or a cheap residual
+# check on the few rows around the cursor; see migrations/0003_history_keyset.sql.
+HISTORY_TABLES: dict[str, dict] = {
+    "events": {
+        "ts_column": "ts",
+        "id_column": "event_id",
+        "filters": ("run_id", "type", "level", "symbol"),
+        "columns": [
+            ("event_id", "uuid"),
+            ("ts", "ts"),
+            ("level", "text"),
+            ("type", "text"),
+            ("message", "text"),
+            ("run_id", "uuid"),
+            ("symbol", "text"),
+        ],
+    },
+    "snapshots": {
+        "ts_column": "ts",
+        "id_column": "snapshot_id",
+        "filters": ("run_id", "symbol"),
+        "columns": [
+            ("snapshot_id", "uuid"),
+            ("ts", "ts"),
+            ("run_id", "uuid"),
+            ("exchange", "text"),
+            ("symbol", "text"),
+            ("price", "num"),
+            ("unrealized_pnl_usdt", "num"),
+            ("entry_price", "num"),
+            ("position_size", "num"),
+            ("margin_usdt", "num"),
+            ("leverage", "num"),
+            ("fees_usdt", "num"),
+            ("funding_usdt", "num"),
+        ],
+    },
+    "orders": {
+        "ts_column": "ts",
+        "id_column": "order_id",
+        "filters": ("run_id", "symbol", "status"),
+        "columns": [
+            ("order_id", "uuid"),
+            ("ts", "ts"),
+            ("run_id", "uuid"),
+            ("symbol", "text"),
+            ("side", "text"),
+            ("action", "text"),
+            ("intent_price", "num"),
+            ("fill_price", "num"),
+            ("qty", "num"),
+            ("status", "text"),
+            ("exchange_order_id", "text"),
+            ("client_oid", "text"),
+        ],
+    },
+    "runs": {
+        "ts_column": "start_ts",
+        "id_column": "run_id",
+        "filters": ("mode", "status"),
+        "columns": [
+            ("run_id", "uuid"),
+            ("start_ts", "ts"),
+            ("end_ts", "ts"),
+            ("exchange", "text"),
+            ("mode", "text"),
+            ("status", "text"),
+            ("strategy_tag", "text"),
+            ("num_legs", "int"),
+            ("margin_per_leg_usdt", "num"),
+            ("leverage", "num"),
+            ("initial_balance", "num"),
+            ("current_balance", "num"),
+        ],
+    },
+}
+
+_CASTS = {"uuid": "::text", "num": "::float8", "text": "", "int": "", "ts": "::text"}
+
+HISTORY_MAX_LIMIT = 500
+
+
+def encode_cursor(ts: str, row_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{ts}|{row_id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """(ts, id) of the last row of the previous page; ValueError if the cursor is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def build_page_query(
+    table: str,
+    filters: dict[str, Optional[str]],
+    cursor: Optional[tuple[datetime, uuid.UUID]],
+    limit: int,
+) -> tuple[sql.Composed, list[object]]:
+    """One page, newest first, of up to limit + 1 rows (the extra row only signals a next page)."""
+    spec = HISTORY_TABLES[table]
+    # Qualified, so "order by" sorts on the columns (and their indexes), not the text casts in the select list
+    ts_column = sql.Identifier(table, spec["ts_column"])
+    id_column = sql.Identifier(table, spec["id_column"])
+    select_items = [
+        sql.SQL("{}{} as {}").format(sql.Identifier(table, name), sql.SQL(_CASTS[kind]), sql.Identifier(name))
+        for name, kind in spec["columns"]
+    ]
+
+    clauses: list[sql.Composable] = []
+    params: list[object] = []
+    for name in spec["filters"]:
+        value = filters.get(name)
+        if value:
+            clauses.append(sql.SQL("{} = %s").format(sql.Identifier(table, name)))
+            params.append(value)
+    if cursor is not None:
+        # Row comparison: the planner turns it into an index range on ts, so a page deep in
+        # history costs the same as the first one (no OFFSET rescans); id breaks ts ties
+        clauses.append(sql.SQL("({}, {}) < (%s, %s)").format(ts_column, id_column))
+        params.extend(cursor)
+
+    query = sql.SQL("select {} from {}").format(sql.SQL(", ").join(select_items), sql.Identifier(table))
+    if clauses:
+        query = query + sql.SQL(" where ") + sql.SQL(" and ").join(clauses)
+    query = query + sql.SQL(" order by {} desc, {} desc limit %s").format(ts_column, id_column)
+    params.append(limit + 1)
+    return query, params
+
+
+def page_payload(table: str, rows: list[tuple], limit: int) -> dict:
+    spec = HISTORY_TABLES[table]
+    names = [name for name, _kind in spec["columns"]]
+    items = [dict(zip(names, row)) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last[spec["ts_column"]], last[spec["id_column"]])
+    return {table: items, "next_cursor": next_cursor}
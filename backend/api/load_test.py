@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+# Mirrors one dashboard poll plus the reports page
+DEFAULT_PATHS = [
+    "/dashboard?mode=paper",
+    "/reports/runs",
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def _client_loop(
+    client: httpx.AsyncClient, paths: list[str], deadline: float, results: dict[str, list[float]], errors: dict[str, int]
+) -> None:
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            resp = await client.get(path)
+            ok = resp.status_code in (200, 304)
+        except httpx.HTTPError:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        if ok:
+            results[path].append(elapsed_ms)
+        else:
+            errors[path] += 1
+
+
+async def run(base_url: str, clients: int, duration_sec: float, paths: list[str]) -> None:
+    results: dict[str, list[float]] = {p: [] for p in paths}
+    errors: dict[str, int] = {p: 0 for p in paths}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        deadline = time.perf_counter() + duration_sec
+        await asyncio.gather(*(_client_loop(client, paths, deadline, results, errors) for _ in range(clients)))
+
+    print(f"clients={clients} duration={duration_sec:.0f}s base_url={base_url}")
+    print(f"{'path':40} {'n':>7} {'err':>5} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    all_latencies: list[float] = []
+    for path in paths:
+        lat = results[path]
+        all_latencies.extend(lat)
+        mean = statistics.fmean(lat) if lat else 0.0
+        print(
+            f"{path:40} {len(lat):>7} {errors[path]:>5} "
+            f"{_percentile(lat, 50):>9.1f} {_percentile(lat, 99):>9.1f} {mean:>9.1f}"
+        )
+    total = len(all_latencies)
+    print(
+        f"{'ALL':40} {total:>7} {sum(errors.values()):>5} "
+        f"{_percentile(all_latencies, 50):>9.1f} {_percentile(all_latencies, 99):>9.1f} "
+        f"rps={total / duration_sec:.1f}"
+    )
+
+
+def main() -> None:
+    # Start the API against a local Postgres first, e.g.
+    #   DATABASE_URL=postgresql://localhost/scammer python backend/api/run_api.py
+    parser = argparse.ArgumentParser(description="Concurrent latency test for the API")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--path", action="append", dest="paths", help="endpoint to hit (repeatable)")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.clients, args.duration, args.paths or DEFAULT_PATHS))
+
+
+if __name__ == "__main__":
+    main()
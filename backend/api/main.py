@@ -1,15 +1,52 @@
+import asyncio
 import base64
 import os
-from fastapi import FastAPI, Header, HTTPException
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.common.db import get_conn
-from backend.common.config import RuntimeSettings, settings
-from backend.common.db_ops import get_settings, upsert_settings
-from backend.common.db_ops import get_legs
+from backend.api.cache import ResponseCache, start_change_listener
+from backend.api.export import EXPORT_TABLES, build_export_query, parquet_available, stream_csv, stream_parquet
+from backend.api.history import HISTORY_MAX_LIMIT, HISTORY_TABLES, build_page_query, decode_cursor, page_payload
+from backend.common.db import close_async_pool, get_async_conn, open_async_pool
+from backend.common.config import RuntimeSettings, parse_overrides, settings
+from backend.common.db_ops import REPORT_REFRESH_LOCK_KEY
+from backend.common.metrics import API_REQUEST_SECONDS, render as render_metrics
+from backend.common.time_utils import now_utc
+
+response_cache = ResponseCache()
+
+# Per-key TTLs (seconds). "ticks" entries are also dropped on every trader tick commit.
+CACHE_TTLS = {
+    "latest_run_id": settings.api_cache_ttl_sec,
+    "runs_latest": settings.api_cache_ttl_sec,
+    "positions_open": settings.api_cache_ttl_sec,
+    "legs": settings.api_cache_ttl_sec,
+    "snapshots_latest": settings.api_cache_ttl_sec,
+    "snapshots_series": settings.api_cache_ttl_sec,
+    "dashboard": settings.api_cache_ttl_sec,
+    "hold_hours": 3600.0,
+}
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if settings.database_url:
+        await open_async_pool()
+    listener = start_change_listener(response_cache)
+    try:
+        yield
+    finally:
+        if listener is not None:
+            listener.cancel()
+        await close_async_pool()
+
 
-app = FastAPI(title="The Scammer Short API")
+app = FastAPI(title="The Scammer Short API", lifespan=lifespan)
 
 # Allow local UI to call API
 app.add_middleware(
@@ -22,6 +59,21 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep cardinality bounded
+    route = request.scope.get("route")
+    API_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    return response
+
+
 def _require_settings_auth(authorization: str | None) -> None:
     user = os.getenv("SETTINGS_USER", "")
     pw = os.getenv("SETTINGS_PASS", "")
@@ -41,42 +93,153 @@ def _require_settings_auth(authorization: str | None) -> None:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in tags
+
+
+async def _cached_response(
+    namespace: str, name: str, key: str, compute: Callable[[], Awaitable[Any]], if_none_match: str | None
+) -> Response:
+    async def encoded() -> Any:
+        return jsonable_encoder(await compute())
+
+    payload, etag = await response_cache.get_or_compute(namespace, f"{name}:{key}", CACHE_TTLS[name], encoded)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+
+async def _latest_run_id() -> str | None:
+    async def compute() -> str | None:
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    select run_id
+                    from runs
+                    order by start_ts desc
+                    limit 1
+                    """
+                )
+                row = await cur.fetchone()
+                return str(row[0]) if row else None
+
+    run_id, _etag = await response_cache.get_or_compute(
+        "ticks", "latest_run_id", CACHE_TTLS["latest_run_id"], compute
+    )
+    return run_id
+
+
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
-def _get_hold_hours_for_mode(mode: str) -> float:
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return {"cache": response_cache.stats()}
+
+
+async def _get_settings(mode: str) -> tuple[int, dict[str, str]]:
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            # One statement = one snapshot of version + rows (see get_versioned_settings)
+            await cur.execute(
+                """
+                select v.version, s.key, s.value
+                from (select coalesce((select version from settings_versions where mode = %(mode)s), 0) as version) v
+                left join settings s on s.mode = %(mode)s
+                """,
+                {"mode": mode},
+            )
+            rows = await cur.fetchall()
+            return int(rows[0][0]), {r[1]: r[2] for r in rows if r[1] is not None}
+
+
+def _hold_hours(mode: str, overrides: dict[str, str] | None) -> float:
     prefix = "PAPER" if mode == "paper" else "LIVE"
     runtime = RuntimeSettings(prefix, mode, settings)
-    overrides = get_settings(mode)
     if overrides:
         runtime.apply_overrides(overrides)
-    return runtime.hold_hours
+    return float(runtime.hold_hours)
+
+
+async def _get_hold_hours_for_mode(mode: str) -> float:
+    # Cached until a settings write for any mode (local PUT or the trigger's NOTIFY); TTL is only a fallback
+    async def compute() -> float:
+        _version, overrides = await _get_settings(mode)
+        return _hold_hours(mode, overrides)
+
+    hold_hours, _etag = await response_cache.get_or_compute(
+        "settings", f"hold_hours:{mode}", CACHE_TTLS["hold_hours"], compute
+    )
+    return hold_hours
 
 
 @app.get("/settings")
-def get_runtime_settings(mode: str, authorization: str | None = Header(default=None)):
+async def get_runtime_settings(mode: str, authorization: str | None = Header(default=None)):
     _require_settings_auth(authorization)
-    return {"mode": mode, "settings": get_settings(mode)}
+    version, values = await _get_settings(mode)
+    return {"mode": mode, "version": version, "settings": values}
 
 
 @app.put("/settings")
-def put_runtime_settings(mode: str, payload: dict, authorization: str | None = Header(default=None)):
+async def put_runtime_settings(mode: str, payload: dict, authorization: str | None = Header(default=None)):
     _require_settings_auth(authorization)
     settings_map = payload.get("settings", {})
     if not isinstance(settings_map, dict):
         raise HTTPException(status_code=400, detail="Invalid settings payload")
-    upsert_settings(mode, settings_map)
-    return {"ok": True}
+    # Validate here, once, so traders never have to skip a bad value every tick
+    _typed, errors = parse_overrides({k: str(v) for k, v in settings_map.items()})
+    if errors:
+        raise HTTPException(status_code=400, detail={"invalid": errors})
+    version = None
+    if settings_map:
+        now = now_utc()
+        rows = [(mode, k, str(v), now) for k, v in settings_map.items()]
+        async with get_async_conn() as conn:
+            async with conn.cursor() as cur:
+                # The settings trigger bumps settings_versions and notifies traders' caches and other API replicas
+                await cur.executemany(
+                    """
+                    insert into settings (mode, key, value, updated_ts)
+                    values (%s, %s, %s, %s)
+                    on conflict (mode, key)
+                    do update set value = excluded.value, updated_ts = excluded.updated_ts
+                    """,
+                    rows,
+                )
+                await cur.execute("select version from settings_versions where mode = %s", (mode,))
+                row = await cur.fetchone()
+                version = int(row[0]) if row else None
+            await conn.commit()
+    response_cache.invalidate("settings")
+    # /runs/latest embeds hold_hours
+    response_cache.invalidate("ticks")
+    return {"ok": True, "version": version}
 
 
 @app.get("/runs/latest")
-def get_latest_run(mode: str = None):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
+async def get_latest_run(mode: str = None, if_none_match: str | None = Header(default=None)):
+    return await _cached_response("ticks", "runs_latest", mode or "", lambda: _fetch_latest_run(mode), if_none_match)
+
+
+async def _fetch_latest_run(mode: str | None) -> dict:
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
             if mode:
-                cur.execute(
+                await cur.execute(
                     """
                     select run_id, exchange, mode, entry_time_utc::text, start_ts::text, end_ts::text, status,
                            num_legs, margin_per_leg_usdt, leverage, max_pump_pct, global_kill_dd_pct, strategy_tag,
@@ -89,7 +252,7 @@ def get_latest_run(mode: str = None):
                     (mode,),
                 )
             else:
-                cur.execute(
+                await cur.execute(
                     """
                     select run_id, exchange, mode, entry_time_utc::text, start_ts::text, end_ts::text, status,
                            num_legs, margin_per_leg_usdt, leverage, max_pump_pct, global_kill_dd_pct, strategy_tag,
@@ -99,51 +262,46 @@ def get_latest_run(mode: str = None):
                     limit 1
                     """
                 )
-            row = cur.fetchone()
-            if not row:
-                return {"run": None}
-            run_mode = row[2]
-            return {
-                "run": {
-                    "run_id": row[0],
-                    "exchange": row[1],
-                    "mode": run_mode,
-                    "entry_time_utc": row[3],
-                    "start_ts": row[4],
-                    "end_ts": row[5],
-                    "status": row[6],
-                    "num_legs": row[7],
-                    "margin_per_leg_usdt": float(row[8]),
-                    "leverage": float(row[9]),
-                    "max_pump_pct": float(row[10]),
-                    "global_kill_dd_pct": float(row[11]),
-                    "strategy_tag": row[12],
-                    "initial_balance": float(row[13]) if row[13] is not None else None,
-                    "current_balance": float(row[14]) if row[14] is not None else None,
-                    "hold_hours": float(_get_hold_hours_for_mode(run_mode)),
-                }
-            }
+            row = await cur.fetchone()
+    if not row:
+        return {"run": None}
+    run_mode = row[2]
+    return {
+        "run": {
+            "run_id": row[0],
+            "exchange": row[1],
+            "mode": run_mode,
+            "entry_time_utc": row[3],
+            "start_ts": row[4],
+            "end_ts": row[5],
+            "status": row[6],
+            "num_legs": row[7],
+            "margin_per_leg_usdt": float(row[8]),
+            "leverage": float(row[9]),
+            "max_pump_pct": float(row[10]),
+            "global_kill_dd_pct": float(row[11]),
+            "strategy_tag": row[12],
+            "initial_balance": float(row[13]) if row[13] is not None else None,
+            "current_balance": float(row[14]) if row[14] is not None else None,
+            "hold_hours": float(await _get_hold_hours_for_mode(run_mode)),
+        }
+    }
 
 
 @app.get("/positions/open")
-def get_open_positions(run_id: str = None):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            latest_run_id = run_id
-            if not latest_run_id:
-                cur.execute(
-                    """
-                    select run_id
-                    from runs
-                    order by start_ts desc
-                    limit 1
-                    """
-                )
-                run_row = cur.fetchone()
-                if not run_row:
-                    return {"positions": []}
-                latest_run_id = run_row[0]
-            cur.execute(
+async def get_open_positions(run_id: str = None, if_none_match: str | None = Header(default=None)):
+    return await _cached_response(
+        "ticks", "positions_open", run_id or "", lambda: _fetch_open_positions(run_id), if_none_match
+    )
+
+
+async def _fetch_open_positions(run_id: str | None) -> dict:
+    latest_run_id = run_id or await _latest_run_id()
+    if not latest_run_id:
+        return {"positions": []}
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 select symbol, entry_price, qty, status, max_favorable_pnl_usdt, max_adverse_pnl_usdt
                 from legs
@@ -152,41 +310,43 @@ def get_open_positions(run_id: str = None):
                 """,
                 (latest_run_id,),
             )
-            rows = cur.fetchall()
-            return {
-                "positions": [
-                    {
-                        "symbol": r[0],
-                        "entry_price": float(r[1]) if r[1] is not None else None,
-                        "qty": float(r[2]) if r[2] is not None else None,
-                        "status": r[3],
-                        "max_favorable_pnl_usdt": float(r[4]) if r[4] is not None else 0.0,
-                        "max_adverse_pnl_usdt": float(r[5]) if r[5] is not None else 0.0,
-                    }
-                    for r in rows
-                ]
+            rows = await cur.fetchall()
+    return {
+        "positions": [
+            {
+                "symbol": r[0],
+                "entry_price": float(r[1]) if r[1] is not None else None,
+                "qty": float(r[2]) if r[2] is not None else None,
+                "status": r[3],
+                "max_favorable_pnl_usdt": float(r[4]) if r[4] is not None else 0.0,
+                "max_adverse_pnl_usdt": float(r[5]) if r[5] is not None else 0.0,
             }
+            for r in rows
+        ]
+    }
 
 
 @app.get("/legs")
-def get_legs_for_run(run_id: str = None):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            latest_run_id = run_id
-            if not latest_run_id:
-                cur.execute(
-                    """
-                    select run_id
-                    from runs
-                    order by start_ts desc
-                    limit 1
-                    """
-                )
-                run_row = cur.fetchone()
-                if not run_row:
-                    return {"legs": []}
-                latest_run_id = run_row[0]
-    rows = get_legs(latest_run_id)
+async def get_legs_for_run(run_id: str = None, if_none_match: str | None = Header(default=None)):
+    return await _cached_response("ticks", "legs", run_id or "", lambda: _fetch_legs(run_id), if_none_match)
+
+
+async def _fetch_legs(run_id: str | None) -> dict:
+    latest_run_id = run_id or await _latest_run_id()
+    if not latest_run_id:
+        return {"legs": []}
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                select symbol, entry_price, exit_price, qty, status, exit_ts::text
+                from legs
+                where run_id = %s
+                order by symbol asc
+                """,
+                (latest_run_id,),
+            )
+            rows = await cur.fetchall()
     return {
         "legs": [
             {
@@ -203,24 +363,23 @@ def get_legs_for_run(run_id: str = None):
 
 
 @app.get("/snapshots/latest")
-def get_latest_snapshots(limit: int = 50, run_id: str = None):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            latest_run_id = run_id
-            if not latest_run_id:
-                cur.execute(
-                    """
-                    select run_id
-                    from runs
-                    order by start_ts desc
-                    limit 1
-                    """
-                )
-                run_row = cur.fetchone()
-                if not run_row:
-                    return {"snapshots": []}
-                latest_run_id = run_row[0]
-            cur.execute(
+async def get_latest_snapshots(limit: int = 50, run_id: str = None, if_none_match: str | None = Header(default=None)):
+    return await _cached_response(
+        "ticks",
+        "snapshots_latest",
+        f"{run_id or ''}:{limit}",
+        lambda: _fetch_latest_snapshots(limit, run_id),
+        if_none_match,
+    )
+
+
+async def _fetch_latest_snapshots(limit: int, run_id: str | None) -> dict:
+    latest_run_id = run_id or await _latest_run_id()
+    if not latest_run_id:
+        return {"snapshots": []}
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 select ts::text, run_id, exchange, symbol, price, unrealized_pnl_usdt,
                        entry_price, position_size, margin_usdt, leverage
@@ -231,37 +390,203 @@ def get_latest_snapshots(limit: int = 50, run_id: str = None):
                 """,
                 (latest_run_id, limit),
             )
-            rows = cur.fetchall()
-            return {
-                "snapshots": [
-                    {
-                        "ts": r[0],
-                        "run_id": r[1],
-                        "exchange": r[2],
-                        "symbol": r[3],
-                        "price": float(r[4]),
-                        "unrealized_pnl_usdt": float(r[5]),
-                        "entry_price": float(r[6]) if r[6] is not None else None,
-                        "position_size": float(r[7]) if r[7] is not None else None,
-                        "margin_usdt": float(r[8]) if r[8] is not None else None,
-                        "leverage": float(r[9]) if r[9] is not None else None,
-                    }
-                    for r in rows
-                ]
+            rows = await cur.fetchall()
+    return {
+        "snapshots": [
+            {
+                "ts": r[0],
+                "run_id": r[1],
+                "exchange": r[2],
+                "symbol": r[3],
+                "price": float(r[4]),
+                "unrealized_pnl_usdt": float(r[5]),
+                "entry_price": float(r[6]) if r[6] is not None else None,
+                "position_size": float(r[7]) if r[7] is not None else None,
+                "margin_usdt": float(r[8]) if r[8] is not None else None,
+                "leverage": float(r[9]) if r[9] is not None else None,
             }
+            for r in rows
+        ]
+    }
 
 
-def _parse_dt(value: str) -> datetime:
-    return datetime.fromisoformat(value)
+async def _fetchall(query: str, params: tuple | dict = ()) -> list[tuple]:
+    # One pooled connection per call so independent queries can run concurrently
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchall()
 
 
-@app.get("/reports/runs")
-def get_report_runs(
-    mode: str | None = None,
-    strategy: str | None = None,
-    date_from: str | None = None,
-    date_to: str | None = None,
+SERIES_MAX_POINTS = 5000
+
+
+@app.get("/snapshots/series")
+async def get_snapshot_series(
+    run_id: str = None,
+    symbol: str = None,
+    points: int = 500,
+    if_none_match: str | None = Header(default=None),
 ):
+    points = max(2, min(points, SERIES_MAX_POINTS))
+    return await _cached_response(
+        "ticks",
+        "snapshots_series",
+        f"{run_id or ''}:{symbol or ''}:{points}",
+        lambda: _fetch_snapshot_series(run_id, symbol, points),
+        if_none_match,
+    )
+
+
+async def _fetch_snapshot_series(run_id: str | None, symbol: str | None, points: int) -> dict:
+    latest_run_id = run_id or await _latest_run_id()
+    empty = {"run_id": latest_run_id, "symbol": symbol, "bucket_sec": None, "columns": {}}
+    if not latest_run_id:
+        return empty
+    # Buckets are sized so the run fits in `points` buckets; min/max keep spikes visible
+    # after downsampling and last is the value at the end of each bucket. Snapshots are
+    # deadband-compressed, so a missing bucket means "unchanged since the previous one".
+    if symbol:
+        query = """
+            with params as (
+                select min(ts) as t0,
+                       greatest(ceil(extract(epoch from max(ts) - min(ts)) / %(points)s), 1) as step_sec
+                from snapshots
+                where run_id = %(run_id)s and symbol = %(symbol)s
+            )
+            select extract(epoch from date_bin(make_interval(secs => p.step_sec), s.ts, p.t0))::bigint,
+                   p.step_sec::int,
+                   (array_agg(s.unrealized_pnl_usdt order by s.ts desc))[1]::float8,
+                   min(s.unrealized_pnl_usdt)::float8,
+                   max(s.unrealized_pnl_usdt)::float8,
+                   (array_agg(s.price order by s.ts desc))[1]::float8,
+                   min(s.price)::float8,
+                   max(s.price)::float8
+            from snapshots s, params p
+            where s.run_id = %(run_id)s and s.symbol = %(symbol)s
+            group by 1, 2
+            order by 1
+        """
+        names = ["pnl_last", "pnl_min", "pnl_max", "price_last", "price_min", "price_max"]
+    else:
+        query = """
+            with per_ts as (
+                select ts, pnl
+                from run_pnl_series(array[%(run_id)s::uuid])
+            ),
+            params as (
+                select min(ts) as t0,
+                       greatest(ceil(extract(epoch from max(ts) - min(ts)) / %(points)s), 1) as step_sec
+                from per_ts
+            )
+            select extract(epoch from date_bin(make_interval(secs => p.step_sec), t.ts, p.t0))::bigint,
+                   p.step_sec::int,
+                   (array_agg(t.pnl order by t.ts desc))[1]::float8,
+                   min(t.pnl)::float8,
+                   max(t.pnl)::float8
+            from per_ts t, params p
+            group by 1, 2
+            order by 1
+        """
+        names = ["pnl_last", "pnl_min", "pnl_max"]
+
+    rows = await _fetchall(query, {"run_id": latest_run_id, "symbol": symbol, "points": points})
+    if not rows:
+        return empty
+    # Columnar layout: one array per field instead of one object per point
+    columns: dict[str, list] = {"ts": [r[0] for r in rows]}
+    for i, name in enumerate(names, start=2):
+        columns[name] = [r[i] for r in rows]
+    return {"run_id": latest_run_id, "symbol": symbol, "bucket_sec": rows[0][1], "columns": columns}
+
+
+# Run list + per-run stats in one round trip. {series_sql} yields one row per run_id
+# with max_dd / min_pnl / peak_pnl / peak_ts (see run_series_stats in schema.sql).
+REPORT_RUNS_SQL = """
+    with selected as (
+        select run_id, mode, strategy_tag, start_ts, end_ts, initial_balance
+        from runs
+        where {where_sql}
+    ),
+    series_stats as (
+        {series_sql}
+    ),
+    leg_stats as (
+        select l.run_id,
+               sum((l.entry_price - l.exit_price) * l.qty) filter (
+                   where l.status = 'closed' and l.entry_price is not null
+                     and l.exit_price is not null and l.qty is not null
+               ) as gross_pnl,
+               sum(coalesce(l.fees_usdt, 0)) as fees_usdt,
+               sum(coalesce(l.funding_usdt, 0)) as funding_usdt,
+               count(*) filter (where l.status = 'closed') as closed_legs,
+               count(*) filter (where l.status = 'closed' and l.exit_price < l.entry_price) as winning_legs
+        from legs l
+        where l.run_id in (select run_id from selected)
+        group by l.run_id
+    )
+    select r.run_id,
+           r.mode,
+           r.strategy_tag,
+           r.start_ts::text as start_ts,
+           r.end_ts::text as end_ts,
+           (extract(epoch from r.end_ts - r.start_ts) / 3600.0)::float8 as duration_hours,
+           ce.message as close_reason,
+           r.initial_balance::float8 as initial_balance,
+           (coalesce(ls.gross_pnl, 0) + coalesce(ls.funding_usdt, 0) - coalesce(ls.fees_usdt, 0))::float8 as final_pnl,
+           ss.max_dd::float8 as max_dd,
+           ss.min_pnl::float8 as min_pnl,
+           ss.peak_pnl::float8 as peak_pnl,
+           (extract(epoch from ss.peak_ts - r.start_ts) / 3600.0)::float8 as time_to_peak_hours,
+           coalesce(ls.closed_legs, 0) as closed_legs,
+           coalesce(ls.winning_legs, 0) as winning_legs,
+           coalesce(ls.gross_pnl, 0)::float8 as gross_pnl,
+           coalesce(ls.fees_usdt, 0)::float8 as fees_usdt,
+           coalesce(ls.funding_usdt, 0)::float8 as funding_usdt
+    from selected r
+    left join series_stats ss on ss.run_id = r.run_id
+    left join leg_stats ls on ls.run_id = r.run_id
+    left join lateral (
+        select e.message
+        from events e
+        where e.run_id = r.run_id and e.type in ('paper_run_completed', 'live_run_completed')
+        order by e.ts desc
+        limit 1
+    ) ce on true
+    order by r.start_ts desc
+"""
+
+REPORT_AGGREGATE_SQL = """
+    with report as ({runs_sql}),
+    pct as (
+        select final_pnl,
+               final_pnl / nullif(initial_balance, 0) * 100.0 as final_pnl_pct,
+               max_dd / nullif(initial_balance, 0) * 100.0 as max_dd_pct,
+               peak_pnl / nullif(initial_balance, 0) * 100.0 as peak_pnl_pct
+        from report
+    )
+    select count(*),
+           avg(final_pnl_pct)::float8,
+           avg(max_dd_pct)::float8,
+           avg(peak_pnl_pct)::float8,
+           avg(case when final_pnl > 0 then 1.0 else 0.0 end)::float8,
+           stddev_samp(final_pnl_pct)::float8,
+           (avg(final_pnl_pct) / nullif(stddev_samp(final_pnl_pct), 0))::float8
+    from pct
+"""
+
+
+def _report_runs_sql(where_sql: str, use_matview: bool) -> str:
+    if use_matview:
+        series_sql = "select * from run_report_series where run_id in (select run_id from selected)"
+    else:
+        series_sql = "select * from run_series_stats(array(select run_id from selected))"
+    return REPORT_RUNS_SQL.format(where_sql=where_sql, series_sql=series_sql)
+
+
+def _report_filters(
+    mode: str | None, strategy: str | None, date_from: str | None, date_to: str | None
+) -> tuple[str, tuple]:
     clauses = ["status = 'completed'"]
     params: list[object] = []
     if mode:
@@ -276,257 +601,300 @@ def get_report_runs(
     if date_to:
         clauses.append("start_ts <= %s")
         params.append(date_to)
-    where_sql = " and ".join(clauses)
-
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                f"""
-                select run_id, mode, strategy_tag, start_ts::text, end_ts::text, initial_balance
-                from runs
-                where {where_sql}
-                order by start_ts desc
-                """,
-                tuple(params),
-            )
-            runs = cur.fetchall()
+    return " and ".join(clauses), tuple(params)
 
-            out = []
-            for run_id, run_mode, strategy_tag, start_ts, end_ts, initial_balance in runs:
-                cur.execute(
-                    """
-                    select symbol, entry_price, exit_price, qty, status, max_favorable_pnl_usdt, max_adverse_pnl_usdt
-                    from legs
-                    where run_id = %s
-                    """,
-                    (run_id,),
-                )
-                legs = cur.fetchall()
 
-                # Final PnL (realized only)
-                final_pnl = 0.0
-                for _sym, entry, exit_price, qty, status, _max_fav, _max_adv in legs:
-                    if status == "closed" and entry is not None and exit_price is not None and qty is not None:
-                        final_pnl += (float(entry) - float(exit_price)) * float(qty)
+def _report_row(row: tuple) -> dict:
+    closed_legs, winning_legs = row[13], row[14]
+    return {
+        "run_id": row[0],
+        "mode": row[1],
+        "strategy_tag": row[2],
+        "start_ts": row[3],
+        "end_ts": row[4],
+        "duration_hours": row[5],
+        "close_reason": row[6],
+        "initial_investment": row[7],
+        # net of fees and funding; gross_pnl is the price move only
+        "final_pnl": row[8],
+        "gross_pnl": row[15],
+        "fees_usdt": row[16],
+        "funding_usdt": row[17],
+        "max_dd": row[9],
+        "min_pnl": row[10],
+        "peak_pnl": row[11],
+        "time_to_peak_hours": row[12],
+        "leg_win_rate": (winning_legs / closed_legs) if closed_legs else None,
+    }
 
-                # Run max DD / peak PnL (aggregated unrealized)
-                cur.execute(
-                    """
-                    select ts, sum(unrealized_pnl_usdt) as pnl
-                    from snapshots
-                    where run_id = %s
-                    group by ts
-                    """,
-                    (run_id,),
-                )
-                series = cur.fetchall()
-                max_dd = None
-                peak_pnl = None
-                if series:
-                    pnls = [float(p[1] or 0) for p in series]
-                    max_dd = min(pnls)
-                    peak_pnl = max(pnls)
-
-                # Close reason from latest run_completed event
-                cur.execute(
-                    """
-                    select message
-                    from events
-                    where run_id = %s and type in ('paper_run_completed', 'live_run_completed')
-                    order by ts desc
-                    limit 1
-                    """,
-                    (run_id,),
-                )
-                row = cur.fetchone()
-                close_reason = row[0] if row else None
-
-                duration_hours = None
-                if start_ts and end_ts:
-                    try:
-                        duration_hours = (
-                            (_parse_dt(end_ts) - _parse_dt(start_ts)).total_seconds() / 3600.0
-                        )
-                    except Exception:
-                        duration_hours = None
-
-                out.append(
-                    {
-                        "run_id": run_id,
-                        "mode": run_mode,
-                        "strategy_tag": strategy_tag,
-                        "start_ts": start_ts,
-                        "end_ts": end_ts,
-                        "duration_hours": duration_hours,
-                        "close_reason": close_reason,
-                        "initial_investment": float(initial_balance) if initial_balance is not None else None,
-                        "final_pnl": final_pnl,
-                        "max_dd": max_dd,
-                        "peak_pnl": peak_pnl,
-                    }
-                )
 
-    return {"runs": out}
+@app.get("/reports/runs")
+async def get_report_runs(
+    mode: str | None = None,
+    strategy: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+):
+    where_sql, params = _report_filters(mode, strategy, date_from, date_to)
+    rows = await _fetchall(_report_runs_sql(where_sql, settings.reports_use_matview), params)
+    return {"runs": [_report_row(r) for r in rows]}
 
 
 @app.get("/reports/run")
-def get_report_run(run_id: str):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                select run_id, mode, strategy_tag, start_ts::text, end_ts::text, initial_balance
-                from runs
-                where run_id = %s
-                """,
-                (run_id,),
-            )
-            run = cur.fetchone()
-            if not run:
-                return {"run": None}
-
-            cur.execute(
-                """
-                select symbol, entry_price, exit_price, qty, status, max_favorable_pnl_usdt, max_adverse_pnl_usdt
-                from legs
-                where run_id = %s
-                order by symbol asc
-                """,
-                (run_id,),
-            )
-            legs = cur.fetchall()
-
-            legs_out = []
-            for sym, entry, exit_price, qty, status, max_fav, max_adv in legs:
-                final_pnl = None
-                if status == "closed" and entry is not None and exit_price is not None and qty is not None:
-                    final_pnl = (float(entry) - float(exit_price)) * float(qty)
-                legs_out.append(
-                    {
-                        "symbol": sym,
-                        "status": status,
-                        "entry_price": float(entry) if entry is not None else None,
-                        "exit_price": float(exit_price) if exit_price is not None else None,
-                        "qty": float(qty) if qty is not None else None,
-                        "initial_investment": None,  # per-leg baseline is implicit by margin at open
-                        "final_pnl": final_pnl,
-                        "max_dd": float(max_adv) if max_adv is not None else None,
-                        "peak_pnl": float(max_fav) if max_fav is not None else None,
-                    }
-                )
-
-            # Run aggregated metrics
-            cur.execute(
-                """
-                select ts, sum(unrealized_pnl_usdt) as pnl
+async def get_report_run(run_id: str):
+    # The run may still be active, so always compute its series stats live
+    runs, legs = await asyncio.gather(
+        _fetchall(_report_runs_sql("run_id = %s", use_matview=False), (run_id,)),
+        _fetchall(
+            """
+            select l.symbol, l.entry_price, l.exit_price, l.qty, l.status,
+                   l.max_favorable_pnl_usdt, l.max_adverse_pnl_usdt, x.mae, x.mfe,
+                   coalesce(l.fees_usdt, 0)::float8, coalesce(l.funding_usdt, 0)::float8
+            from legs l
+            left join (
+                select symbol, min(unrealized_pnl_usdt) as mae, max(unrealized_pnl_usdt) as mfe
                 from snapshots
                 where run_id = %s
-                group by ts
-                """,
-                (run_id,),
-            )
-            series = cur.fetchall()
-            max_dd = None
-            peak_pnl = None
-            if series:
-                pnls = [float(p[1] or 0) for p in series]
-                max_dd = min(pnls)
-                peak_pnl = max(pnls)
-
-            final_pnl = 0.0
-            for l in legs_out:
-                if l["final_pnl"] is not None:
-                    final_pnl += l["final_pnl"]
-
-            run_out = {
-                "run_id": run[0],
-                "mode": run[1],
-                "strategy_tag": run[2],
-                "start_ts": run[3],
-                "end_ts": run[4],
-                "initial_investment": float(run[5]) if run[5] is not None else None,
+                group by symbol
+            ) x on x.symbol = l.symbol
+            where l.run_id = %s
+            order by l.symbol asc
+            """,
+            (run_id, run_id),
+        ),
+    )
+    if not runs:
+        return {"run": None}
+
+    legs_out = []
+    for sym, entry, exit_price, qty, status, max_fav, max_adv, mae, mfe, fees, funding in legs:
+        final_pnl = None
+        if status == "closed" and entry is not None and exit_price is not None and qty is not None:
+            final_pnl = (float(entry) - float(exit_price)) * float(qty) + funding - fees
+        legs_out.append(
+            {
+                "symbol": sym,
+                "status": status,
+                "entry_price": float(entry) if entry is not None else None,
+                "exit_price": float(exit_price) if exit_price is not None else None,
+                "qty": float(qty) if qty is not None else None,
+                "initial_investment": None,  # per-leg baseline is implicit by margin at open
                 "final_pnl": final_pnl,
-                "max_dd": max_dd,
-                "peak_pnl": peak_pnl,
+                "fees_usdt": fees,
+                "funding_usdt": funding,
+                "max_dd": float(max_adv) if max_adv is not None else None,
+                "peak_pnl": float(max_fav) if max_fav is not None else None,
+                "mae": float(mae) if mae is not None else None,
+                "mfe": float(mfe) if mfe is not None else None,
             }
-            return {"run": run_out, "legs": legs_out}
+        )
+
+    return {"run": _report_row(runs[0]), "legs": legs_out}
 
 
 @app.get("/reports/aggregate")
-def get_reports_aggregate(
+async def get_reports_aggregate(
     mode: str | None = None,
     strategy: str | None = None,
     date_from: str | None = None,
     date_to: str | None = None,
 ):
-    runs = get_report_runs(mode=mode, strategy=strategy, date_from=date_from, date_to=date_to)["runs"]
-    if not runs:
+    where_sql, params = _report_filters(mode, strategy, date_from, date_to)
+    runs_sql = _report_runs_sql(where_sql, settings.reports_use_matview)
+    rows = await _fetchall(REPORT_AGGREGATE_SQL.format(runs_sql=runs_sql), params)
+    count, avg_final, avg_dd, avg_peak, win_rate, final_std, sharpe = rows[0]
+    if not count:
         return {"aggregate": None}
-
-    # Convert to percent vs initial investment
-    def pct(value: float | None, base: float | None) -> float | None:
-        if value is None or base in (None, 0):
-            return None
-        return (value / base) * 100.0
-
-    final_pnls = []
-    max_dds = []
-    peak_pnls = []
-    for r in runs:
-        base = r.get("initial_investment")
-        final_pnls.append(pct(r.get("final_pnl"), base))
-        max_dds.append(pct(r.get("max_dd"), base))
-        peak_pnls.append(pct(r.get("peak_pnl"), base))
-
-    # simple average, ignore None
-    def avg(values: list[float | None]) -> float | None:
-        nums = [v for v in values if v is not None]
-        if not nums:
-            return None
-        return sum(nums) / len(nums)
-
+    # Percentages are vs each run's initial investment; nulls are ignored by avg
     return {
         "aggregate": {
-            "avg_final_pnl_pct": avg(final_pnls),
-            "avg_max_dd_pct": avg(max_dds),
-            "avg_peak_pnl_pct": avg(peak_pnls),
+            "runs": count,
+            "avg_final_pnl_pct": avg_final,
+            "avg_max_dd_pct": avg_dd,
+            "avg_peak_pnl_pct": avg_peak,
+            "win_rate": win_rate,
+            "final_pnl_pct_stddev": final_std,
+            "sharpe": sharpe,
         }
     }
 
 
+@app.post("/reports/refresh")
+async def refresh_reports(authorization: str | None = Header(default=None)):
+    # Traders refresh on run completion; this is an operator backfill, and each call is a full recompute
+    _require_settings_auth(authorization)
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("select pg_try_advisory_xact_lock(%s)", (REPORT_REFRESH_LOCK_KEY,))
+            (locked,) = await cur.fetchone()
+            if not locked:
+                await conn.rollback()
+                raise HTTPException(status_code=409, detail="Report refresh already running")
+            await cur.execute("refresh materialized view concurrently run_report_series")
+        await conn.commit()
+    return {"ok": True}
+
+
+@app.get("/export/{table}")
+async def export_table(
+    table: str,
+    format: str = "csv",
+    run_id: str | None = None,
+    mode: str | None = None,
+    strategy: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+):
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table {table}")
+    if format not in ("csv", "parquet"):
+        raise HTTPException(status_code=400, detail="format must be csv or parquet")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    query, params = build_export_query(
+        table,
+        parquet=format == "parquet",
+        run_id=run_id,
+        mode=mode,
+        strategy=strategy,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    filename = f"{table}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "parquet":
+        return StreamingResponse(
+            stream_parquet(table, query, params), media_type="application/vnd.apache.parquet", headers=headers
+        )
+    return StreamingResponse(stream_csv(query, params), media_type="text/csv", headers=headers)
+
+
+@app.get("/history/{table}")
+async def get_history(
+    table: str,
+    cursor: str | None = None,
+    limit: int = 100,
+    run_id: str | None = None,
+    type: str | None = None,
+    level: str | None = None,
+    symbol: str | None = None,
+    mode: str | None = None,
+    status: str | None = None,
+):
+    """Newest-first page of events/snapshots/orders/runs; pass next_cursor back for the page after."""
+    if table not in HISTORY_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown history table {table}")
+    if not 1 <= limit <= HISTORY_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {HISTORY_MAX_LIMIT}")
+    filters = {"run_id": run_id, "type": type, "level": level, "symbol": symbol, "mode": mode, "status": status}
+    unsupported = sorted(k for k, v in filters.items() if v and k not in HISTORY_TABLES[table]["filters"])
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"{table} cannot be filtered by {', '.join(unsupported)}")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if table == "snapshots" and not run_id:
+        # Like /snapshots/latest: snapshots are only indexed per run
+        filters["run_id"] = await _latest_run_id()
+        if not filters["run_id"]:
+            return {table: [], "next_cursor": None}
+    query, params = build_page_query(table, filters, after, limit)
+    rows = await _fetchall(query, params)
+    return page_payload(table, rows, limit)
+
+
 @app.get("/heartbeats/latest")
-def get_latest_heartbeats(limit: int = 20):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+async def get_latest_heartbeats(limit: int = 20):
+    # One row per service (service_status), newest first
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
-                select ts::text, service, status, message
-                from heartbeats
-                order by ts desc
+                select last_seen_ts::text, service, status, message, tick_ms, version, host
+                from service_status
+                order by last_seen_ts desc
                 limit %s
                 """,
                 (limit,),
             )
-            rows = cur.fetchall()
-            return {
-                "heartbeats": [
-                    {
-                        "ts": r[0],
-                        "service": r[1],
-                        "status": r[2],
-                        "message": r[3],
-                    }
-                    for r in rows
-                ]
+            rows = await cur.fetchall()
+    return {
+        "heartbeats": [
+            {
+                "ts": r[0],
+                "service": r[1],
+                "status": r[2],
+                "message": r[3],
+                "tick_ms": r[4],
+                "version": r[5],
+                "host": r[6],
             }
+            for r in rows
+        ]
+    }
+
+
+@app.get("/heartbeats/history")
+async def get_heartbeat_history(service: str, limit: int = 288):
+    # Downsampled ring (one row per HEARTBEAT_LOG_SEC), newest first
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                select ts::text, status, message, tick_ms
+                from heartbeats
+                where service = %s
+                order by ts desc
+                limit %s
+                """,
+                (service, limit),
+            )
+            rows = await cur.fetchall()
+    return {
+        "service": service,
+        "heartbeats": [{"ts": r[0], "status": r[1], "message": r[2], "tick_ms": r[3]} for r in rows],
+    }
+
+
+@app.get("/health/{service}")
+async def get_service_health(service: str):
+    # Primary-key lookup; 503 when the service has not ticked within SERVICE_STALE_SEC
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                select last_seen_ts::text, status, tick_ms, version, host,
+                       extract(epoch from now() - last_seen_ts)::float8
+                from service_status
+                where service = %s
+                """,
+                (service,),
+            )
+            row = await cur.fetchone()
+    if not row:
+        return JSONResponse({"service": service, "healthy": False, "last_seen": None}, status_code=503)
+    last_seen, status, tick_ms, version, host, age_sec = row
+    healthy = status == "ok" and age_sec <= settings.service_stale_sec
+    body = {
+        "service": service,
+        "healthy": healthy,
+        "status": status,
+        "last_seen": last_seen,
+        "age_sec": age_sec,
+        "tick_ms": tick_ms,
+        "version": version,
+        "host": host,
+    }
+    return JSONResponse(body, status_code=200 if healthy else 503)
 
 
 @app.get("/events/latest")
-def get_latest_events(limit: int = 50, run_id: str = None):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
+async def get_latest_events(limit: int = 50, run_id: str = None):
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
             if run_id:
-                cur.execute(
+                await cur.execute(
                     """
                     select ts::text, level, type, message, run_id
                     from events
@@ -537,7 +905,7 @@ def get_latest_events(limit: int = 50, run_id: str = None):
                     (run_id, limit),
                 )
             else:
-                cur.execute(
+                await cur.execute(
                     """
                     select ts::text, level, type, message, run_id
                     from events
@@ -546,156 +914,205 @@ def get_latest_events(limit: int = 50, run_id: str = None):
                     """,
                     (limit,),
                 )
-            rows = cur.fetchall()
-            return {
-                "events": [
-                    {
-                        "ts": r[0],
-                        "level": r[1],
-                        "type": r[2],
-                        "message": r[3],
-                        "run_id": r[4],
-                    }
-                    for r in rows
-                ]
+            rows = await cur.fetchall()
+    return {
+        "events": [
+            {
+                "ts": r[0],
+                "level": r[1],
+                "type": r[2],
+                "message": r[3],
+                "run_id": r[4],
             }
+            for r in rows
+        ]
+    }
 
 
-@app.post("/commands/pause")
-def command_pause():
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+# Every dashboard panel in one statement: the mode's latest run and, for that run, legs, the newest
+# snapshots and events, plus per-service status and the run mode's settings (for hold_hours).
+# JSON is assembled in Postgres so the whole poll is one round trip on one pooled connection.
+DASHBOARD_SQL = """
+    with latest as (
+        select run_id, exchange, mode, entry_time_utc::text as entry_time_utc, start_ts::text as start_ts,
+               end_ts::text as end_ts, status, num_legs, margin_per_leg_usdt::float8 as margin_per_leg_usdt,
+               leverage::float8 as leverage, max_pump_pct::float8 as max_pump_pct,
+               global_kill_dd_pct::float8 as global_kill_dd_pct, strategy_tag,
+               initial_balance::float8 as initial_balance, current_balance::float8 as current_balance
+        from runs
+        {run_filter}
+        order by runs.start_ts desc
+        limit 1
+    )
+    select
+        (select row_to_json(latest) from latest),
+        (
+            select coalesce(json_agg(json_build_object(
+                'symbol', symbol, 'entry_price', entry_price::float8, 'exit_price', exit_price::float8,
+                'qty', qty::float8, 'status', status, 'exit_ts', exit_ts::text,
+                'max_favorable_pnl_usdt', coalesce(max_favorable_pnl_usdt, 0)::float8,
+                'max_adverse_pnl_usdt', coalesce(max_adverse_pnl_usdt, 0)::float8
+            ) order by symbol), '[]'::json)
+            from legs
+            where run_id = (select run_id from latest)
+        ),
+        (
+            select coalesce(json_agg(json_build_object(
+                'ts', ts::text, 'run_id', run_id, 'exchange', exchange, 'symbol', symbol,
+                'price', price::float8, 'unrealized_pnl_usdt', unrealized_pnl_usdt::float8,
+                'entry_price', entry_price::float8, 'position_size', position_size::float8,
+                'margin_usdt', margin_usdt::float8, 'leverage', leverage::float8
+            ) order by ts desc), '[]'::json)
+            from (
+                select * from snapshots
+                where run_id = (select run_id from latest)
+                order by ts desc
+                limit %(snapshots)s
+            ) s
+        ),
+        (
+            select coalesce(json_agg(json_build_object(
+                'ts', ts::text, 'level', level, 'type', type, 'message', message, 'run_id', run_id
+            ) order by ts desc), '[]'::json)
+            from (
+                -- Before the first run of a mode, the newest events overall, as /events/latest shows them
+                (select * from events
+                 where run_id = (select run_id from latest)
+                 order by ts desc
+                 limit %(events)s)
+                union all
+                (select * from events
+                 where not exists (select 1 from latest)
+                 order by ts desc
+                 limit %(events)s)
+            ) e
+        ),
+        (
+            select coalesce(json_agg(json_build_object(
+                'ts', last_seen_ts::text, 'service', service, 'status', status, 'message', message,
+                'tick_ms', tick_ms, 'version', version, 'host', host
+            ) order by last_seen_ts desc), '[]'::json)
+            from service_status
+        ),
+        (select json_object_agg(key, value) from settings where mode = (select mode from latest))
+"""
+
+
+@app.get("/dashboard")
+async def get_dashboard(
+    mode: str = None,
+    snapshots: int = 200,
+    events: int = 50,
+    if_none_match: str | None = Header(default=None),
+):
+    """Everything the live dashboard polls for, in one request and one DB round trip."""
+    return await _cached_response(
+        "ticks",
+        "dashboard",
+        f"{mode or ''}:{snapshots}:{events}",
+        lambda: _fetch_dashboard(mode, snapshots, events),
+        if_none_match,
+    )
+
+
+async def _fetch_dashboard(mode: str | None, snapshots_limit: int, events_limit: int) -> dict:
+    query = DASHBOARD_SQL.format(run_filter="where runs.mode = %(mode)s" if mode else "")
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, {"mode": mode, "snapshots": snapshots_limit, "events": events_limit})
+            run, legs, snapshots, events, heartbeats, overrides = await cur.fetchone()
+    if run is not None:
+        run["hold_hours"] = _hold_hours(run["mode"], overrides)
+    # Open positions are the open legs: legs are read once and both panels are cut from them
+    positions = [
+        {k: leg[k] for k in ("symbol", "entry_price", "qty", "status", "max_favorable_pnl_usdt", "max_adverse_pnl_usdt")}
+        for leg in legs
+        if leg["status"] == "open"
+    ]
+    return {
+        "run": run,
+        "positions": positions,
+        "legs": [
+            {k: leg[k] for k in ("symbol", "entry_price", "exit_price", "qty", "status", "exit_ts")} for leg in legs
+        ],
+        "snapshots": snapshots,
+        "heartbeats": heartbeats,
+        "events": events,
+    }
+
+
+async def _insert_command_event(event_type: str, message: str) -> None:
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_pause', 'pause requested')
-                """
+                values (now(), 'info', %s, %s)
+                """,
+                (event_type, message),
             )
-        conn.commit()
+        await conn.commit()
+    # /dashboard embeds the events feed
+    response_cache.invalidate("ticks")
+
+
+@app.post("/commands/pause")
+async def command_pause():
+    await _insert_command_event("command_pause", "pause requested")
     return {"ok": True}
 
 
 @app.post("/commands/resume")
-def command_resume():
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_resume', 'resume requested')
-                """
-            )
-        conn.commit()
+async def command_resume():
+    await _insert_command_event("command_resume", "resume requested")
     return {"ok": True}
 
 
 @app.post("/commands/close_all")
-def command_close_all():
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_close_all', 'close all requested')
-                """
-            )
-        conn.commit()
+async def command_close_all():
+    await _insert_command_event("command_close_all", "close all requested")
     return {"ok": True}
 
 
 @app.post("/commands/set_global_tp")
-def command_set_global_tp(payload: dict):
+async def command_set_global_tp(payload: dict):
     percent = payload.get("percent")
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_set_global_tp', %s)
-                """,
-                (f"set_global_tp {percent}",),
-            )
-        conn.commit()
+    await _insert_command_event("command_set_global_tp", f"set_global_tp {percent}")
     return {"ok": True}
 
 
 @app.post("/commands/set_global_sl")
-def command_set_global_sl(payload: dict):
+async def command_set_global_sl(payload: dict):
     percent = payload.get("percent")
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_set_global_sl', %s)
-                """,
-                (f"set_global_sl {percent}",),
-            )
-        conn.commit()
+    await _insert_command_event("command_set_global_sl", f"set_global_sl {percent}")
     return {"ok": True}
 
 
 @app.post("/commands/leg_tp")
-def command_leg_tp(payload: dict):
+async def command_leg_tp(payload: dict):
     symbol = payload.get("symbol")
     price = payload.get("price")
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_leg_tp', %s)
-                """,
-                (f"{symbol} {price}",),
-            )
-        conn.commit()
+    await _insert_command_event("command_leg_tp", f"{symbol} {price}")
     return {"ok": True}
 
 
 @app.post("/commands/leg_sl")
-def command_leg_sl(payload: dict):
+async def command_leg_sl(payload: dict):
     symbol = payload.get("symbol")
     price = payload.get("price")
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_leg_sl', %s)
-                """,
-                (f"{symbol} {price}",),
-            )
-        conn.commit()
+    await _insert_command_event("command_leg_sl", f"{symbol} {price}")
     return {"ok": True}
 
 
 @app.post("/commands/leg_tp_clear")
-def command_leg_tp_clear(payload: dict):
+async def command_leg_tp_clear(payload: dict):
     symbol = payload.get("symbol")
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_leg_tp_clear', %s)
-                """,
-                (f"{symbol}",),
-            )
-        conn.commit()
+    await _insert_command_event("command_leg_tp_clear", f"{symbol}")
     return {"ok": True}
 
 
 @app.post("/commands/leg_sl_clear")
-def command_leg_sl_clear(payload: dict):
+async def command_leg_sl_clear(payload: dict):
     symbol = payload.get("symbol")
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into events (ts, level, type, message)
-                values (now(), 'info', 'command_leg_sl_clear', %s)
-                """,
-                (f"{symbol}",),
-            )
-        conn.commit()
+    await _insert_command_event("command_leg_sl_clear", f"{symbol}")
     return {"ok": True}
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+ROOT = Path(__file__).resolve().parents[2]
+WORKER_DIR = ROOT / "backend" / "worker"
+
+# Same engines either way: three service processes vs one supervisor process
+LAYOUTS = {
+    "processes": [
+        [sys.executable, str(WORKER_DIR / "worker_service.py")],
+        [sys.executable, str(WORKER_DIR / "paper_trading_service.py")],
+        [sys.executable, str(WORKER_DIR / "live_trading_service.py")],
+    ],
+    "supervisor": [[sys.executable, str(WORKER_DIR / "supervisor.py")]],
+}
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _rss_bytes(pid: int) -> int:
+    # /proc/<pid>/statm: size resident shared ... (pages)
+    with open(f"/proc/{pid}/statm") as fh:
+        return int(fh.read().split()[1]) * _PAGE
+
+
+def _cpu_sec(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as fh:
+        # fields after the ")" of comm; utime/stime are fields 14/15
+        fields = fh.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _TICKS
+
+
+def measure(layout: str, duration: float, interval: float) -> Dict[str, float]:
+    procs = [
+        subprocess.Popen(cmd, cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for cmd in LAYOUTS[layout]
+    ]
+    samples: List[int] = []
+    cpu_start = None
+    cpu_end = 0.0
+    try:
+        # Let imports and the first tick settle before CPU is counted
+        time.sleep(min(5.0, duration / 4))
+        cpu_start = sum(_cpu_sec(p.pid) for p in procs)
+        started = time.monotonic()
+        while time.monotonic() - started < duration:
+            if any(p.poll() is not None for p in procs):
+                raise RuntimeError(f"{layout}: a process exited early; check DATABASE_URL / BITGET_BASE_URL")
+            samples.append(sum(_rss_bytes(p.pid) for p in procs))
+            time.sleep(interval)
+        cpu_end = sum(_cpu_sec(p.pid) for p in procs)
+        elapsed = time.monotonic() - started
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                p.kill()
+    return {
+        "processes": len(procs),
+        "rss_mb_avg": sum(samples) / len(samples) / 2**20,
+        "rss_mb_max": max(samples) / 2**20,
+        "cpu_pct": 100.0 * (cpu_end - cpu_start) / elapsed,
+        "duration_s": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RSS/CPU of the three trading services vs the single-process supervisor")
+    parser.add_argument("--layout", action="append", choices=sorted(LAYOUTS), help="repeatable; default both")
+    parser.add_argument("--duration", type=float, default=120.0, help="seconds to sample each layout")
+    parser.add_argument("--interval", type=float, default=1.0, help="RSS sample period")
+    args = parser.parse_args()
+
+    results = {}
+    for layout in args.layout or ["processes", "supervisor"]:
+        print(f"[footprint] {layout}: sampling {args.duration:.0f}s")
+        results[layout] = measure(layout, args.duration, args.interval)
+        print(f"[footprint] {layout}: {json.dumps(results[layout])}")
+    if len(results) == 2:
+        base, sup = results["processes"], results["supervisor"]
+        print(
+            "[footprint] supervisor vs processes:",
+            f"rss {sup['rss_mb_avg'] - base['rss_mb_avg']:+.1f} MB",
+            f"cpu {sup['cpu_pct'] - base['cpu_pct']:+.2f} pts",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Each repeat runs the callable enough times to take at least this long (like timeit.autorange)
+MIN_REPEAT_SEC = 0.05
+# Results fields that must match for absolute timings to be comparable
+HOST_KEYS = ("python", "machine", "cpu")
+
+
+def _cpu_model() -> str:
+    # platform.processor() is empty on most Linux builds; /proc/cpuinfo names the model
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+class Bench:
+    """Collects timings for one suite run and writes/compares JSON results."""
+
+    def __init__(self, repeat: int = 5) -> None:
+        self.repeat = repeat
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.skipped: Dict[str, str] = {}
+
+    def run(self, name: str, fn: Callable[[], Any], number: Optional[int] = None) -> Dict[str, Any]:
+        if number is None:
+            number = 1
+            while True:
+                start = time.perf_counter()
+                for _ in range(number):
+                    fn()
+                if time.perf_counter() - start >= MIN_REPEAT_SEC or number >= 1_000_000:
+                    break
+                number *= 10
+        per_call: List[float] = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            per_call.append((time.perf_counter() - start) / number)
+        result = {
+            "min_s": min(per_call),
+            "median_s": statistics.median(per_call),
+            "mean_s": statistics.fmean(per_call),
+            "number": number,
+            "repeat": self.repeat,
+        }
+        self.results[name] = result
+        print(f"{name:44} {result['median_s'] * 1e6:12.1f} us  (min {result['min_s'] * 1e6:.1f}, n={number})")
+        return result
+
+    def skip(self, name: str, reason: str) -> None:
+        self.skipped[name] = reason
+        print(f"{name:44} skipped: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "machine": platform.machine(),
+            "cpu": _cpu_model(),
+            "results": self.results,
+            "skipped": self.skipped,
+        }
+
+    def write(self, path: str) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        print(f"wrote {path}")
+
+
+class NullCursor:
+    """Cursor that accepts every statement; lets trader code run with the DB swapped out."""
+
+    def execute(self, *args, **kwargs) -> None:
+        return
+
+    def executemany(self, *args, **kwargs) -> None:
+        return
+
+    def fetchone(self) -> tuple:
+        # any single-row check (e.g. the lease fencing query) passes
+        return (1,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return
+
+
+class NullConn(NullCursor):
+    def cursor(self) -> NullCursor:
+        return NullCursor()
+
+    def commit(self) -> None:
+        return
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float) -> List[str]:
+    # Compares the best-of-repeat time (least noisy); returns names that regressed beyond threshold
+    mismatch = [k for k in HOST_KEYS if current.get(k) != baseline.get(k)]
+    if mismatch:
+        detail = ", ".join(f"{k} {baseline.get(k)!r} vs {current.get(k)!r}" for k in mismatch)
+        print(f"\nbaseline is from a different host ({detail}); skipping comparison")
+        return []
+    regressions = []
+    print(f"\n{'benchmark':44} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:44} {'-':>12} {cur['min_s'] * 1e6:12.1f}      new")
+            continue
+        change = (cur["min_s"] - base["min_s"]) / base["min_s"] * 100.0 if base["min_s"] else 0.0
+        flag = ""
+        if change > threshold_pct:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:44} {base['min_s'] * 1e6:12.1f} {cur['min_s'] * 1e6:12.1f} {change:+7.1f}%{flag}")
+    return regressions
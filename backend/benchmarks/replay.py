@@ -0,0 +1,254 @@
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import types
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import httpx
+
+from backend.benchmarks.harness import Bench, NullConn, compare
+from backend.common import db_ops, live_trader, orders, paper_trader
+from backend.common.bitget_client import BitgetAPIError
+from backend.common.journal import JournalRecord, read_journal, trader_state
+from backend.worker import telemetry_writer
+
+
+# (begin, inputs, end) records of one journaled poll tick
+Tick = Tuple[JournalRecord, List[JournalRecord], JournalRecord]
+
+
+class ReplayDivergence(BaseException):
+    """The replayed tick asked for a different input than the journal holds, or ended in another state.
+
+    A BaseException so trader code that swallows Exception (funding history, settings) can't hide it.
+    """
+
+
+class TickFeed:
+    """The journaled inputs of the tick being replayed, handed out in recorded order."""
+
+    def __init__(self) -> None:
+        self.records: Deque[JournalRecord] = deque()
+
+    def load(self, records: List[JournalRecord]) -> None:
+        self.records = deque(records)
+
+    def expect(self, kinds: Tuple[str, ...], name: str) -> JournalRecord:
+        if not self.records:
+            raise ReplayDivergence(f"{name}: no journaled input left")
+        record = self.records.popleft()
+        if record.kind not in kinds or record.name != name:
+            raise ReplayDivergence(f"{name}: journal has {record.kind} {record.name} next")
+        return record
+
+
+class ReplayClient:
+    """BitgetClient stand-in answering every call from the feed (responses and errors alike)."""
+
+    def __init__(self, feed: TickFeed) -> None:
+        self.feed = feed
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            record = self.feed.expect(("call", "error"), name)
+            if record.kind == "error":
+                raise _journaled_error(name, record.data)
+            return record.data
+
+        return call
+
+
+def _journaled_error(name: str, data: Dict[str, Any]) -> Exception:
+    # Same class of failure, so retry/transient handling takes the same branch
+    if data.get("status_code") is not None:
+        return BitgetAPIError(int(data["status_code"]), name, data["message"])
+    cls = getattr(httpx, data.get("type") or "", None)
+    if isinstance(cls, type) and issubclass(cls, httpx.TransportError):
+        return cls(data["message"])
+    return RuntimeError(data["message"])
+
+
+def load_ticks(path: str) -> List[Tick]:
+    """Complete ticks in journal order; a tick cut short by a crash is dropped."""
+    ticks: List[Tick] = []
+    begin: Optional[JournalRecord] = None
+    inputs: List[JournalRecord] = []
+    for record in read_journal(path):
+        if record.kind == "begin":
+            begin, inputs = record, []
+        elif record.kind == "end":
+            if begin is not None:
+                ticks.append((begin, inputs, record))
+            begin = None
+        elif begin is not None:
+            inputs.append(record)
+    return ticks
+
+
+def _normalized(state: Any) -> Any:
+    # Through JSON like the journal, so tuples/lists and int/float keys compare equal
+    return json.loads(json.dumps(state, default=str))
+
+
+class Replayer:
+    """Drives one PaperTrader/LiveTrader through journaled ticks with network and DB mocked out.
+
+    State carries over from tick to tick like in the recorded process; the
+    trader is only reseeded from a tick's "begin" record when the two differ
+    (first tick, a tick after a divergence or a lost lease). Only
+    _poll_and_update() is timed, so the numbers are the pure compute path.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.module = paper_trader if mode == "paper" else live_trader
+        self.feed = TickFeed()
+        cls = paper_trader.PaperTrader if mode == "paper" else live_trader.LiveTrader
+        self.trader = cls(client=ReplayClient(self.feed))
+        self.trader.journal.out_dir = ""
+        self.trader.lease.token = 1
+        self.trader._clock = self._clock
+        self.sink = io.StringIO()
+
+    def _clock(self) -> datetime:
+        return datetime.fromisoformat(self.feed.expect(("clock",), "now").data)
+
+    def _active_run(self, mode: Optional[str] = None) -> Optional[db_ops.RunRow]:
+        data = self.feed.expect(("db",), "get_active_run").data
+        return db_ops.RunRow(**data) if data is not None else None
+
+    @contextlib.contextmanager
+    def patched(self):
+        """Swap DB access and order backoff sleeps for no-ops while replaying."""
+        module = self.module
+        saved = (db_ops.get_conn, telemetry_writer.get_conn, module.get_conn, module.get_active_run, orders.time)
+        db_ops.get_conn = NullConn
+        telemetry_writer.get_conn = NullConn
+        module.get_conn = NullConn
+        module.get_active_run = self._active_run
+        orders.time = types.SimpleNamespace(sleep=lambda _sec: None)
+        try:
+            yield
+        finally:
+            db_ops.get_conn, telemetry_writer.get_conn, module.get_conn, module.get_active_run, orders.time = saved
+
+    def _seed(self, begin: Dict[str, Any]) -> None:
+        trader = self.trader
+        for attr, value in begin.get("settings", {}).items():
+            setattr(trader.settings, attr, value)
+        if trader.run_id == begin["run_id"] and _normalized(trader_state(trader)) == _normalized(begin["state"]):
+            return
+        trader.run_id = begin["run_id"]
+        trader.initial_balance = begin["initial_balance"]
+        trader.portfolio.load_state(begin["state"]["portfolio"])
+        trader.ledger.load_state(begin["state"]["ledger"])
+        trader.snapshots.reset()
+        if hasattr(trader, "pending_closes"):
+            trader.pending_closes = dict(begin["state"]["pending_orders"])
+            trader.close_generations = dict(begin["state"].get("close_generations", {}))
+
+    def replay(self, tick: Tick) -> Tuple[float, Optional[str]]:
+        """Compute seconds for one tick and the divergence, if any."""
+        begin, inputs, end = tick
+        self._seed(begin.data)
+        self.feed.load(inputs)
+        trader = self.trader
+        error = None
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(self.sink):
+                trader._poll_and_update()
+        except ReplayDivergence as exc:
+            return time.perf_counter() - start, str(exc)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self.sink.seek(0)
+            self.sink.truncate()
+        elapsed = time.perf_counter() - start
+        expected = end.data
+        if (error is None) != (expected["error"] is None):
+            return elapsed, f"error {error!r}, journal has {expected['error']!r}"
+        if self.feed.records:
+            return elapsed, f"{len(self.feed.records)} journaled inputs not consumed, next {self.feed.records[0].name}"
+        if trader.run_id != expected["run_id"]:
+            return elapsed, f"run_id {trader.run_id}, journal has {expected['run_id']}"
+        state = _normalized(trader_state(trader)) if trader.run_id else None
+        if expected["error"] is None and state != _normalized(expected["state"]):
+            return elapsed, "state after the tick differs from the journal"
+        return elapsed, None
+
+
+def _ms(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))] * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a TICK_JOURNAL_DIR journal through the trader, offline")
+    parser.add_argument("journal", help=".tsj file written by a paper or live trader")
+    parser.add_argument("--verbose", action="store_true", help="print every tick")
+    parser.add_argument("--repeat", type=int, default=5, help="benchmark repeats of the whole journal")
+    parser.add_argument("--out", default="", help="write benchmark results JSON here")
+    parser.add_argument("--baseline", default="", help="compare the benchmark against this results JSON")
+    parser.add_argument("--threshold", type=float, default=20.0, help="best-time regression %% that fails the run")
+    args = parser.parse_args()
+
+    ticks = load_ticks(args.journal)
+    if not ticks:
+        raise SystemExit(f"{args.journal}: no complete ticks")
+    mode = ticks[0][0].name
+    replayer = Replayer(mode)
+    diverged = 0
+    compute: List[float] = []
+    with replayer.patched():
+        for i, tick in enumerate(ticks):
+            elapsed, divergence = replayer.replay(tick)
+            compute.append(elapsed)
+            if divergence:
+                diverged += 1
+                print(f"[replay] tick {i} ({datetime.fromtimestamp(tick[0].ts):%H:%M:%S}) diverged: {divergence}")
+            elif args.verbose:
+                print(f"[replay] tick {i} compute={elapsed * 1000:.3f}ms recorded={tick[2].data['tick_ms']:.1f}ms")
+
+        recorded = [tick[2].data["tick_ms"] / 1000.0 for tick in ticks]
+        print(
+            f"[replay] {mode}: {len(ticks)} ticks, {diverged} diverged;",
+            f"compute p50={_ms(compute, 50):.3f}ms p99={_ms(compute, 99):.3f}ms max={_ms(compute, 100):.3f}ms;",
+            f"recorded (incl. I/O) p50={_ms(recorded, 50):.1f}ms",
+        )
+
+        bench = Bench(repeat=args.repeat)
+
+        def replay_all() -> None:
+            # Every pass reseeds from the first tick, so passes are identical
+            replayer.trader.run_id = None
+            for tick in ticks:
+                replayer.replay(tick)
+
+        bench.run(f"replay.{mode}.poll_and_update[{len(ticks)} ticks]", replay_all, number=1)
+
+    if args.out:
+        bench.write(args.out)
+    regressions: List[str] = []
+    if args.baseline:
+        regressions = compare(bench.to_dict(), json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.threshold)
+    if diverged:
+        raise SystemExit(f"{diverged} tick(s) diverged from the journal")
+    if regressions:
+        raise SystemExit(f"replay regressed more than {args.threshold:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
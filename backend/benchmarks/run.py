@@ -0,0 +1,249 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.benchmarks.harness import Bench, NullConn, compare
+from backend.benchmarks.synthetic import drift_tickers, make_contracts, make_run_history, make_tickers
+from backend.common import paper_trader
+from backend.common.bitget_symbols import filter_top_gainers
+from backend.common.config import paper_settings, settings
+from backend.common.strategy import StrategyEngine
+
+
+SAMPLE_PATH = Path(__file__).resolve().parents[2] / "sample_output.json"
+
+
+class FakeClient:
+    """In-memory BitgetClient stand-in: fixed contracts, cycles through pre-drifted ticker frames."""
+
+    def __init__(self, tickers: dict, frames: int = 16, seed: int = 11) -> None:
+        rng = random.Random(seed)
+        self.frames = [tickers]
+        for _ in range(frames - 1):
+            self.frames.append(drift_tickers(self.frames[-1], rng))
+        self.contracts = make_contracts(tickers)
+        self._i = 0
+
+    def get_usdt_perp_tickers(self) -> dict:
+        # Frames are built up front so the benchmark does not time the fake
+        self._i = (self._i + 1) % len(self.frames)
+        return self.frames[self._i]
+
+    def get_contracts(self, symbol=None) -> dict:
+        return self.contracts
+
+
+def _load_tickers() -> dict:
+    if SAMPLE_PATH.exists():
+        with SAMPLE_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    return make_tickers()
+
+
+def bench_strategy(bench: Bench) -> None:
+    tickers = _load_tickers()
+    n = len(tickers.get("data", []))
+    engine = StrategyEngine(FakeClient(tickers), paper_settings)
+    bench.run(f"strategy.filter_top_gainers[{n}]", lambda: filter_top_gainers(tickers, top_n=10))
+    bench.run(f"strategy.build_leg_plan_from_tickers[{n}]", lambda: engine.build_leg_plan_from_tickers(tickers))
+
+    big = make_tickers(5000)
+    big_engine = StrategyEngine(FakeClient(big), paper_settings)
+    bench.run("strategy.build_leg_plan_from_tickers[5000]", lambda: big_engine.build_leg_plan_from_tickers(big))
+
+    specs = {"SYN0001USDT": {"minTradeNum": 0.01, "sizeMultiplier": 0.01}}
+    bench.run("strategy.compute_size", lambda: engine.compute_size("SYN0001USDT", 1.2345, specs))
+
+
+def _seed_trader(trader: paper_trader.PaperTrader, tickers: dict, legs: int) -> None:
+    trader.run_id = str(uuid.uuid4())
+    trader.initial_balance = 1000.0
+    trader.lease.token = 1
+    for t in tickers["data"][:legs]:
+        price = float(t["markPrice"])
+        trader.portfolio.open(t["symbol"], price, 300.0 / price, 100.0)
+
+
+def bench_trader(bench: Bench) -> None:
+    # CPU path of one paper tick: DB calls are swapped for no-ops so only
+    # ticker parsing, PnL, exit evaluation and row building are measured.
+    tickers = make_tickers(540)
+    trader = paper_trader.PaperTrader()
+    trader.client = FakeClient(tickers)
+    trader.engine = StrategyEngine(trader.client, trader.settings)
+    trader.settings.hold_hours = 1e9
+    trader.settings.global_kill_dd_pct = 1e9
+    trader.settings.strategy_tag = "s2"
+    _seed_trader(trader, tickers, legs=10)
+
+    original = (paper_trader.get_conn, paper_trader.get_active_run, paper_trader.notify_change)
+    paper_trader.get_conn = NullConn
+    paper_trader.get_active_run = lambda mode=None: None
+    paper_trader.notify_change = lambda mode, cur=None: None
+    sink = io.StringIO()
+
+    def tick() -> None:
+        with contextlib.redirect_stdout(sink):
+            trader._poll_and_update()
+        sink.seek(0)
+        sink.truncate()
+
+    try:
+        bench.run("trader.poll_and_update[10 legs, no db]", tick)
+    finally:
+        paper_trader.get_conn, paper_trader.get_active_run, paper_trader.notify_change = original
+
+
+def _seed_history(history: dict) -> None:
+    from backend.common.db import get_conn
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                insert into runs (run_id, exchange, mode, entry_time_utc, start_ts, end_ts, status, strategy_tag,
+                                  num_legs, margin_per_leg_usdt, leverage, max_pump_pct, global_kill_dd_pct,
+                                  initial_balance, current_balance, notes)
+                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'bench-seed')
+                on conflict (run_id) do nothing
+                """,
+                history["runs"],
+            )
+            cur.executemany(
+                """
+                insert into legs (run_id, symbol, side, entry_price, entry_ts, qty, exit_price, exit_ts,
+                                  exit_reason, status)
+                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                on conflict (run_id, symbol) do nothing
+                """,
+                history["legs"],
+            )
+            with cur.copy(
+                """
+                copy snapshots (ts, run_id, exchange, symbol, price, unrealized_pnl_usdt,
+                                entry_price, position_size, margin_usdt, leverage) from stdin
+                """
+            ) as copy:
+                for row in history["snapshots"]:
+                    copy.write_row(row)
+        conn.commit()
+
+
+def _drop_history() -> None:
+    from backend.common.db import get_conn
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("delete from runs where notes = 'bench-seed'")
+        conn.commit()
+
+
+def bench_db(bench: Bench) -> None:
+    from backend.common.db import get_conn
+
+    history = make_run_history(n_runs=1, legs_per_run=10, ticks_per_run=1)
+    _seed_history(history)
+    try:
+        run_id = history["runs"][0][0]
+        rows = [row[:1] + (run_id,) + row[2:] for row in history["snapshots"]]
+
+        def per_row() -> None:
+            for row in rows:
+                with get_conn() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            """
+                            insert into snapshots (ts, run_id, exchange, symbol, price, unrealized_pnl_usdt,
+                                                   entry_price, position_size, margin_usdt, leverage)
+                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            """,
+                            row,
+                        )
+                    conn.commit()
+
+        def batched() -> None:
+            with get_conn() as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(
+                        """
+                        insert into snapshots (ts, run_id, exchange, symbol, price, unrealized_pnl_usdt,
+                                               entry_price, position_size, margin_usdt, leverage)
+                        values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """,
+                        rows,
+                    )
+                conn.commit()
+
+        bench.run("db.snapshots_per_row[10]", per_row, number=20)
+        bench.run("db.snapshots_batched[10]", batched, number=20)
+    finally:
+        _drop_history()
+
+
+def bench_api(bench: Bench) -> None:
+    from fastapi.testclient import TestClient
+
+    from backend.api.main import app
+
+    _seed_history(make_run_history())
+    try:
+        with TestClient(app) as client:
+            for path in ("/reports/runs?limit=200", "/reports/aggregate", "/snapshots/series?mode=paper&points=500"):
+
+                def call(path: str = path) -> None:
+                    resp = client.get(path)
+                    resp.raise_for_status()
+
+                bench.run(f"api.{path.split('?', 1)[0]}", call, number=10)
+    finally:
+        _drop_history()
+
+
+SUITES = {
+    "strategy": (bench_strategy, False),
+    "trader": (bench_trader, False),
+    "db": (bench_db, True),
+    "api": (bench_api, True),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Strategy/trader/DB/API micro-benchmarks")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="repeatable; default all")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default="", help="write results JSON here")
+    parser.add_argument("--baseline", default="", help="compare against this results JSON (same host only)")
+    parser.add_argument("--threshold", type=float, default=20.0, help="best-time regression %% that fails the run")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite --baseline with this run")
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs --baseline")
+
+    bench = Bench(repeat=args.repeat)
+    for name in args.suite or list(SUITES):
+        fn, needs_db = SUITES[name]
+        if needs_db and not settings.database_url:
+            bench.skip(name, "DATABASE_URL is not set")
+            continue
+        fn(bench)
+
+    if args.out:
+        bench.write(args.out)
+    if args.save_baseline:
+        bench.write(args.baseline)
+        return
+    if args.baseline:
+        regressions = compare(bench.to_dict(), json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} benchmark(s) regressed more than {args.threshold:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
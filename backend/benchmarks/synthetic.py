@@ -0,0 +1,79 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+
+def make_tickers(n_symbols: int = 540, seed: int = 7) -> Dict[str, Any]:
+    # Same shape as sample_output.json (Bitget v2 mix tickers)
+    rng = random.Random(seed)
+    data = []
+    for i in range(n_symbols):
+        price = 10 ** rng.uniform(-4, 5)
+        change = rng.uniform(-0.4, 0.9)
+        data.append(
+            {
+                "symbol": f"SYN{i:04d}USDT",
+                "lastPr": f"{price:.8g}",
+                "askPr": f"{price * 1.0001:.8g}",
+                "bidPr": f"{price * 0.9999:.8g}",
+                "change24h": f"{change:.5f}",
+                "usdtVolume": f"{rng.uniform(1e4, 1e9):.2f}",
+                "fundingRate": f"{rng.uniform(-0.001, 0.001):.6f}",
+                "markPrice": f"{price * rng.uniform(0.999, 1.001):.8g}",
+                "ts": "1769459702243",
+            }
+        )
+    return {"code": "00000", "msg": "success", "requestTime": 1769459702242, "data": data}
+
+
+def make_contracts(tickers: Dict[str, Any], seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    data = []
+    for t in tickers["data"]:
+        step = rng.choice([0.001, 0.01, 0.1, 1, 10, 100])
+        data.append({"symbol": t["symbol"], "minTradeNum": str(step), "sizeMultiplier": str(step)})
+    return {"code": "00000", "msg": "success", "data": data}
+
+
+def drift_tickers(tickers: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    # Next tick: small random walk on mark prices
+    data = []
+    for t in tickers["data"]:
+        mark = float(t["markPrice"]) * (1 + rng.gauss(0, 0.002))
+        data.append({**t, "markPrice": f"{mark:.8g}", "lastPr": f"{mark:.8g}"})
+    return {**tickers, "data": data}
+
+
+def make_run_history(
+    n_runs: int = 30, legs_per_run: int = 10, ticks_per_run: int = 288, seed: int = 7
+) -> Dict[str, List[tuple]]:
+    """Rows for runs, legs and snapshots (5-minute ticks), ready for executemany."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 4, 0, tzinfo=timezone.utc)
+    runs, legs, snapshots = [], [], []
+    for r in range(n_runs):
+        run_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        run_start = start + timedelta(days=r)
+        run_end = run_start + timedelta(minutes=5 * ticks_per_run)
+        pnl_total = 0.0
+        for leg in range(legs_per_run):
+            symbol = f"SYN{leg:04d}USDT"
+            entry = 10 ** rng.uniform(-2, 3)
+            qty = 300.0 / entry
+            mark = entry
+            for tick in range(ticks_per_run):
+                mark *= 1 + rng.gauss(-0.0003, 0.004)
+                pnl = (entry - mark) * qty
+                snapshots.append(
+                    (run_start + timedelta(minutes=5 * tick), run_id, "bitget", symbol, mark, pnl, entry, qty, 100.0, 3.0)
+                )
+            pnl_total += (entry - mark) * qty
+            legs.append((run_id, symbol, "short", entry, run_start, qty, mark, run_end, "24h", "closed"))
+        runs.append(
+            (
+                run_id, "bitget", "paper", "04:00", run_start, run_end, "completed", "S1",
+                legs_per_run, 100.0, 3.0, 0.15, 0.30, 1000.0, 1000.0 + pnl_total,
+            )
+        )
+    return {"runs": runs, "legs": legs, "snapshots": snapshots}
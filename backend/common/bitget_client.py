@@ -2,21 +2,85 @@ import base64
 import hashlib
 import hmac
 import json
+import threading
 import time
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict
 from urllib.parse import urlencode
 
 import httpx
 
 from .config import settings
+from .metrics import BITGET_REQUEST_ERRORS, BITGET_REQUEST_SECONDS, BITGET_RESPONSE_BYTES, TICKER_CACHE
+from .rate_limit import (
+    PRIORITY_CLOSE,
+    PRIORITY_OPEN,
+    PRIORITY_POLL,
+    RequestScheduler,
+    default_scheduler,
+    endpoint_family,
+    parse_retry_after,
+)
+from .tracing import span
+
+
+class BitgetAPIError(RuntimeError):
+    """Non-2xx response from Bitget (status_code) with its error code when the body has one."""
+
+    def __init__(self, status_code: int, path: str, detail: str, code: Optional[str] = None) -> None:
+        super().__init__(f"Bitget API error {status_code} {path}: {detail}")
+        self.status_code = status_code
+        self.code = code
+
+    @property
+    def transient(self) -> bool:
+        # Worth retrying: throttled or exchange-side failure
+        return self.status_code == 429 or self.status_code >= 500
+
+
+class TickerCache:
+    """Process-wide tickers response shared by every engine in one process.
+
+    Paper and live (and their strategy selection) all poll the same public
+    tickers endpoint; inside the supervisor they reuse one response for up to
+    ttl_sec instead of each downloading the full payload. Concurrent callers
+    wait for the in-flight fetch rather than issuing their own. The cached
+    response is shared, so callers must treat it as read-only.
+    """
+
+    def __init__(self, ttl_sec: float) -> None:
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._fetched_at = 0.0
+        self._value: Any = None
+
+    def get(self, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            if self._value is not None and time.monotonic() - self._fetched_at < self.ttl_sec:
+                TICKER_CACHE.inc(outcome="hit")
+                return self._value
+            TICKER_CACHE.inc(outcome="miss")
+            value = fetch()
+            self._value = value
+            self._fetched_at = time.monotonic()
+            return value
 
 
 class BitgetClient:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        http: Optional[httpx.Client] = None,
+        ticker_cache: Optional[TickerCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ) -> None:
         self.base_url = settings.bitget_base_url.rstrip("/")
         self.api_key = settings.bitget_api_key
         self.api_secret = settings.bitget_api_secret
         self.api_passphrase = settings.bitget_api_passphrase
+        # Shared keep-alive session (supervisor); None = one short-lived client per request
+        self.http = http
+        self.ticker_cache = ticker_cache
+        # Rate-limit buckets are per process by default, shared by every client instance
+        self.scheduler = scheduler or default_scheduler()
 
     def _timestamp(self) -> str:
         # Bitget expects milliseconds as a string
@@ -43,29 +107,72 @@ class BitgetClient:
         return headers
 
     def _request(
-        self, method: str, path: str, params: Optional[Dict[str, Any]] = None, body: Optional[Dict[str, Any]] = None
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        priority: int = PRIORITY_POLL,
     ) -> Any:
         url = f"{self.base_url}{path}"
         params = params or {}
         body = body or {}
         body_str = json.dumps(body) if body else ""
         query_str = urlencode(params, doseq=True)
-        ts = self._timestamp()
-        sign = self._sign(ts, method, path, query_str, body_str)
-        headers = self._headers(ts, sign)
+        family = endpoint_family(path)
 
-        with httpx.Client(timeout=10.0) as client:
-            response = client.request(method, url, params=params, content=body_str, headers=headers)
+        with span("bitget.request", method=method, path=path) as req_span:
+            attempt = 0
+            while True:
+                queued = self.scheduler.acquire(family, priority)
+                # Sign after queueing so ACCESS-TIMESTAMP is fresh
+                ts = self._timestamp()
+                sign = self._sign(ts, method, path, query_str, body_str)
+                headers = self._headers(ts, sign)
+                start = time.perf_counter()
+                try:
+                    if self.http is not None:
+                        response = self.http.request(method, url, params=params, content=body_str, headers=headers)
+                    else:
+                        with httpx.Client(timeout=10.0) as client:
+                            response = client.request(method, url, params=params, content=body_str, headers=headers)
+                except httpx.HTTPError:
+                    BITGET_REQUEST_ERRORS.inc(method=method, endpoint=path)
+                    raise
+                finally:
+                    BITGET_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, endpoint=path)
+                if response.status_code != 429 or attempt >= settings.bitget_max_retries_429:
+                    break
+                # Rejected before execution, so even orders are safe to resend once the family reopens
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                print(f"[bitget] 429 on {path}; retrying in {retry_after:.1f}s")
+                self.scheduler.rate_limited(family, retry_after)
+                attempt += 1
+            BITGET_RESPONSE_BYTES.observe(len(response.content), endpoint=path)
+            req_span.set("status_code", response.status_code)
+            req_span.set("bytes", len(response.content))
+            req_span.set("queued_ms", round(queued * 1000, 3))
+            req_span.set("retries_429", attempt)
             try:
                 response.raise_for_status()
             except httpx.HTTPStatusError as exc:
+                BITGET_REQUEST_ERRORS.inc(method=method, endpoint=path)
                 detail = response.text
-                raise RuntimeError(f"Bitget API error {response.status_code} {path}: {detail}") from exc
-            return response.json()
+                try:
+                    code = response.json().get("code")
+                except ValueError:
+                    code = None
+                raise BitgetAPIError(response.status_code, path, detail, code) from exc
+        return response.json()
 
     # Market data
     def get_usdt_perp_tickers(self) -> Any:
         # All USDT-M perpetual tickers (24h stats)
+        if self.ticker_cache is not None:
+            return self.ticker_cache.get(self._fetch_tickers)
+        return self._fetch_tickers()
+
+    def _fetch_tickers(self) -> Any:
         return self._request("GET", "/api/v2/mix/market/tickers", params={"productType": "USDT-FUTURES"})
 
     def get_contracts(self, symbol: Optional[str] = None) -> Any:
@@ -74,6 +181,14 @@ class BitgetClient:
             params["symbol"] = symbol
         return self._request("GET", "/api/v2/mix/market/contracts", params=params)
 
+    def get_funding_rate_history(self, symbol: str, page_size: int = 10) -> Any:
+        # Settled funding rates, newest first (fundingTime in ms)
+        return self._request(
+            "GET",
+            "/api/v2/mix/market/history-fund-rate",
+            params={"symbol": symbol, "productType": "USDT-FUTURES", "pageSize": str(page_size)},
+        )
+
     # Account/position data
     def get_positions(self, symbol: Optional[str] = None) -> Any:
         params = {"productType": "USDT-FUTURES"}
@@ -96,9 +211,11 @@ class BitgetClient:
         trade_side: Optional[str] = None,
         reduce_only: Optional[str] = None,
         margin_mode: Optional[str] = "crossed",
+        client_oid: Optional[str] = None,
     ) -> Any:
         # side: buy | sell
         # trade_side: open | close (required in hedge mode)
+        # client_oid: our idempotency key; Bitget rejects a second order with the same one
         body = {
             "symbol": symbol,
             "marginCoin": margin_coin,
@@ -113,9 +230,31 @@ class BitgetClient:
             body["tradeSide"] = trade_side
         if reduce_only:
             body["reduceOnly"] = reduce_only
-        return self._request("POST", "/api/v2/mix/order/place-order", body=body)
+        if client_oid:
+            body["clientOid"] = client_oid
+        # Closing orders jump the queue ahead of entries and polling
+        closing = trade_side == "close" or str(reduce_only).upper() == "YES"
+        priority = PRIORITY_CLOSE if closing else PRIORITY_OPEN
+        return self._request("POST", "/api/v2/mix/order/place-order", body=body, priority=priority)
 
-    def close_position_market(self, symbol: str, size: str, position_side: str, margin_coin: str = "USDT") -> Any:
+    def get_order_detail(
+        self,
+        symbol: str,
+        client_oid: Optional[str] = None,
+        order_id: Optional[str] = None,
+        priority: int = PRIORITY_OPEN,
+    ) -> Any:
+        # Unknown orders come back as HTTP 400 (code 40109)
+        params = {"symbol": symbol, "productType": "USDT-FUTURES"}
+        if client_oid:
+            params["clientOid"] = client_oid
+        if order_id:
+            params["orderId"] = order_id
+        return self._request("GET", "/api/v2/mix/order/detail", params=params, priority=priority)
+
+    def close_position_market(
+        self, symbol: str, size: str, position_side: str, margin_coin: str = "USDT", client_oid: Optional[str] = None
+    ) -> Any:
         # position_side: long | short
         # Hedge mode close: side matches the position direction
         side = "buy" if position_side == "long" else "sell"
@@ -127,6 +266,7 @@ class BitgetClient:
             order_type="market",
             trade_side="close",
             margin_mode="crossed",
+            client_oid=client_oid,
         )
 
     def set_leverage(
@@ -148,4 +288,4 @@ class BitgetClient:
         if hold_side:
             body["holdSide"] = hold_side
         print(f"[bitget] set-leverage request body={body}")
-        return self._request("POST", "/api/v2/mix/account/set-leverage", body=body)
+        return self._request("POST", "/api/v2/mix/account/set-leverage", body=body, priority=PRIORITY_OPEN)
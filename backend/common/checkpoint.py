@@ -0,0 +1,77 @@
+import time
+from typing import Any, Dict, Optional
+
+from .db_ops import delete_checkpoint, get_checkpoint, get_open_legs, insert_event, save_checkpoint
+from .pnl import PnlLedger
+from .portfolio import Portfolio
+
+
+CHECKPOINT_VERSION = 1
+
+
+class TraderCheckpoint:
+    """Full trader state in one trader_checkpoints row per mode.
+
+    The row is upserted with each tick's DB batch, so it always matches the legs,
+    orders and snapshots that tick committed. A restart reads one row instead of
+    rebuilding from legs, and keeps per-leg trailing max (s3), realized PnL,
+    fee/funding periods, pending orders and close clientOid generations, so
+    trading decisions carry on unchanged. The checkpoint is only used when its
+    open legs match the DB's; otherwise (crash mid close-all, manual edits) the
+    trader rebuilds from legs.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.seq = 0
+
+    def build(
+        self,
+        run_id: str,
+        portfolio: Portfolio,
+        ledger: PnlLedger,
+        pending_orders: Optional[Dict[str, Any]] = None,
+        close_generations: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, Any]:
+        self.seq += 1
+        return {
+            "version": CHECKPOINT_VERSION,
+            "run_id": run_id,
+            "seq": self.seq,
+            "saved_at": time.time(),
+            "portfolio": portfolio.to_state(),
+            "ledger": ledger.to_state(),
+            "pending_orders": pending_orders or {},
+            "close_generations": close_generations or {},
+        }
+
+    def save(self, state: Dict[str, Any], cur=None) -> None:
+        save_checkpoint(self.mode, state["run_id"], state["seq"], state, cur)
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = get_checkpoint(self.mode)
+        if not row:
+            return None
+        ck_run_id, seq, state = row
+        if ck_run_id != run_id or state.get("version") != CHECKPOINT_VERSION:
+            return None
+        db_open = {r[0] for r in get_open_legs(run_id)}
+        ck_open = set(state["portfolio"]["legs"])
+        if db_open != ck_open:
+            insert_event(
+                "warn",
+                f"{self.mode}_checkpoint_mismatch",
+                f"checkpoint seq={seq} open={sorted(ck_open)} db open={sorted(db_open)}; rebuilding from legs",
+                run_id,
+            )
+            return None
+        self.seq = seq
+        return state
+
+    def restore(self, state: Dict[str, Any], portfolio: Portfolio, ledger: PnlLedger) -> None:
+        portfolio.load_state(state["portfolio"])
+        ledger.load_state(state["ledger"])
+
+    def clear(self) -> None:
+        delete_checkpoint(self.mode)
+        self.seq = 0
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from dotenv import load_dotenv
 
@@ -35,6 +35,15 @@ class GlobalSettings:
         self.strategy_tag = getenv("STRATEGY_TAG", "S1")
         self.paper_initial_balance = float(getenv("PAPER_INITIAL_BALANCE", "1000"))
         self.hold_hours = float(getenv("HOLD_HOURS", "24"))
+        # Bitget USDT-M taker fee (market orders); used for fee-aware PnL
+        self.taker_fee_rate = float(getenv("TAKER_FEE_RATE", "0.0006"))
+        # Snapshot deadband: persist a leg when price moves this much, PnL moves this much,
+        # or this long passed since its last row (all 0 = every leg every poll)
+        self.snapshot_min_move_bps = float(getenv("SNAPSHOT_MIN_MOVE_BPS", "10"))
+        self.snapshot_pnl_step_usdt = float(getenv("SNAPSHOT_PNL_STEP_USDT", "0"))
+        self.snapshot_max_interval_sec = float(getenv("SNAPSHOT_MAX_INTERVAL_SEC", "300"))
+        # Traders warm up (contracts, candidates, leverage, connections) this long before entry time
+        self.entry_warmup_sec = float(getenv("ENTRY_WARMUP_SEC", "180"))
 
         # Secrets / infra
         self.bitget_api_key = getenv("BITGET_API_KEY", "")
@@ -42,10 +51,38 @@ class GlobalSettings:
         self.bitget_api_passphrase = getenv("BITGET_API_PASSPHRASE", "")
         self.bitget_base_url = getenv("BITGET_BASE_URL", "https://api.bitget.com")
         self.bitget_hold_side = getenv("BITGET_HOLD_SIDE", "")
+        # Fraction of Bitget's documented per-endpoint rate limits to use (0 = no client-side limiting)
+        self.bitget_rate_limit_scale = float(getenv("BITGET_RATE_LIMIT_SCALE", "0.8"))
+        self.bitget_max_retries_429 = int(getenv("BITGET_MAX_RETRIES_429", "3"))
+        # Live order submission retries on timeouts/5xx (each retry checks clientOid first)
+        self.order_max_attempts = int(getenv("ORDER_MAX_ATTEMPTS", "5"))
+        self.order_retry_base_sec = float(getenv("ORDER_RETRY_BASE_SEC", "0.5"))
+        self.order_retry_max_sec = float(getenv("ORDER_RETRY_MAX_SEC", "8"))
 
         self.database_url = getenv("DATABASE_URL", "")
+        self.db_pool_min_size = int(getenv("DB_POOL_MIN_SIZE", "2"))
+        self.db_pool_max_size = int(getenv("DB_POOL_MAX_SIZE", "10"))
         self.api_port = int(getenv("API_PORT", "8000"))
         self.worker_heartbeat_sec = int(getenv("WORKER_HEARTBEAT_SEC", "60"))
+        # service_status is upserted every tick; heartbeats keeps one row per service per
+        # HEARTBEAT_LOG_SEC in a ring of HEARTBEAT_LOG_SLOTS (default 24h)
+        self.heartbeat_log_sec = int(getenv("HEARTBEAT_LOG_SEC", "300"))
+        self.heartbeat_log_slots = int(getenv("HEARTBEAT_LOG_SLOTS", "288"))
+        self.service_stale_sec = float(getenv("SERVICE_STALE_SEC", "120"))
+        self.app_version = getenv("APP_VERSION") or getenv("RAILWAY_GIT_COMMIT_SHA", "")[:12]
+        # Leader leases (worker + one trader per mode); a standby takes over within ttl + retry
+        self.worker_id = getenv("WORKER_ID", "")
+        self.lease_ttl_sec = float(getenv("LEASE_TTL_SEC", "90"))
+        self.lease_retry_sec = float(getenv("LEASE_RETRY_SEC", "5"))
+        # Single-process supervisor (backend/worker/supervisor.py)
+        self.supervisor_engines = [
+            name.strip() for name in getenv("SUPERVISOR_ENGINES", "worker,paper,live").split(",") if name.strip()
+        ]
+        self.supervisor_metrics_port = int(getenv("SUPERVISOR_METRICS_PORT", "0"))
+        self.ticker_cache_ttl_sec = float(getenv("TICKER_CACHE_TTL_SEC", "2"))
+        # Upper bound on API cache staleness when change notifications are unavailable
+        self.api_cache_ttl_sec = float(getenv("API_CACHE_TTL_SEC", "15"))
+        self.reports_use_matview = getenv("REPORTS_USE_MATVIEW", "false").lower() == "true"
 
 
 class RuntimeSettings:
@@ -63,6 +100,15 @@ class RuntimeSettings:
         self.poll_interval_sec = int(getenv(f"{prefix}_POLL_INTERVAL_SEC", str(base.poll_interval_sec)))
         self.strategy_tag = getenv(f"{prefix}_STRATEGY_TAG", base.strategy_tag)
         self.hold_hours = float(getenv(f"{prefix}_HOLD_HOURS", str(base.hold_hours)))
+        self.snapshot_min_move_bps = float(getenv(f"{prefix}_SNAPSHOT_MIN_MOVE_BPS", str(base.snapshot_min_move_bps)))
+        self.snapshot_pnl_step_usdt = float(getenv(f"{prefix}_SNAPSHOT_PNL_STEP_USDT", str(base.snapshot_pnl_step_usdt)))
+        self.snapshot_max_interval_sec = float(
+            getenv(f"{prefix}_SNAPSHOT_MAX_INTERVAL_SEC", str(base.snapshot_max_interval_sec))
+        )
+        # 0 disables the trader's /metrics listener
+        self.metrics_port = int(getenv(f"{prefix}_METRICS_PORT", "0"))
+        # Set via the settings table to cProfile the next N ticks
+        self.profile_ticks = 0
         initial_balance_env = os.getenv(f"{prefix}_INITIAL_BALANCE")
         if initial_balance_env is not None and initial_balance_env != "":
             self.initial_balance = float(initial_balance_env)
@@ -72,30 +118,55 @@ class RuntimeSettings:
             self.initial_balance = None
 
     def apply_overrides(self, overrides: dict[str, str]) -> None:
-        # Keys use ENV-style names without prefix, stored in DB.
-        mapping = {
-            "STATUS": ("status", str),
-            "ENTRY_TIME_UTC": ("entry_time_utc", str),
-            "TRADE_WEEKENDS": ("trade_weekends", lambda v: str(v).lower() == "true"),
-            "NUM_LEGS": ("num_legs", int),
-            "MARGIN_PER_LEG_USDT": ("margin_per_leg_usdt", float),
-            "LEVERAGE": ("leverage", float),
-            "MAX_PUMP_PCT": ("max_pump_pct", float),
-            "GLOBAL_KILL_DD_PCT": ("global_kill_dd_pct", float),
-            "POLL_INTERVAL_SEC": ("poll_interval_sec", int),
-            "STRATEGY_TAG": ("strategy_tag", str),
-            "HOLD_HOURS": ("hold_hours", float),
-            "INITIAL_BALANCE": ("initial_balance", float),
-        }
-        for key, value in overrides.items():
-            if key not in mapping:
-                continue
-            attr, caster = mapping[key]
-            try:
-                setattr(self, attr, caster(value))
-            except Exception:
-                continue
+        # Keys use ENV-style names without prefix, stored in DB; invalid values are skipped
+        typed, _errors = parse_overrides(overrides)
+        self.apply_typed(typed)
 
+    def apply_typed(self, typed: dict[str, Any]) -> None:
+        # Output of parse_overrides (attribute -> value)
+        for attr, value in typed.items():
+            setattr(self, attr, value)
+
+
+# DB settings key -> (RuntimeSettings attribute, parser)
+OVERRIDE_FIELDS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "STATUS": ("status", str),
+    "ENTRY_TIME_UTC": ("entry_time_utc", str),
+    "TRADE_WEEKENDS": ("trade_weekends", lambda v: str(v).lower() == "true"),
+    "NUM_LEGS": ("num_legs", int),
+    "MARGIN_PER_LEG_USDT": ("margin_per_leg_usdt", float),
+    "LEVERAGE": ("leverage", float),
+    "MAX_PUMP_PCT": ("max_pump_pct", float),
+    "GLOBAL_KILL_DD_PCT": ("global_kill_dd_pct", float),
+    "POLL_INTERVAL_SEC": ("poll_interval_sec", int),
+    "STRATEGY_TAG": ("strategy_tag", str),
+    "HOLD_HOURS": ("hold_hours", float),
+    "INITIAL_BALANCE": ("initial_balance", float),
+    "PROFILE_TICKS": ("profile_ticks", int),
+    "SNAPSHOT_MIN_MOVE_BPS": ("snapshot_min_move_bps", float),
+    "SNAPSHOT_PNL_STEP_USDT": ("snapshot_pnl_step_usdt", float),
+    "SNAPSHOT_MAX_INTERVAL_SEC": ("snapshot_max_interval_sec", float),
+}
+
+
+def parse_overrides(overrides: dict[str, str]) -> tuple[dict[str, Any], dict[str, str]]:
+    """Typed values (attribute -> value) for known keys, plus key -> error for values that don't parse.
+
+    Unknown keys are ignored. Run once per settings change (SettingsStore, PUT /settings),
+    not per tick.
+    """
+    typed: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    for key, value in overrides.items():
+        field = OVERRIDE_FIELDS.get(key)
+        if field is None:
+            continue
+        attr, caster = field
+        try:
+            typed[attr] = caster(value)
+        except (TypeError, ValueError) as exc:
+            errors[key] = str(exc)
+    return typed, errors
 
 settings = GlobalSettings()
 paper_settings = RuntimeSettings("PAPER", "paper", settings)
@@ -1,14 +1,76 @@
-from contextlib import contextmanager
-from typing import Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
 
 import psycopg
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
 from .config import settings
 
 
+_async_pool: Optional[AsyncConnectionPool] = None
+# Opened by the supervisor so its engines share connections; standalone services connect per call
+_pool: Optional[ConnectionPool] = None
+
+
+def open_pool() -> ConnectionPool:
+    global _pool
+    if not settings.database_url:
+        raise RuntimeError("DATABASE_URL is not set")
+    if _pool is None:
+        _pool = ConnectionPool(
+            settings.database_url,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            open=False,
+        )
+        _pool.open()
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
 @contextmanager
 def get_conn() -> Iterator[psycopg.Connection]:
     if not settings.database_url:
         raise RuntimeError("DATABASE_URL is not set")
+    if _pool is not None:
+        with _pool.connection() as conn:
+            yield conn
+        return
     with psycopg.connect(settings.database_url) as conn:
         yield conn
+
+
+async def open_async_pool() -> AsyncConnectionPool:
+    global _async_pool
+    if not settings.database_url:
+        raise RuntimeError("DATABASE_URL is not set")
+    if _async_pool is None:
+        _async_pool = AsyncConnectionPool(
+            settings.database_url,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            open=False,
+        )
+        await _async_pool.open()
+    return _async_pool
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+@asynccontextmanager
+async def get_async_conn() -> AsyncIterator[psycopg.AsyncConnection]:
+    if _async_pool is None:
+        raise RuntimeError("DATABASE_URL is not set" if not settings.database_url else "async DB pool is not open")
+    async with _async_pool.connection() as conn:
+        yield conn
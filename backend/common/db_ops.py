@@ -1,11 +1,24 @@
 from typing import Optional
 
 import psycopg
+from psycopg.types.json import Jsonb
 
 from .db import get_conn
+from .metrics import timed_db
+from .tracing import traced
 from .time_utils import now_utc
 
 
+def db_call(fn):
+    # DB time per function for /metrics, plus a trace span when tracing is on
+    return timed_db(traced(f"db.{fn.__name__}")(fn))
+
+
+# Postgres NOTIFY channel the API listens on to invalidate its response cache
+CHANGE_CHANNEL = "scammer_changes"
+# Transaction advisory lock held while run_report_series refreshes, so the API can refuse overlapping refreshes
+REPORT_REFRESH_LOCK_KEY = 7_412_019_046
+
 class RunRow:
     def __init__(self, run_id: str, status: str, start_ts: str, end_ts: Optional[str]) -> None:
         self.run_id = run_id
@@ -14,6 +27,7 @@ class RunRow:
         self.end_ts = end_ts
 
 
+@db_call
 def get_latest_run(mode: Optional[str] = None) -> Optional[RunRow]:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -43,6 +57,7 @@ def get_latest_run(mode: Optional[str] = None) -> Optional[RunRow]:
             return RunRow(row[0], row[1], row[2], row[3])
 
 
+@db_call
 def get_active_run(mode: Optional[str] = None) -> Optional[RunRow]:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -73,6 +88,7 @@ def get_active_run(mode: Optional[str] = None) -> Optional[RunRow]:
             return RunRow(row[0], row[1], row[2], row[3])
 
 
+@db_call
 def get_open_legs(run_id: str) -> list[tuple[str, float, float]]:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -87,12 +103,14 @@ def get_open_legs(run_id: str) -> list[tuple[str, float, float]]:
             return cur.fetchall()
 
 
+@db_call
 def get_legs(run_id: str) -> list[tuple]:
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
-                select symbol, entry_price, exit_price, qty, status, exit_ts::text
+                select symbol, entry_price, exit_price, qty, status, exit_ts::text,
+                       coalesce(fees_usdt, 0), coalesce(funding_usdt, 0), coalesce(max_favorable_pnl_usdt, 0)
                 from legs
                 where run_id = %s
                 order by symbol asc
@@ -102,6 +120,7 @@ def get_legs(run_id: str) -> list[tuple]:
             return cur.fetchall()
 
 
+@db_call
 def get_run_balances(run_id: str) -> tuple[Optional[float], Optional[float]]:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -119,6 +138,7 @@ def get_run_balances(run_id: str) -> tuple[Optional[float], Optional[float]]:
             return (float(row[0]) if row[0] is not None else None, float(row[1]) if row[1] is not None else None)
 
 
+@db_call
 def create_run(
     run_id: str,
     exchange: str,
@@ -132,7 +152,8 @@ def create_run(
     strategy_tag: str,
     initial_balance: Optional[float] = None,
     current_balance: Optional[float] = None,
-) -> None:
+) -> bool:
+    # False when the mode already has an active run (idx_runs_active_mode); check and insert are one statement
     now = now_utc()
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -142,6 +163,8 @@ def create_run(
                                   margin_per_leg_usdt, leverage, max_pump_pct, global_kill_dd_pct, strategy_tag,
                                   initial_balance, current_balance)
                 values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                on conflict (mode) where end_ts is null and status in ('running', 'paused') do nothing
+                returning run_id
                 """,
                 (
                     run_id,
@@ -160,9 +183,12 @@ def create_run(
                     current_balance,
                 ),
             )
+            created = cur.fetchone() is not None
         conn.commit()
+    return created
 
 
+@db_call
 def update_run_status(run_id: str, status: str) -> None:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -175,6 +201,7 @@ def update_run_status(run_id: str, status: str) -> None:
         conn.commit()
 
 
+@db_call
 def update_run_balance(run_id: str, initial_balance: Optional[float] = None, current_balance: Optional[float] = None) -> None:
     if initial_balance is None and current_balance is None:
         return
@@ -201,6 +228,7 @@ def update_run_balance(run_id: str, initial_balance: Optional[float] = None, cur
         conn.commit()
 
 
+@db_call
 def end_run(run_id: str) -> None:
     now = now_utc()
     with get_conn() as conn:
@@ -214,6 +242,16 @@ def end_run(run_id: str) -> None:
         conn.commit()
 
 
+@db_call
+def refresh_report_series() -> None:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("select pg_advisory_xact_lock(%s)", (REPORT_REFRESH_LOCK_KEY,))
+            cur.execute("refresh materialized view concurrently run_report_series")
+        conn.commit()
+
+
+@db_call
 def insert_event(level: str, event_type: str, message: str, run_id: Optional[str] = None) -> None:
     now = now_utc()
     with get_conn() as conn:
@@ -228,6 +266,7 @@ def insert_event(level: str, event_type: str, message: str, run_id: Optional[str
         conn.commit()
 
 
+@db_call
 def get_settings(mode: str) -> dict[str, str]:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -243,6 +282,34 @@ def get_settings(mode: str) -> dict[str, str]:
             return {r[0]: r[1] for r in rows}
 
 
+@db_call
+def get_settings_version(mode: str) -> int:
+    # Primary-key lookup; 0 = settings never written for this mode
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("select version from settings_versions where mode = %s", (mode,))
+            row = cur.fetchone()
+            return int(row[0]) if row else 0
+
+
+@db_call
+def get_versioned_settings(mode: str) -> tuple[int, dict[str, str]]:
+    # One statement = one snapshot, so a concurrent write can't pair new rows with an old version
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                select v.version, s.key, s.value
+                from (select coalesce((select version from settings_versions where mode = %(mode)s), 0) as version) v
+                left join settings s on s.mode = %(mode)s
+                """,
+                {"mode": mode},
+            )
+            rows = cur.fetchall()
+            return int(rows[0][0]), {r[1]: r[2] for r in rows if r[1] is not None}
+
+
+@db_call
 def upsert_settings(mode: str, settings_map: dict[str, str]) -> None:
     if not settings_map:
         return
@@ -262,6 +329,7 @@ def upsert_settings(mode: str, settings_map: dict[str, str]) -> None:
         conn.commit()
 
 
+@db_call
 def insert_leg(run_id: str, symbol: str, entry_price: float, qty: float) -> None:
     now = now_utc()
     with get_conn() as conn:
@@ -276,6 +344,7 @@ def insert_leg(run_id: str, symbol: str, entry_price: float, qty: float) -> None
         conn.commit()
 
 
+@db_call
 def upsert_live_leg(run_id: str, symbol: str, entry_price: float, qty: float) -> None:
     now = now_utc()
     with get_conn() as conn:
@@ -301,6 +370,7 @@ def upsert_live_leg(run_id: str, symbol: str, entry_price: float, qty: float) ->
         conn.commit()
 
 
+@db_call
 def update_leg_max(run_id: str, symbol: str, pnl_usdt: float) -> None:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -316,36 +386,50 @@ def update_leg_max(run_id: str, symbol: str, pnl_usdt: float) -> None:
         conn.commit()
 
 
-def update_leg_exit(run_id: str, symbol: str, exit_price: float, reason: str) -> None:
+@db_call
+def update_leg_exit(
+    run_id: str,
+    symbol: str,
+    exit_price: float,
+    reason: str,
+    fees_usdt: Optional[float] = None,
+    funding_usdt: Optional[float] = None,
+) -> None:
     now = now_utc()
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
                 update legs
-                set exit_price = %s, exit_ts = %s, exit_reason = %s, status = 'closed'
+                set exit_price = %s, exit_ts = %s, exit_reason = %s, status = 'closed',
+                    fees_usdt = coalesce(%s, fees_usdt),
+                    funding_usdt = coalesce(%s, funding_usdt)
                 where run_id = %s and symbol = %s
                 """,
-                (exit_price, now, reason, run_id, symbol),
+                (exit_price, now, reason, fees_usdt, funding_usdt, run_id, symbol),
             )
         conn.commit()
 
 
+@db_call
 def insert_order(run_id: str, symbol: str, side: str, action: str,
-                 intent_price: float, fill_price: float, qty: float, status: str) -> None:
+                 intent_price: float, fill_price: float, qty: float, status: str,
+                 client_oid: Optional[str] = None, exchange_order_id: Optional[str] = None) -> None:
     now = now_utc()
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
-                insert into orders (run_id, symbol, side, action, intent_price, fill_price, qty, status, ts)
-                values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                insert into orders (run_id, symbol, side, action, intent_price, fill_price, qty, status, ts,
+                                    client_oid, exchange_order_id)
+                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """,
-                (run_id, symbol, side, action, intent_price, fill_price, qty, status, now),
+                (run_id, symbol, side, action, intent_price, fill_price, qty, status, now, client_oid, exchange_order_id),
             )
         conn.commit()
 
 
+@db_call
 def insert_snapshot(
     run_id: str,
     exchange: str,
@@ -373,6 +457,7 @@ def insert_snapshot(
         conn.commit()
 
 
+@db_call
 def get_latest_command(ts_after: Optional[str] = None) -> Optional[tuple[str, str]]:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -400,3 +485,109 @@ def get_latest_command(ts_after: Optional[str] = None) -> Optional[tuple[str, st
             if not row:
                 return None
             return row[0], row[1]
+
+
+@db_call
+def notify_change(mode: str, cur: Optional[psycopg.Cursor] = None) -> None:
+    # When given a cursor the notification is delivered with that transaction's commit
+    if cur is not None:
+        cur.execute("select pg_notify(%s, %s)", (CHANGE_CHANNEL, mode))
+        return
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("select pg_notify(%s, %s)", (CHANGE_CHANNEL, mode))
+        conn.commit()
+
+
+@db_call
+def get_checkpoint(mode: str) -> Optional[tuple]:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                select run_id::text, seq, state
+                from trader_checkpoints
+                where mode = %s
+                """,
+                (mode,),
+            )
+            return cur.fetchone()
+
+
+@db_call
+def save_checkpoint(mode: str, run_id: str, seq: int, state: dict, cur: Optional[psycopg.Cursor] = None) -> None:
+    # When given a cursor the checkpoint commits atomically with that transaction (the tick batch)
+    sql = """
+        insert into trader_checkpoints (mode, run_id, seq, ts, state)
+        values (%s, %s, %s, %s, %s)
+        on conflict (mode)
+        do update set run_id = excluded.run_id, seq = excluded.seq, ts = excluded.ts, state = excluded.state
+    """
+    params = (mode, run_id, seq, now_utc(), Jsonb(state))
+    if cur is not None:
+        cur.execute(sql, params)
+        return
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+        conn.commit()
+
+
+@db_call
+def delete_checkpoint(mode: str) -> None:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("delete from trader_checkpoints where mode = %s", (mode,))
+        conn.commit()
+
+
+@db_call
+def acquire_lease(name: str, holder: str, ttl_sec: float) -> Optional[int]:
+    # Take or renew the lease; returns its fencing token, or None while another holder's lease is live.
+    # Expiry uses the DB clock so replicas never compare their own clocks.
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                insert into leases (name, holder, token, acquired_ts, renewed_ts, expires_ts)
+                values (%(name)s, %(holder)s, 1, now(), now(), now() + make_interval(secs => %(ttl)s))
+                on conflict (name) do update set
+                    holder = excluded.holder,
+                    token = case when leases.holder = excluded.holder then leases.token else leases.token + 1 end,
+                    acquired_ts = case when leases.holder = excluded.holder then leases.acquired_ts else now() end,
+                    renewed_ts = now(),
+                    expires_ts = excluded.expires_ts
+                where leases.holder = excluded.holder or leases.expires_ts <= now()
+                returning token
+                """,
+                {"name": name, "holder": holder, "ttl": ttl_sec},
+            )
+            row = cur.fetchone()
+        conn.commit()
+    return row[0] if row else None
+
+
+@db_call
+def release_lease(name: str, holder: str) -> None:
+    # Expire now so a standby takes over on its next attempt instead of after the TTL
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "update leases set expires_ts = now() where name = %s and holder = %s",
+                (name, holder),
+            )
+        conn.commit()
+
+
+@db_call
+def lease_valid(name: str, holder: str, token: int, cur: psycopg.Cursor) -> bool:
+    # Fencing check inside a write transaction; locks the lease row until commit
+    cur.execute(
+        """
+        select 1 from leases
+        where name = %s and holder = %s and token = %s and expires_ts > now()
+        for share
+        """,
+        (name, holder, token),
+    )
+    return cur.fetchone() is not None
@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from .config import RuntimeSettings, settings
+from .strategy import StrategyEngine
+from .time_utils import parse_entry_time_utc
+
+
+# A trader (re)started this long after entry time still opens the day's run
+ENTRY_WINDOW_MINUTES = 60
+# Warmup preselects this many times num_legs, so late movers are usually covered too
+CANDIDATE_FACTOR = 2
+
+
+@dataclass
+class EntryPrep:
+    """What warmup did ahead of one scheduled entry."""
+
+    entry_at: datetime
+    specs: Dict[str, Dict[str, float]]
+    candidates: List[str]
+    leverage: float
+    # symbols whose exchange leverage is already set to `leverage` (live)
+    leverage_set: Set[str] = field(default_factory=set)
+
+
+class EntrySchedule:
+    """Wall-clock entry timing for one trader.
+
+    While no run is open, wake_in() caps the trader's sleep at the next
+    warmup or entry instant, so it wakes at ENTRY_WARMUP_SEC before T0 and at
+    T0 itself instead of up to poll_interval_sec late. Warmup does the slow,
+    price-independent work (contracts, candidate preselection, leverage on
+    likely symbols, warm HTTP/DB connections) so the entry only refreshes
+    tickers and submits orders.
+    """
+
+    def __init__(self, runtime: RuntimeSettings) -> None:
+        self.runtime = runtime
+        self.prep: Optional[EntryPrep] = None
+
+    def entry_at(self, now: datetime) -> datetime:
+        # Today's entry until its window has passed, then tomorrow's
+        today = datetime.combine(now.date(), parse_entry_time_utc(self.runtime.entry_time_utc))
+        if now > today + timedelta(minutes=ENTRY_WINDOW_MINUTES):
+            return today + timedelta(days=1)
+        return today
+
+    def warmup_at(self, entry_at: datetime) -> datetime:
+        return entry_at - timedelta(seconds=settings.entry_warmup_sec)
+
+    def needs_warmup(self, now: datetime) -> bool:
+        entry_at = self.entry_at(now)
+        if not self.warmup_at(entry_at) <= now < entry_at:
+            return False
+        return self.prepared(now) is None
+
+    def prepared(self, now: datetime) -> Optional[EntryPrep]:
+        # Warmup results for the current entry, unless sizing inputs changed since
+        prep = self.prep
+        if prep is None or prep.entry_at != self.entry_at(now) or prep.leverage != self.runtime.leverage:
+            return None
+        return prep
+
+    def wake_in(self, now: datetime, poll_sec: float) -> float:
+        entry_at = self.entry_at(now)
+        ahead = [(t - now).total_seconds() for t in (self.warmup_at(entry_at), entry_at) if t > now]
+        return min([float(poll_sec)] + ahead)
+
+    def latency(self, now: datetime) -> float:
+        # Seconds from the scheduled entry (T0) to now
+        return (now - self.entry_at(now)).total_seconds()
+
+    def warm_up(self, engine: StrategyEngine, now: datetime) -> EntryPrep:
+        """Prefetch contract specs and preselect candidates from current tickers."""
+        tickers: Any = engine.client.get_usdt_perp_tickers()
+        specs = engine.load_contract_specs()
+        universe = engine.apply_max_pump_filter(tickers.get("data", []) if isinstance(tickers, dict) else [])
+        top = engine.select_top_gainers_from_tickers({"data": universe}, self.runtime.num_legs * CANDIDATE_FACTOR)
+        candidates = [item["symbol"] for item in top if item.get("symbol")]
+        self.prep = EntryPrep(self.entry_at(now), specs, candidates, self.runtime.leverage)
+        return self.prep
@@ -0,0 +1,182 @@
+import json
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Set, Union
+
+from .config import getenv
+
+
+JOURNAL_MAGIC = b"TSJ1"
+# Per record: wall-clock time, then the length of the zlib'd JSON [kind, name, data] that follows
+_RECORD_HEADER = struct.Struct("<dI")
+
+
+class JournalRecord(NamedTuple):
+    ts: float
+    kind: str
+    name: str
+    data: Any
+
+
+class TickJournal:
+    """Append-only binary log of every external input to a trader's poll ticks.
+
+    Enabled by TICK_JOURNAL_DIR (one file per process and mode). Each tick is
+    framed by a "begin" record (run, portfolio/ledger state, and the
+    effective settings whenever an override changed them) and an "end"
+    record (state after, tick time); in between come the Bitget responses
+    and errors in call order, every wall-clock read and the active-run row,
+    which carries pause/resume commands. That is everything _poll_and_update()
+    decides on, so backend/benchmarks/replay.py can rerun the ticks with no
+    network or DB. Tickers are cut to the portfolio's symbols (all the poll
+    path looks at), so a 10-leg tick is about 2.5 KB. When disabled the hooks
+    return after one attribute check.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.out_dir = getenv("TICK_JOURNAL_DIR", "")
+        self.path: Optional[Path] = None
+        self.recording = False
+        # symbols kept in tickers responses while recording (the portfolio at tick start)
+        self.symbols: Set[str] = set()
+        # effective settings as last journaled; begin records only carry them when they change
+        self._settings: Optional[Dict[str, Any]] = None
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.out_dir)
+
+    def _open(self) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.path = Path(self.out_dir) / f"{self.mode}-{stamp}-{os.getpid()}.tsj"
+        self._file = self.path.open("ab")
+        self._file.write(JOURNAL_MAGIC)
+        print(f"[{self.mode}] journaling ticks to {self.path}")
+
+    def write(self, kind: str, name: str, data: Any) -> None:
+        if not self.recording:
+            return
+        payload = zlib.compress(json.dumps([kind, name, data], separators=(",", ":"), default=str).encode("utf-8"))
+        self._file.write(_RECORD_HEADER.pack(time.time(), len(payload)))
+        self._file.write(payload)
+
+    @contextmanager
+    def tick(self, trader: Any) -> Iterator[None]:
+        """Record one _poll_and_update() of trader (no-op when disabled)."""
+        if not self.enabled:
+            yield
+            return
+        if self._file is None:
+            self._open()
+        self.symbols = set(trader.portfolio)
+        self.recording = True
+        begin = {"run_id": trader.run_id, "initial_balance": trader.initial_balance, "state": trader_state(trader)}
+        runtime = dict(vars(trader.settings))
+        if runtime != self._settings:
+            begin["settings"] = self._settings = runtime
+        self.write("begin", self.mode, begin)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            self.write(
+                "end",
+                self.mode,
+                {
+                    "run_id": trader.run_id,
+                    "state": trader_state(trader) if trader.run_id else None,
+                    "tick_ms": (time.perf_counter() - start) * 1000.0,
+                    "error": error,
+                },
+            )
+            self.recording = False
+            self._file.flush()
+
+    def clock(self, now: datetime) -> datetime:
+        if self.recording:
+            self.write("clock", "now", now.isoformat())
+        return now
+
+    def active_run(self, row: Any) -> Any:
+        # db_ops.RunRow or None
+        if self.recording:
+            self.write("db", "get_active_run", vars(row) if row is not None else None)
+        return row
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JournalingClient:
+    """BitgetClient wrapper that journals each response (or exception) of a public method."""
+
+    def __init__(self, client: Any, journal: TickJournal) -> None:
+        self.client = client
+        self.journal = journal
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        journal = self.journal
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if not journal.recording:
+                return attr(*args, **kwargs)
+            try:
+                resp = attr(*args, **kwargs)
+            except Exception as exc:
+                journal.write(
+                    "error",
+                    name,
+                    {"type": type(exc).__name__, "message": str(exc), "status_code": getattr(exc, "status_code", None)},
+                )
+                raise
+            data = resp
+            if name == "get_usdt_perp_tickers" and isinstance(resp, dict):
+                data = {**resp, "data": [t for t in resp.get("data", []) if t.get("symbol") in journal.symbols]}
+            journal.write("call", name, data)
+            return resp
+
+        return call
+
+
+def trader_state(trader: Any) -> Dict[str, Any]:
+    # Checkpoint fields without bumping the checkpoint seq
+    return {
+        "portfolio": trader.portfolio.to_state(),
+        "ledger": trader.ledger.to_state(),
+        "pending_orders": dict(getattr(trader, "pending_closes", {})),
+        "close_generations": dict(getattr(trader, "close_generations", {})),
+    }
+
+
+def read_journal(path: Union[str, Path]) -> Iterator[JournalRecord]:
+    """Records in write order; a record cut short by a crash ends the iteration."""
+    with open(path, "rb") as f:
+        if f.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f"{path} is not a tick journal")
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            ts, length = _RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            kind, name, data = json.loads(zlib.decompress(payload))
+            yield JournalRecord(ts, kind, name, data)
@@ -0,0 +1,93 @@
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from .config import settings
+from .db_ops import acquire_lease, insert_event, lease_valid, release_lease
+
+
+class LeaseLost(Exception):
+    pass
+
+
+def default_holder_id() -> str:
+    return settings.worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class Lease:
+    """Leader lease on one row of the leases table.
+
+    Every replica calls acquire() each loop: the holder renews, a standby only
+    gets the lease once the holder's expires_ts has passed, so takeover happens
+    at most ttl + retry seconds after the leader stops renewing. A row-based
+    lease (not pg_try_advisory_lock) keeps working through transaction-pooled
+    connections, since nothing depends on a session staying open.
+
+    The token increases on every change of holder; writers call check(cur) in
+    their transaction so a leader that stalled past its expiry cannot commit.
+    """
+
+    def __init__(self, name: str, ttl_sec: Optional[float] = None, holder: Optional[str] = None) -> None:
+        self.name = name
+        self.ttl_sec = ttl_sec or settings.lease_ttl_sec
+        self.holder = holder or default_holder_id()
+        self.token: Optional[int] = None
+        # monotonic time after which we must assume the lease is gone without a renewal
+        self._valid_until = 0.0
+
+    @property
+    def held(self) -> bool:
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    def acquire(self) -> bool:
+        """Take or renew; returns True while this replica is the leader."""
+        was_held = self.token is not None
+        started = time.monotonic()
+        try:
+            token = acquire_lease(self.name, self.holder, self.ttl_sec)
+        except Exception as exc:
+            # DB unreachable: keep leading only until the last renewal runs out
+            print(f"[lease] {self.name} renew failed: {exc}")
+            if not self.held:
+                self.token = None
+            return self.held
+        if token is None:
+            if was_held:
+                print(f"[lease] {self.name} lost to another holder")
+            self.token = None
+            return False
+        if not was_held or token != self.token:
+            print(f"[lease] {self.name} acquired by {self.holder} token={token}")
+            insert_event("info", "lease_acquired", f"{self.name} holder={self.holder} token={token}", None)
+        self.token = token
+        # measured from before the round trip so local expiry is never later than the DB's
+        self._valid_until = started + self.ttl_sec
+        return True
+
+    def check(self, cur) -> None:
+        if self.token is None or not lease_valid(self.name, self.holder, self.token, cur):
+            self.token = None
+            raise LeaseLost(f"{self.name} is no longer held by {self.holder}")
+
+    def release(self) -> None:
+        if self.token is None:
+            return
+        self.token = None
+        try:
+            release_lease(self.name, self.holder)
+        except Exception:
+            pass
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep while renewing at ttl/3; returns False if the lease was lost meanwhile."""
+        deadline = time.monotonic() + seconds
+        step = max(self.ttl_sec / 3, 1.0)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self.held
+            time.sleep(min(step, remaining))
+            if deadline - time.monotonic() > 0 and not self.acquire():
+                return False
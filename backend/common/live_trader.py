@@ -1,24 +1,46 @@
 import time
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, Iterable
 
 from .bitget_client import BitgetClient
+from .checkpoint import TraderCheckpoint
 from .config import settings, live_settings
+from .entry_scheduler import ENTRY_WINDOW_MINUTES, EntrySchedule
+from .journal import JournalingClient, TickJournal
+from .metrics import (
+    DB_SECONDS,
+    ENTRY_LATENCY_SECONDS,
+    OPEN_LEGS,
+    ORDERS_TOTAL,
+    SNAPSHOT_ROWS,
+    TICK_SECONDS,
+    mark_poll_success,
+    start_metrics_server,
+)
+from .pnl import PnlLedger, funding_period, pnl_usdt_short
+from .portfolio import Portfolio
+from .profiling import TickProfiler
+from .settings_store import SettingsStore
+from .snapshot_policy import SnapshotPolicy
 from .strategy import StrategyEngine
+from .tracing import configure_tracing, span
 from .db import get_conn
+from .lease import Lease, LeaseLost
+from .orders import SUCCESS, client_oid, order_status, submit_order
 from backend.worker.telemetry_writer import write_heartbeat
 from .db_ops import (
     create_run,
     end_run,
     get_active_run,
-    get_open_legs,
+    get_legs,
     get_run_balances,
-    get_settings,
     insert_event,
     insert_leg,
     insert_order,
     insert_snapshot,
+    notify_change,
+    refresh_report_series,
     upsert_live_leg,
     update_leg_exit,
     update_leg_max,
@@ -28,19 +50,39 @@ from .db_ops import (
 from .run_window import within_entry_window
 
 
+# How long a submitted close may still show as an open position before it is adopted again
+PENDING_CLOSE_TIMEOUT_SEC = 300
+
+
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
 class LiveTrader:
-    def __init__(self) -> None:
+    def __init__(self, client: BitgetClient | None = None) -> None:
         self.settings = live_settings
-        self.client = BitgetClient()
+        self.journal = TickJournal(self.settings.mode)
+        self.client = client or BitgetClient()
+        if self.journal.enabled:
+            self.client = JournalingClient(self.client, self.journal)
         self.engine = StrategyEngine(self.client, self.settings)
+        self.profiler = TickProfiler(self.settings.mode)
         self.run_id: str | None = None
-        self.legs: Dict[str, Dict[str, float]] = {}
-        self.max_leg_pnl_pct: Dict[str, float] = {}
+        self.portfolio = Portfolio()
         self.initial_balance: float | None = None
+        self.ledger = PnlLedger(settings.taker_fee_rate)
+        self.snapshots = SnapshotPolicy()
+        self.checkpoint = TraderCheckpoint(self.settings.mode)
+        self.settings_store = SettingsStore(self.settings)
+        self.schedule = EntrySchedule(self.settings)
+        self.lease = Lease(f"trader:{self.settings.mode}")
+        # perf_counter at step start; the heartbeat rides on the tick batch when there is one
+        self.tick_start = 0.0
+        self.heartbeat_sent = False
+        # symbol -> submit time of close orders the exchange may still list as open
+        self.pending_closes: Dict[str, float] = {}
+        # symbol -> generation of its close clientOid, bumped whenever an id is spent
+        self.close_generations: Dict[str, int] = {}
 
     def _select_and_open(self) -> None:
         if self.settings.status != "on":
@@ -59,17 +101,35 @@ class LiveTrader:
                     return
                 update_run_balance(self.run_id, initial_balance=initial, current_balance=current or initial)
             self.initial_balance = initial
-            for sym, entry, qty in get_open_legs(self.run_id):
-                self.legs[sym] = {"entry": float(entry), "qty": float(qty)}
-                self.max_leg_pnl_pct[sym] = 0.0
-            print(f"[live] resumed run {self.run_id} legs={len(self.legs)}")
+            self.portfolio.reset()
+            self.ledger.reset()
+            self.snapshots.reset()
+            self.pending_closes.clear()
+            self.close_generations.clear()
+            state = self.checkpoint.load(self.run_id)
+            if state is not None:
+                self.checkpoint.restore(state, self.portfolio, self.ledger)
+                self.pending_closes = dict(state["pending_orders"])
+                self.close_generations = dict(state.get("close_generations", {}))
+                print(f"[live] resumed run {self.run_id} from checkpoint seq={state['seq']} legs={len(self.portfolio)}")
+                return
+            self._rebuild_from_legs()
+            print(f"[live] resumed run {self.run_id} from legs legs={len(self.portfolio)}")
             return
 
-        if not within_entry_window(self.settings.entry_time_utc, window_minutes=60):
-            print("[live] outside entry window; waiting for next cycle")
+        now = _now()
+        if not within_entry_window(self.settings.entry_time_utc, window_minutes=ENTRY_WINDOW_MINUTES):
+            if self.schedule.needs_warmup(now):
+                self._warm_up(now)
+            else:
+                print("[live] outside entry window; waiting for next cycle")
             return
 
-        legs = self.engine.build_leg_plan()
+        prep = self.schedule.prepared(now)
+        with span("live.build_leg_plan", warm=prep is not None):
+            # With warmup done only fresh prices are fetched here
+            tickers_resp = self.client.get_usdt_perp_tickers()
+            legs = self.engine.build_leg_plan_from_tickers(tickers_resp, prep.specs if prep else None)
         if not legs:
             insert_event("warn", "live_no_legs", "no legs selected", None)
             print("[live] no legs selected")
@@ -82,73 +142,159 @@ class LiveTrader:
             print("[live] LIVE_INITIAL_BALANCE is required; exiting")
             self.run_id = None
             return
-        create_run(
-            run_id=self.run_id,
-            exchange=self.settings.exchange,
-            mode=self.settings.mode,
-            entry_time_utc=self.settings.entry_time_utc,
-            num_legs=self.settings.num_legs,
-            margin_per_leg_usdt=self.settings.margin_per_leg_usdt,
-            leverage=self.settings.leverage,
-            max_pump_pct=self.settings.max_pump_pct,
-            global_kill_dd_pct=self.settings.global_kill_dd_pct,
-            strategy_tag=self.settings.strategy_tag,
-            initial_balance=self.initial_balance,
-            current_balance=self.initial_balance,
-        )
-
-        for leg in legs:
-            # Ensure exchange leverage matches config before opening
-            leverage_str = f"{self.settings.leverage:g}"
-            lev_resp = self.client.set_leverage(
-                leg.symbol,
-                leverage_str,
-                hold_side=settings.bitget_hold_side or None,
-            )
-            if lev_resp.get("code") != "00000":
-                msg = f"set_leverage failed {leg.symbol} code={lev_resp.get('code')} msg={lev_resp.get('msg')}"
-                insert_event("warn", "live_set_leverage_failed", msg, self.run_id)
-                print(f"[live] {msg}")
-
-            entry_price = self._get_mark_price(leg.symbol)
-            self.legs[leg.symbol] = {"entry": entry_price, "qty": leg.size}
-            self.max_leg_pnl_pct[leg.symbol] = 0.0
-
-            # Place live order: open short
-            resp = self.client.place_order(
-                symbol=leg.symbol,
-                side="sell",
-                size=str(leg.size),
-                trade_side="open",
-                reduce_only="NO",
-            )
-            insert_leg(
+        with span("live.open_legs", legs=len(legs)):
+            created = create_run(
                 run_id=self.run_id,
-                symbol=leg.symbol,
-                entry_price=entry_price,
-                qty=leg.size,
+                exchange=self.settings.exchange,
+                mode=self.settings.mode,
+                entry_time_utc=self.settings.entry_time_utc,
+                num_legs=self.settings.num_legs,
+                margin_per_leg_usdt=self.settings.margin_per_leg_usdt,
+                leverage=self.settings.leverage,
+                max_pump_pct=self.settings.max_pump_pct,
+                global_kill_dd_pct=self.settings.global_kill_dd_pct,
+                strategy_tag=self.settings.strategy_tag,
+                initial_balance=self.initial_balance,
+                current_balance=self.initial_balance,
             )
-            insert_order(
-                run_id=self.run_id,
-                symbol=leg.symbol,
-                side="sell",
-                action="open",
-                intent_price=entry_price,
-                fill_price=entry_price,
-                qty=leg.size,
-                status="filled" if resp.get("code") == "00000" else "submitted",
-            )
-            print(f"[live] opened {leg.symbol} @ {entry_price} qty={leg.size}")
-
-        insert_event("info", "live_run_started", "live run started", self.run_id)
-        print(f"[live] run started {self.run_id} legs={len(legs)}")
+            if not created:
+                # Another replica opened a run first; pick it up through the resume path next tick
+                print(f"[live] active live run already exists; not opening run_id={self.run_id}")
+                self.run_id = None
+                return
+
+            self.portfolio.reset()
+            self.ledger.reset()
+            self.snapshots.reset()
+            self.pending_closes.clear()
+            self.close_generations.clear()
+            entry_marks = self._get_mark_prices((leg.symbol for leg in legs), tickers_resp)
+            filled_at = _now()
+            for leg in legs:
+                # Ensure exchange leverage matches config before opening (usually done in warmup)
+                if prep is None or leg.symbol not in prep.leverage_set:
+                    self._set_leverage(leg.symbol, self.run_id)
+
+                entry_price = entry_marks.get(leg.symbol, 0.0)
+                self.portfolio.open(leg.symbol, entry_price, leg.size, self.settings.margin_per_leg_usdt)
+                self.ledger.open_leg(leg.symbol, entry_price, leg.size, _now().timestamp())
+
+                # Place live order: open short (clientOid makes retries and restarts idempotent)
+                oid = client_oid(self.run_id, leg.symbol, "open")
+                resp = submit_order(
+                    self.client,
+                    self.client.place_order,
+                    oid,
+                    symbol=leg.symbol,
+                    side="sell",
+                    size=str(leg.size),
+                    trade_side="open",
+                    reduce_only="NO",
+                )
+                filled_at = _now()
+                ORDERS_TOTAL.inc(service="live", action="open")
+                insert_leg(
+                    run_id=self.run_id,
+                    symbol=leg.symbol,
+                    entry_price=entry_price,
+                    qty=leg.size,
+                )
+                insert_order(
+                    run_id=self.run_id,
+                    symbol=leg.symbol,
+                    side="sell",
+                    action="open",
+                    intent_price=entry_price,
+                    fill_price=entry_price,
+                    qty=leg.size,
+                    status="filled" if resp.get("code") == "00000" else "submitted",
+                    client_oid=oid,
+                    exchange_order_id=(resp.get("data") or {}).get("orderId"),
+                )
+                print(f"[live] opened {leg.symbol} @ {entry_price} qty={leg.size}")
+
+            # Scheduled entry time to the last order response
+            latency = self.schedule.latency(filled_at)
+            ENTRY_LATENCY_SECONDS.observe(latency, service="live", warm=str(prep is not None).lower())
+            self.schedule.prep = None
+            insert_event("info", "live_run_started", f"live run started (entry +{latency:.3f}s)", self.run_id)
+            self.checkpoint.save(self._checkpoint_state())
+            notify_change(self.settings.mode)
+        print(f"[live] run started {self.run_id} legs={len(legs)} entry_latency={latency:.3f}s")
+
+    def _warm_up(self, now: datetime) -> None:
+        with span("live.warmup"):
+            prep = self.schedule.warm_up(self.engine, now)
+            for symbol in prep.candidates:
+                if self._set_leverage(symbol, None):
+                    prep.leverage_set.add(symbol)
+        print(
+            f"[live] warmed up for {prep.entry_at:%H:%M} UTC:",
+            f"{len(prep.candidates)} candidates, leverage set on {len(prep.leverage_set)}, {len(prep.specs)} contracts",
+        )
 
-    def _get_mark_price(self, symbol: str) -> float:
-        tickers = self.client.get_usdt_perp_tickers().get("data", [])
-        for t in tickers:
-            if t.get("symbol") == symbol:
-                return float(t.get("markPrice") or t.get("lastPr") or 0)
-        return 0.0
+    def _set_leverage(self, symbol: str, run_id: str | None) -> bool:
+        resp = self.client.set_leverage(
+            symbol,
+            f"{self.settings.leverage:g}",
+            hold_side=settings.bitget_hold_side or None,
+        )
+        if resp.get("code") != "00000":
+            msg = f"set_leverage failed {symbol} code={resp.get('code')} msg={resp.get('msg')}"
+            insert_event("warn", "live_set_leverage_failed", msg, run_id)
+            print(f"[live] {msg}")
+            return False
+        return True
+
+    def _rebuild_from_legs(self) -> None:
+        # No usable checkpoint: realized PnL/carry from closed legs, trailing max from max_favorable_pnl_usdt
+        now_sec = _now().timestamp()
+        margin = self.settings.margin_per_leg_usdt
+        for sym, entry, exit_price, qty, status, _exit_ts, fees, funding, max_fav in get_legs(self.run_id):
+            if entry is None or qty is None:
+                continue
+            if status == "closed" and exit_price is not None:
+                self.portfolio.add_closed(pnl_usdt_short(float(entry), float(exit_price), float(qty)), margin)
+                self.ledger.add_closed(float(fees), float(funding))
+            elif status == "open":
+                leg = self.portfolio.open(sym, float(entry), float(qty), margin)
+                leg.max_pnl_pct = float(max_fav) / margin if margin > 0 else 0.0
+                self.ledger.restore_leg(sym, float(fees), float(funding), now_sec)
+
+    def _checkpoint_state(self) -> dict:
+        return self.checkpoint.build(self.run_id, self.portfolio, self.ledger, self.pending_closes, self.close_generations)
+
+    def _submit_close(self, sym: str, qty: float) -> tuple[str, dict]:
+        """Market-close sym under its current close clientOid; returns the id used and the response."""
+        for _ in range(2):
+            oid = client_oid(self.run_id, sym, "close", self.close_generations.get(sym, 0))
+            resp = submit_order(
+                self.client,
+                self.client.close_position_market,
+                oid,
+                closing=True,
+                symbol=sym,
+                size=str(qty),
+                position_side="short",
+            )
+            if not resp.get("spent"):
+                break
+            # The exchange holds a canceled/rejected order under that id; the next generation is unused
+            self.close_generations[sym] = self.close_generations.get(sym, 0) + 1
+        return oid, resp
+
+    def _get_mark_prices(self, symbols: Iterable[str], tickers: dict | None = None) -> Dict[str, float]:
+        # One tickers call for any number of symbols (none when the caller already has them)
+        wanted = set(symbols)
+        if not wanted:
+            return {}
+        if tickers is None:
+            tickers = self.client.get_usdt_perp_tickers()
+        return {
+            t["symbol"]: float(t.get("markPrice") or t.get("lastPr") or 0)
+            for t in tickers.get("data", [])
+            if t.get("symbol") in wanted
+        }
 
     def _get_account_equity(self) -> float:
         resp = self.client.get_accounts()
@@ -157,13 +303,28 @@ class LiveTrader:
                 return float(item.get("accountEquity") or item.get("usdtEquity") or 0)
         return 0.0
 
+    def _settled_funding_rate(self, symbol: str, since_period: int, until_period: int) -> float:
+        # Sum of settled rates for boundaries in (since_period, until_period]; 3 calls/day per leg at most
+        try:
+            history = self.client.get_funding_rate_history(symbol).get("data", [])
+        except Exception as exc:
+            print(f"[live] funding history failed {symbol}: {exc}")
+            return 0.0
+        total = 0.0
+        for item in history:
+            settled = int(item.get("fundingTime") or 0) // 1000
+            if since_period < funding_period(settled) <= until_period:
+                total += float(item.get("fundingRate") or 0)
+        return total
+
     def _poll_and_update(self) -> None:
         if not self.run_id:
             return
 
-        poll_start = _now()
+        poll_start = self._clock()
         # Pull positions from exchange
-        positions = self.client.get_positions().get("data", [])
+        with span("live.get_positions"):
+            positions = self.client.get_positions().get("data", [])
         live_positions = [
             p
             for p in positions
@@ -171,40 +332,68 @@ class LiveTrader:
         ]
         pos_by_symbol = {p.get("symbol"): p for p in live_positions if p.get("symbol")}
 
-        poll_ts = _now()
+        poll_ts = self._clock()
+        poll_sec = poll_ts.timestamp()
+        policy = self.snapshots
+        policy.configure(
+            self.settings.snapshot_min_move_bps,
+            self.settings.snapshot_pnl_step_usdt,
+            self.settings.snapshot_max_interval_sec,
+        )
+        policy.begin()
         leg_upsert_rows = []
-        snapshots_rows = []
         leg_max_rows = []
         leg_exit_rows = []
         order_rows = []
         event_rows = []
 
-        # Reconcile: if DB thinks open but exchange shows closed, mark closed
-        for sym in list(self.legs.keys()):
+        # A closed position can still be listed for a poll or two; don't re-adopt it as a new leg
+        for sym in list(self.pending_closes):
             if sym not in pos_by_symbol:
-                mark = self._get_mark_price(sym)
-                leg_exit_rows.append((mark, poll_ts, "manual", self.run_id, sym))
+                del self.pending_closes[sym]
+            elif poll_sec - self.pending_closes[sym] < PENDING_CLOSE_TIMEOUT_SEC:
+                del pos_by_symbol[sym]
+            else:
+                del self.pending_closes[sym]
+                # That close filled (or was dropped) without flattening the position; its id is spent
+                self.close_generations[sym] = self.close_generations.get(sym, 0) + 1
+                msg = f"{sym} still open {PENDING_CLOSE_TIMEOUT_SEC}s after close order; adopting"
+                event_rows.append((poll_ts, "warn", "live_close_unconfirmed", msg, self.run_id))
+
+        # Reconcile: if DB thinks open but exchange shows closed, mark closed
+        with span("live.reconcile_missing"):
+            portfolio = self.portfolio
+            missing = [sym for sym in portfolio if sym not in pos_by_symbol]
+            missing_marks = self._get_mark_prices(missing)
+            for sym in missing:
+                leg = portfolio.close(sym, missing_marks.get(sym))
+                closed = self.ledger.close_leg(sym, leg.mark, leg.qty)
+                policy.forget(sym)
+                leg_exit_rows.append((leg.mark, poll_ts, "manual", closed.fees_usdt, closed.funding_usdt, self.run_id, sym))
                 event_rows.append((poll_ts, "info", "live_leg_closed_manual", f"{sym} closed on exchange", self.run_id))
-                self.legs.pop(sym, None)
-                self.max_leg_pnl_pct.pop(sym, None)
-
-        portfolio_pnl = 0.0
-        for sym, pos in pos_by_symbol.items():
-            entry = float(pos.get("openPriceAvg") or 0)
-            qty = float(pos.get("total") or 0)
-            margin = float(pos.get("marginSize") or 0)
-            leverage = float(pos.get("leverage") or 0)
-            mark = float(pos.get("markPrice") or 0)
-            pnl = float(pos.get("unrealizedPL") or 0)
-
-            # Sync DB leg with live exchange state
-            leg_upsert_rows.append((self.run_id, sym, entry, qty))
-            self.legs[sym] = {"entry": entry, "qty": qty}
-            if sym not in self.max_leg_pnl_pct:
-                self.max_leg_pnl_pct[sym] = 0.0
-
-            snapshots_rows.append(
-                (
+
+        with span("live.evaluate_legs", legs=len(pos_by_symbol)):
+            for sym, pos in pos_by_symbol.items():
+                entry = float(pos.get("openPriceAvg") or 0)
+                qty = float(pos.get("total") or 0)
+                margin = float(pos.get("marginSize") or 0)
+                leverage = float(pos.get("leverage") or 0)
+                mark = float(pos.get("markPrice") or 0)
+                pnl = float(pos.get("unrealizedPL") or 0)
+
+                # Sync DB leg with live exchange state
+                leg_upsert_rows.append((self.run_id, sym, entry, qty))
+                leg = portfolio.sync(sym, entry, qty, mark, pnl, margin if margin > 0 else self.settings.margin_per_leg_usdt)
+                periods = self.ledger.periods_due(sym, poll_sec)
+                if periods:
+                    since = funding_period(poll_sec) - periods
+                    rate = self._settled_funding_rate(sym, since, funding_period(poll_sec))
+                    self.ledger.accrue(sym, qty, mark, rate, poll_sec, periods=1)
+                elif sym not in self.ledger.legs:
+                    self.ledger.accrue(sym, qty, mark, 0.0, poll_sec)
+                accrual = self.ledger.get(sym)
+
+                snapshot_row = (
                     poll_ts,
                     self.run_id,
                     self.settings.exchange,
@@ -215,50 +404,67 @@ class LiveTrader:
                     qty,
                     margin,
                     leverage,
+                    accrual.fees_usdt,
+                    accrual.funding_usdt,
                 )
-            )
-            leg_max_rows.append((pnl, pnl, self.run_id, sym))
-
-            margin_basis = margin if margin > 0 else self.settings.margin_per_leg_usdt
-            pnl_pct = pnl / margin_basis
-            if pnl_pct > self.max_leg_pnl_pct.get(sym, 0.0):
-                self.max_leg_pnl_pct[sym] = pnl_pct
-
-            leg_decision = self.engine.evaluate_leg_exit(
-                leg_pnl_pct=pnl_pct,
-                max_leg_pnl_pct=self.max_leg_pnl_pct.get(sym, 0.0),
-                strategy_tag=self.settings.strategy_tag.lower(),
-            )
-            if leg_decision.exit:
-                self.client.close_position_market(sym, str(qty), position_side="short")
-                reason = leg_decision.reason or "leg_trailing_sl"
-                leg_exit_rows.append((mark, poll_ts, reason, self.run_id, sym))
-                order_rows.append(
-                    (
-                        self.run_id,
-                        sym,
-                        "buy",
-                        "close",
-                        mark,
-                        mark,
-                        qty,
-                        "submitted",
-                        poll_ts,
-                    )
+                leg_row_due = policy.leg_row_due(sym, pnl, accrual.fees_usdt, accrual.funding_usdt)
+                if leg_row_due:
+                    leg_max_rows.append((pnl, pnl, accrual.fees_usdt, accrual.funding_usdt, self.run_id, sym))
+
+                leg_decision = self.engine.evaluate_leg_exit(
+                    leg_pnl_pct=leg.pnl_pct,
+                    max_leg_pnl_pct=leg.max_pnl_pct,
+                    strategy_tag=self.settings.strategy_tag.lower(),
                 )
-                event_rows.append((poll_ts, "info", "live_leg_closed", f"{sym} {reason}", self.run_id))
-                self.legs.pop(sym, None)
-                self.max_leg_pnl_pct.pop(sym, None)
-                continue
+                closing = False
+                if leg_decision.exit:
+                    oid, resp = self._submit_close(sym, qty)
+                    ORDERS_TOTAL.inc(service="live", action="close")
+                    reason = leg_decision.reason or "leg_trailing_sl"
+                    closing = resp.get("code") == SUCCESS
+                    if closing:
+                        portfolio.close(sym, mark)
+                        self.pending_closes[sym] = poll_sec
+                        closed = self.ledger.close_leg(sym, mark, qty)
+                        leg_exit_rows.append((mark, poll_ts, reason, closed.fees_usdt, closed.funding_usdt, self.run_id, sym))
+                        event_rows.append((poll_ts, "info", "live_leg_closed", f"{sym} {reason}", self.run_id))
+                    else:
+                        # Leg stays open; the next tick evaluates it again
+                        msg = f"close {sym} ({reason}) rejected code={resp.get('code')} msg={resp.get('msg')}"
+                        event_rows.append((poll_ts, "warn", "live_close_rejected", msg, self.run_id))
+                        print(f"[live] {msg}")
+                    order_rows.append(
+                        (
+                            self.run_id,
+                            sym,
+                            "buy",
+                            "close",
+                            mark,
+                            mark if closing else None,
+                            qty,
+                            order_status(resp),
+                            poll_ts,
+                            oid,
+                            (resp.get("data") or {}).get("orderId"),
+                        )
+                    )
+                policy.offer(sym, mark, pnl, snapshot_row, closing=closing, force=leg_row_due)
 
-            portfolio_pnl += pnl
+        offered = policy.offered
+        snapshots_rows = policy.select(poll_ts)
+        SNAPSHOT_ROWS.inc(len(snapshots_rows), service="live", outcome="written")
+        if offered > len(snapshots_rows):
+            SNAPSHOT_ROWS.inc(offered - len(snapshots_rows), service="live", outcome="skipped")
 
-        if self.run_id:
-            update_run_balance(self.run_id, current_balance=self._get_account_equity())
+        with span("live.account_equity"):
+            current_balance = self._get_account_equity()
 
-        if leg_upsert_rows or snapshots_rows or leg_max_rows or leg_exit_rows or order_rows or event_rows:
+        with span("live.db_batch", snapshots=len(snapshots_rows)):
+            db_start = time.perf_counter()
             with get_conn() as conn:
                 with conn.cursor() as cur:
+                    # Fencing: a replica that lost the lease mid-tick rolls back instead of double-writing
+                    self.lease.check(cur)
                     if leg_upsert_rows:
                         cur.executemany(
                             """
@@ -283,9 +489,9 @@ class LiveTrader:
                             """
                             insert into snapshots (
                                 ts, run_id, exchange, symbol, price, unrealized_pnl_usdt,
-                                entry_price, position_size, margin_usdt, leverage
+                                entry_price, position_size, margin_usdt, leverage, fees_usdt, funding_usdt
                             )
-                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                             """,
                             snapshots_rows,
                         )
@@ -294,7 +500,9 @@ class LiveTrader:
                             """
                             update legs
                             set max_favorable_pnl_usdt = greatest(max_favorable_pnl_usdt, %s),
-                                max_adverse_pnl_usdt = least(max_adverse_pnl_usdt, %s)
+                                max_adverse_pnl_usdt = least(max_adverse_pnl_usdt, %s),
+                                fees_usdt = %s,
+                                funding_usdt = %s
                             where run_id = %s and symbol = %s
                             """,
                             leg_max_rows,
@@ -303,7 +511,8 @@ class LiveTrader:
                         cur.executemany(
                             """
                             update legs
-                            set exit_price = %s, exit_ts = %s, exit_reason = %s, status = 'closed'
+                            set exit_price = %s, exit_ts = %s, exit_reason = %s, status = 'closed',
+                                fees_usdt = %s, funding_usdt = %s
                             where run_id = %s and symbol = %s
                             """,
                             leg_exit_rows,
@@ -311,8 +520,9 @@ class LiveTrader:
                     if order_rows:
                         cur.executemany(
                             """
-                            insert into orders (run_id, symbol, side, action, intent_price, fill_price, qty, status, ts)
-                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            insert into orders (run_id, symbol, side, action, intent_price, fill_price, qty, status, ts,
+                                                client_oid, exchange_order_id)
+                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                             """,
                             order_rows,
                         )
@@ -324,8 +534,22 @@ class LiveTrader:
                             """,
                             event_rows,
                         )
+                    cur.execute(
+                        """
+                        update runs
+                        set current_balance = %s
+                        where run_id = %s
+                        """,
+                        (current_balance, self.run_id),
+                    )
+                    self.checkpoint.save(self._checkpoint_state(), cur)
+                    write_heartbeat("live", self._tick_ms(), cur=cur)
+                    notify_change(self.settings.mode, cur)
                 conn.commit()
-        poll_end = _now()
+            policy.commit()
+            self.heartbeat_sent = True
+            DB_SECONDS.observe(time.perf_counter() - db_start, group="tick_batch")
+        poll_end = self._clock()
         print(
             "[live] poll timing",
             f"positions={(poll_ts - poll_start).total_seconds():.2f}s",
@@ -334,7 +558,7 @@ class LiveTrader:
         )
 
         # Skip exit if paused
-        active = get_active_run(mode="live")
+        active = self.journal.active_run(get_active_run(mode="live"))
         if active and active.run_id == self.run_id and active.status == "paused":
             return
 
@@ -342,62 +566,160 @@ class LiveTrader:
         if active and active.start_ts:
             try:
                 start_ts = datetime.fromisoformat(active.start_ts)
-                hours_elapsed = (_now() - start_ts).total_seconds() / 3600
+                hours_elapsed = (self._clock() - start_ts).total_seconds() / 3600
             except Exception:
                 hours_elapsed = 0.0
 
-        leg_count = len(pos_by_symbol)
-        if leg_count > 0:
-            margin_total = self.settings.margin_per_leg_usdt * leg_count
-            portfolio_pnl_pct = portfolio_pnl / margin_total
-        else:
-            portfolio_pnl_pct = 0.0
+        # Realized + unrealized over all margin opened this run, so closed legs keep their weight
         decision = self.engine.evaluate_portfolio_exit(
-            portfolio_pnl_pct,
+            portfolio.pnl_pct,
             hours_elapsed,
             self.settings.strategy_tag.lower(),
         )
         if decision.exit:
-            for sym in list(self.legs.keys()):
-                mark = self._get_mark_price(sym)
-                self.client.close_position_market(sym, str(self.legs[sym]["qty"]), position_side="short")
-                update_leg_exit(self.run_id, sym, mark, decision.reason or "24h")
-                insert_order(
-                    run_id=self.run_id,
-                    symbol=sym,
-                    side="buy",
-                    action="close",
-                    intent_price=mark,
-                    fill_price=mark,
-                    qty=self.legs[sym]["qty"],
-                    status="submitted",
-                )
-                print(f"[live] closed {sym} reason={decision.reason}")
-            update_run_status(self.run_id, "completed")
-            end_run(self.run_id)
-            insert_event("info", "live_run_completed", f"exit {decision.reason}", self.run_id)
-            print(f"[live] run completed reason={decision.reason}")
-            # Prevent duplicate close and allow new run within the same entry window
-            self.legs.clear()
-            self.max_leg_pnl_pct.clear()
-            self.run_id = None
+            with span("live.close_all", reason=decision.reason or ""):
+                marks = self._get_mark_prices(portfolio)
+                for sym in portfolio:
+                    # Submit before dropping the leg: if retries run out or Bitget rejects it, the leg stays
+                    # open and the next tick closes it again
+                    oid, resp = self._submit_close(sym, portfolio.get(sym).qty)
+                    ORDERS_TOTAL.inc(service="live", action="close")
+                    if resp.get("code") != SUCCESS:
+                        msg = f"close {sym} ({decision.reason}) rejected code={resp.get('code')} msg={resp.get('msg')}"
+                        insert_event("warn", "live_close_rejected", msg, self.run_id)
+                        insert_order(
+                            run_id=self.run_id,
+                            symbol=sym,
+                            side="buy",
+                            action="close",
+                            intent_price=marks.get(sym),
+                            fill_price=None,
+                            qty=portfolio.get(sym).qty,
+                            status=order_status(resp),
+                            client_oid=oid,
+                        )
+                        print(f"[live] {msg}")
+                        continue
+                    leg = portfolio.close(sym, marks.get(sym))
+                    mark = leg.mark
+                    self.pending_closes[sym] = poll_sec
+                    self.snapshots.forget(sym)
+                    closed = self.ledger.close_leg(sym, mark, leg.qty)
+                    update_leg_exit(
+                        self.run_id,
+                        sym,
+                        mark,
+                        decision.reason or "24h",
+                        fees_usdt=closed.fees_usdt,
+                        funding_usdt=closed.funding_usdt,
+                    )
+                    insert_order(
+                        run_id=self.run_id,
+                        symbol=sym,
+                        side="buy",
+                        action="close",
+                        intent_price=mark,
+                        fill_price=mark,
+                        qty=leg.qty,
+                        status=order_status(resp),
+                        client_oid=oid,
+                        exchange_order_id=(resp.get("data") or {}).get("orderId"),
+                    )
+                    print(f"[live] closed {sym} reason={decision.reason}")
+                if len(portfolio):
+                    # Some closes were rejected: the run stays open until every leg is flat
+                    self.checkpoint.save(self._checkpoint_state())
+                    notify_change(self.settings.mode)
+                    return
+                update_run_status(self.run_id, "completed")
+                end_run(self.run_id)
+                insert_event("info", "live_run_completed", f"exit {decision.reason}", self.run_id)
+                notify_change(self.settings.mode)
+                if settings.reports_use_matview:
+                    refresh_report_series()
+                print(f"[live] run completed reason={decision.reason}")
+                # Prevent duplicate close and allow new run within the same entry window
+                self.portfolio.reset()
+                self.ledger.reset()
+                self.snapshots.reset()
+                self.checkpoint.clear()
+                self.pending_closes.clear()
+                self.close_generations.clear()
+                self.run_id = None
             return
 
-    def run_forever(self) -> None:
-        while True:
-            write_heartbeat("live")
+    def step(self) -> float | None:
+        """One loop iteration; returns seconds until the next one, or None while on standby."""
+        if not self.lease.acquire():
+            # Standby: another replica owns live trading; retry until its lease expires
+            self.stand_by()
+            return None
+        self.tick_start = time.perf_counter()
+        self.heartbeat_sent = False
+        with span("live.tick"):
             self._refresh_settings()
+            self.profiler.sync(self.settings.profile_ticks, self.run_id)
+            self.profiler.start_tick()
             if not self.run_id:
                 self._select_and_open()
             print(f"[live] poll tick {datetime.now(timezone.utc).isoformat()} interval={self.settings.poll_interval_sec}s")
             if self.run_id:
-                self._poll_and_update()
-            time.sleep(self.settings.poll_interval_sec)
+                try:
+                    with TICK_SECONDS.time(service="live"), self.journal.tick(self):
+                        self._poll_and_update()
+                    mark_poll_success("live")
+                except LeaseLost as exc:
+                    print(f"[live] {exc}; standing by")
+                    self.stand_by()
+            OPEN_LEGS.set(len(self.portfolio), service="live")
+            self.profiler.end_tick(self.run_id)
+            if not self.heartbeat_sent and self.lease.held:
+                # No run (or it just completed): heartbeat on its own
+                write_heartbeat("live", self._tick_ms())
+        return self._next_interval()
+
+    def _next_interval(self) -> float:
+        # Between runs wake exactly at warmup and entry time rather than on the poll grid
+        if self.run_id or self.settings.status != "on":
+            return self.settings.poll_interval_sec
+        return self.schedule.wake_in(_now(), self.settings.poll_interval_sec)
+
+    def _clock(self) -> datetime:
+        # Wall-clock reads inside a poll tick go through the journal so a replay sees the same times
+        return self.journal.clock(_now())
+
+    def _tick_ms(self) -> float:
+        return (time.perf_counter() - self.tick_start) * 1000.0
+
+    def run_forever(self) -> None:
+        start_metrics_server(self.settings.metrics_port)
+        configure_tracing("live")
+        try:
+            while True:
+                interval = self.step()
+                if interval is None:
+                    time.sleep(settings.lease_retry_sec)
+                elif not self.lease.sleep(interval):
+                    self.stand_by()
+        finally:
+            # Clean shutdown hands over immediately instead of after the TTL
+            self.lease.release()
+
+    def stand_by(self) -> None:
+        # Not the leader: forget the run so taking the lease back resumes it from the checkpoint
+        if self.run_id:
+            print(f"[live] lease not held; dropping in-memory state for run {self.run_id}")
+        self.run_id = None
+        self.portfolio.reset()
+        self.ledger.reset()
+        self.snapshots.reset()
+        self.pending_closes.clear()
+        self.close_generations.clear()
 
     def _refresh_settings(self) -> None:
         try:
-            overrides = get_settings(self.settings.mode)
-            if overrides:
-                self.settings.apply_overrides(overrides)
+            # Version check each tick; rows are only re-read and re-parsed after a change
+            self.settings_store.refresh()
         except Exception:
+            # ignore DB errors to keep trading loop alive
             return
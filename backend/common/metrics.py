@@ -0,0 +1,268 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Latency buckets (seconds) sized for HTTP/DB calls in the trading loop
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        # Evaluated at scrape time (e.g. "seconds since X")
+        with self._lock:
+            self._functions[self._key(labels)] = fn
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+            functions = list(self._functions.items())
+        out = [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+        for k, fn in functions:
+            try:
+                out.append(f"{self.name}{_label_str(self.labelnames, k)} {_fmt(fn())}")
+            except Exception:
+                continue
+        return out
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, doc: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][idx] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._values.items()]
+        out = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_fmt(bound)}"'
+                out.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}")
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+BITGET_REQUEST_SECONDS = REGISTRY.register(
+    Histogram("bitget_request_seconds", "Bitget REST request latency", ("method", "endpoint"))
+)
+BITGET_REQUEST_ERRORS = REGISTRY.register(
+    Counter("bitget_request_errors_total", "Bitget REST requests that failed", ("method", "endpoint"))
+)
+BITGET_RESPONSE_BYTES = REGISTRY.register(
+    Histogram("bitget_response_bytes", "Bitget REST response payload size", ("endpoint",), buckets=BYTES_BUCKETS)
+)
+BITGET_QUEUE_SECONDS = REGISTRY.register(
+    Histogram("bitget_queue_seconds", "Time a Bitget request waited for a rate-limit slot", ("family", "priority"))
+)
+BITGET_RATE_LIMITED = REGISTRY.register(
+    Counter("bitget_rate_limited_total", "Bitget 429 responses", ("family",))
+)
+TICKER_CACHE = REGISTRY.register(
+    Counter("ticker_cache_total", "Shared tickers cache lookups (supervisor)", ("outcome",))
+)
+DB_SECONDS = REGISTRY.register(Histogram("db_seconds", "Database time per statement group", ("group",)))
+TICK_SECONDS = REGISTRY.register(Histogram("tick_seconds", "Trading loop tick duration", ("service",)))
+ENTRY_LATENCY_SECONDS = REGISTRY.register(
+    Histogram(
+        "entry_latency_seconds",
+        "Scheduled entry time to the last entry fill",
+        ("service", "warm"),
+        buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0, 3600.0),
+    )
+)
+ORDERS_TOTAL = REGISTRY.register(Counter("orders_total", "Orders submitted or simulated", ("service", "action")))
+ORDER_RETRIES = REGISTRY.register(
+    Counter("order_retries_total", "Order retries: resubmitted after a miss, recovered by clientOid, or clientOid spent", ("action", "outcome"))
+)
+SNAPSHOT_ROWS = REGISTRY.register(
+    Counter("snapshot_rows_total", "Leg snapshots seen per poll vs persisted", ("service", "outcome"))
+)
+OPEN_LEGS = REGISTRY.register(Gauge("open_legs", "Open legs held by the trader", ("service",)))
+LAST_POLL_TIMESTAMP = REGISTRY.register(
+    Gauge("last_successful_poll_timestamp_seconds", "Unix time of the last completed poll", ("service",))
+)
+SECONDS_SINCE_LAST_POLL = REGISTRY.register(
+    Gauge("seconds_since_last_successful_poll", "Seconds since the last completed poll", ("service",))
+)
+ENGINE_RESTARTS = REGISTRY.register(
+    Counter("engine_restarts_total", "Engines restarted by the supervisor after a crash", ("service",))
+)
+API_REQUEST_SECONDS = REGISTRY.register(
+    Histogram("api_request_seconds", "API request latency", ("method", "route", "status"))
+)
+
+_last_poll: Dict[str, float] = {}
+
+
+def mark_poll_success(service: str) -> None:
+    now = time.time()
+    if service not in _last_poll:
+        SECONDS_SINCE_LAST_POLL.set_function(lambda: time.time() - _last_poll[service], service=service)
+    _last_poll[service] = now
+    LAST_POLL_TIMESTAMP.set(now, service=service)
+
+
+def timed_db(fn: Callable) -> Callable:
+    # Groups DB time by db_ops function name
+    group = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            DB_SECONDS.observe(time.perf_counter() - start, group=group)
+
+    return wrapper
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # keep scrapes out of the trader logs
+        return
+
+
+def start_metrics_server(port: int) -> Optional[ThreadingHTTPServer]:
+    if port <= 0:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    print(f"[metrics] serving /metrics on :{port}")
+    return server
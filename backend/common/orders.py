@@ -0,0 +1,138 @@
+import hashlib
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from .bitget_client import BitgetAPIError, BitgetClient
+from .config import settings
+from .metrics import ORDER_RETRIES
+from .rate_limit import PRIORITY_CLOSE, PRIORITY_OPEN
+
+
+SUCCESS = "00000"
+# Order detail states of an order that took effect (or still can); canceled/rejected ones spent their clientOid
+LIVE_STATES = ("live", "partially_filled", "filled")
+
+
+def client_oid(run_id: str, symbol: str, action: str, generation: int = 0) -> str:
+    # (run, symbol, action, generation) names one order, so a restarted trader derives the same
+    # id and cannot place the order twice. The caller moves to the next generation once an id is
+    # spent: its order was canceled/rejected, or a filled close left the position open.
+    key = f"{run_id}:{symbol}:{action}" + (f":{generation}" if generation else "")
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return f"{action}-{digest}"
+
+
+def _transient(exc: Exception) -> bool:
+    # Timeouts/resets and 429/5xx: the order may or may not have reached the book
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, BitgetAPIError) and exc.transient
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter so replicas/legs retrying together spread out
+    cap = min(settings.order_retry_max_sec, settings.order_retry_base_sec * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+
+def find_order(client: BitgetClient, symbol: str, oid: str, priority: int = PRIORITY_OPEN) -> Optional[Dict[str, Any]]:
+    """The exchange's record of clientOid oid, or None if it never arrived; transient errors propagate."""
+    try:
+        resp = client.get_order_detail(symbol, client_oid=oid, priority=priority)
+    except BitgetAPIError as exc:
+        if exc.transient:
+            raise
+        return None
+    if resp.get("code") != SUCCESS or not resp.get("data"):
+        return None
+    return resp["data"]
+
+
+def order_status(resp: Dict[str, Any]) -> str:
+    # orders.status for a submit_order() result
+    if resp.get("code") != SUCCESS:
+        return "rejected"
+    state = (resp.get("data") or {}).get("state")
+    if state == "filled":
+        return "filled"
+    if state in ("canceled", "cancelled"):
+        return "canceled"
+    return "submitted"
+
+
+def submit_order(
+    client: BitgetClient,
+    place: Callable[..., Any],
+    oid: str,
+    closing: bool = False,
+    **order: Any,
+) -> Dict[str, Any]:
+    """Call place(client_oid=oid, **order) with retries that never double-submit.
+
+    Transient failures are retried with jittered exponential backoff. A retry
+    first asks the exchange for oid: if the earlier attempt did land, its
+    detail is returned (with "recovered": True) instead of placing again, and
+    if the lookup itself fails the order is not resent blind. A rejected
+    order is also checked, since the usual reason after a restart is that the
+    same clientOid was already used. Only a live or filled order counts as
+    recovered; one that was canceled or rejected comes back as a non-success
+    response with "spent": True, and the caller must retry under a new
+    generation of the id. Non-transient errors and the last transient error
+    after ORDER_MAX_ATTEMPTS propagate.
+    """
+    symbol = order["symbol"]
+    action = "close" if closing else "open"
+    priority = PRIORITY_CLOSE if closing else PRIORITY_OPEN
+    last_exc: Optional[Exception] = None
+    for attempt in range(settings.order_max_attempts):
+        if attempt:
+            time.sleep(_backoff(attempt))
+            try:
+                existing = find_order(client, symbol, oid, priority)
+            except Exception as exc:
+                if not _transient(exc):
+                    raise
+                last_exc = exc
+                continue
+            if existing is not None:
+                return _existing(action, existing)
+            ORDER_RETRIES.inc(action=action, outcome="resubmitted")
+        try:
+            resp = place(client_oid=oid, **order)
+        except Exception as exc:
+            if not _transient(exc):
+                if isinstance(exc, BitgetAPIError):
+                    existing = _lookup_after_reject(client, symbol, oid, priority)
+                    if existing is not None:
+                        return _existing(action, existing)
+                raise
+            print(f"[orders] {action} {symbol} attempt {attempt + 1} failed: {exc}")
+            last_exc = exc
+            continue
+        if resp.get("code") != SUCCESS:
+            existing = _lookup_after_reject(client, symbol, oid, priority)
+            if existing is not None:
+                return _existing(action, existing)
+        return resp
+    raise last_exc or RuntimeError(f"{action} {symbol}: ORDER_MAX_ATTEMPTS is 0")
+
+
+def _existing(action: str, detail: Dict[str, Any]) -> Dict[str, Any]:
+    # Result for an order the exchange already holds under the clientOid
+    state = detail.get("state")
+    if state in LIVE_STATES:
+        ORDER_RETRIES.inc(action=action, outcome="recovered")
+        return {"code": SUCCESS, "msg": "recovered", "data": detail, "recovered": True}
+    ORDER_RETRIES.inc(action=action, outcome="spent")
+    return {"code": "spent", "msg": f"clientOid already used by a {state or 'unknown'} order", "data": detail, "spent": True}
+
+
+def _lookup_after_reject(client: BitgetClient, symbol: str, oid: str, priority: int) -> Optional[Dict[str, Any]]:
+    try:
+        return find_order(client, symbol, oid, priority)
+    except Exception:
+        # Can't tell; report the rejection as-is
+        return None
@@ -1,12 +1,31 @@
 import time
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List
 
 from .bitget_client import BitgetClient
+from .checkpoint import TraderCheckpoint
 from .config import settings, paper_settings
+from .entry_scheduler import ENTRY_WINDOW_MINUTES, EntrySchedule
+from .journal import JournalingClient, TickJournal
+from .metrics import (
+    DB_SECONDS,
+    ENTRY_LATENCY_SECONDS,
+    OPEN_LEGS,
+    ORDERS_TOTAL,
+    SNAPSHOT_ROWS,
+    TICK_SECONDS,
+    mark_poll_success,
+    start_metrics_server,
+)
+from .pnl import PnlLedger, pnl_usdt_short
+from .portfolio import Portfolio
+from .profiling import TickProfiler
+from .settings_store import SettingsStore
+from .snapshot_policy import SnapshotPolicy
 from .strategy import StrategyEngine
+from .tracing import configure_tracing, span
 from .db import get_conn
+from .lease import Lease, LeaseLost
 from backend.worker.telemetry_writer import write_heartbeat
 from .db_ops import (
     create_run,
@@ -14,12 +33,12 @@ from .db_ops import (
     get_active_run,
     get_legs,
     get_run_balances,
-    get_settings,
     insert_event,
     insert_leg,
     insert_order,
     insert_snapshot,
-    get_open_legs,
+    notify_change,
+    refresh_report_series,
     update_leg_exit,
     update_leg_max,
     update_run_status,
@@ -32,20 +51,27 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _pnl_usdt_short(entry_price: float, mark_price: float, qty: float) -> float:
-    return (entry_price - mark_price) * qty
-
-
 class PaperTrader:
-    def __init__(self) -> None:
+    def __init__(self, client: BitgetClient | None = None) -> None:
         self.settings = paper_settings
-        self.client = BitgetClient()
+        self.journal = TickJournal(self.settings.mode)
+        self.client = client or BitgetClient()
+        if self.journal.enabled:
+            self.client = JournalingClient(self.client, self.journal)
         self.engine = StrategyEngine(self.client, self.settings)
+        self.profiler = TickProfiler(self.settings.mode)
         self.run_id: str | None = None
-        self.legs: Dict[str, Dict[str, float]] = {}
-        self.max_leg_pnl_pct: Dict[str, float] = {}
+        self.portfolio = Portfolio()
         self.initial_balance: float | None = None
-        self.realized_pnl: float = 0.0
+        self.ledger = PnlLedger(settings.taker_fee_rate)
+        self.snapshots = SnapshotPolicy()
+        self.checkpoint = TraderCheckpoint(self.settings.mode)
+        self.settings_store = SettingsStore(self.settings)
+        self.schedule = EntrySchedule(self.settings)
+        self.lease = Lease(f"trader:{self.settings.mode}")
+        # perf_counter at step start; the heartbeat rides on the tick batch when there is one
+        self.tick_start = 0.0
+        self.heartbeat_sent = False
 
     def _select_and_open(self) -> None:
         if self.settings.status != "on":
@@ -60,186 +86,248 @@ class PaperTrader:
                 initial = self.settings.initial_balance
                 update_run_balance(self.run_id, initial_balance=initial, current_balance=current or initial)
             self.initial_balance = initial
-            self.realized_pnl = 0.0
-            for sym, entry, exit_price, qty, status, _exit_ts in get_legs(self.run_id):
-                if status == "closed" and entry is not None and exit_price is not None and qty is not None:
-                    self.realized_pnl += _pnl_usdt_short(float(entry), float(exit_price), float(qty))
-            for sym, entry, qty in get_open_legs(self.run_id):
-                self.legs[sym] = {"entry": float(entry), "qty": float(qty)}
-                self.max_leg_pnl_pct[sym] = 0.0
-            print(f"[paper] resumed run {self.run_id} legs={len(self.legs)}")
+            self.portfolio.reset()
+            self.ledger.reset()
+            self.snapshots.reset()
+            state = self.checkpoint.load(self.run_id)
+            if state is not None:
+                self.checkpoint.restore(state, self.portfolio, self.ledger)
+                print(f"[paper] resumed run {self.run_id} from checkpoint seq={state['seq']} legs={len(self.portfolio)}")
+                return
+            self._rebuild_from_legs()
+            print(f"[paper] resumed run {self.run_id} from legs legs={len(self.portfolio)}")
             return
 
-        if not within_entry_window(self.settings.entry_time_utc, window_minutes=60):
-            print("[paper] outside entry window; waiting for next cycle")
+        now = _now()
+        if not within_entry_window(self.settings.entry_time_utc, window_minutes=ENTRY_WINDOW_MINUTES):
+            if self.schedule.needs_warmup(now):
+                self._warm_up(now)
+            else:
+                print("[paper] outside entry window; waiting for next cycle")
             return
 
-        legs = self.engine.build_leg_plan()
+        prep = self.schedule.prepared(now)
+        with span("paper.build_leg_plan", warm=prep is not None):
+            # With warmup done only fresh prices are fetched here
+            tickers_resp = self.client.get_usdt_perp_tickers()
+            legs = self.engine.build_leg_plan_from_tickers(tickers_resp, prep.specs if prep else None)
         if not legs:
             insert_event("warn", "paper_no_legs", "no legs selected", None)
             print("[paper] no legs selected")
             return
 
-        self.run_id = str(uuid.uuid4())
-        self.initial_balance = self.settings.initial_balance
-        self.realized_pnl = 0.0
-        create_run(
-            run_id=self.run_id,
-            exchange=self.settings.exchange,
-            mode=self.settings.mode,
-            entry_time_utc=self.settings.entry_time_utc,
-            num_legs=self.settings.num_legs,
-            margin_per_leg_usdt=self.settings.margin_per_leg_usdt,
-            leverage=self.settings.leverage,
-            max_pump_pct=self.settings.max_pump_pct,
-            global_kill_dd_pct=self.settings.global_kill_dd_pct,
-            strategy_tag=self.settings.strategy_tag,
-            initial_balance=self.initial_balance,
-            current_balance=self.initial_balance,
-        )
-
-        # Fetch tickers once to avoid repeated API calls per leg
-        tickers = {t.get("symbol"): t for t in self.client.get_usdt_perp_tickers().get("data", [])}
-        for leg in legs:
-            # entry price from latest tickers
-            entry_price = float(
-                (tickers.get(leg.symbol, {}) or {}).get("markPrice")
-                or (tickers.get(leg.symbol, {}) or {}).get("lastPr")
-                or 0
-            )
-            self.legs[leg.symbol] = {"entry": entry_price, "qty": leg.size}
-            self.max_leg_pnl_pct[leg.symbol] = 0.0
-            insert_leg(
-                run_id=self.run_id,
-                symbol=leg.symbol,
-                entry_price=entry_price,
-                qty=leg.size,
-            )
-            insert_order(
+        with span("paper.open_legs", legs=len(legs)):
+            self.run_id = str(uuid.uuid4())
+            self.initial_balance = self.settings.initial_balance
+            self.portfolio.reset()
+            self.ledger.reset()
+            self.snapshots.reset()
+            created = create_run(
                 run_id=self.run_id,
-                symbol=leg.symbol,
-                side="sell",
-                action="open",
-                intent_price=entry_price,
-                fill_price=entry_price,
-                qty=leg.size,
-                status="filled",
+                exchange=self.settings.exchange,
+                mode=self.settings.mode,
+                entry_time_utc=self.settings.entry_time_utc,
+                num_legs=self.settings.num_legs,
+                margin_per_leg_usdt=self.settings.margin_per_leg_usdt,
+                leverage=self.settings.leverage,
+                max_pump_pct=self.settings.max_pump_pct,
+                global_kill_dd_pct=self.settings.global_kill_dd_pct,
+                strategy_tag=self.settings.strategy_tag,
+                initial_balance=self.initial_balance,
+                current_balance=self.initial_balance,
             )
-            print(f"[paper] opened {leg.symbol} @ {entry_price} qty={leg.size}")
+            if not created:
+                # Another replica opened a run first; pick it up through the resume path next tick
+                print(f"[paper] active paper run already exists; not opening run_id={self.run_id}")
+                self.run_id = None
+                return
 
-        insert_event("info", "paper_run_started", "paper run started", self.run_id)
-        print(f"[paper] run started {self.run_id} legs={len(legs)}")
+            # Entry prices from the same tickers the plan was sized on
+            tickers = {t.get("symbol"): t for t in tickers_resp.get("data", [])}
+            for leg in legs:
+                # entry price from latest tickers
+                entry_price = float(
+                    (tickers.get(leg.symbol, {}) or {}).get("markPrice")
+                    or (tickers.get(leg.symbol, {}) or {}).get("lastPr")
+                    or 0
+                )
+                self.portfolio.open(leg.symbol, entry_price, leg.size, self.settings.margin_per_leg_usdt)
+                self.ledger.open_leg(leg.symbol, entry_price, leg.size, _now().timestamp())
+                insert_leg(
+                    run_id=self.run_id,
+                    symbol=leg.symbol,
+                    entry_price=entry_price,
+                    qty=leg.size,
+                )
+                insert_order(
+                    run_id=self.run_id,
+                    symbol=leg.symbol,
+                    side="sell",
+                    action="open",
+                    intent_price=entry_price,
+                    fill_price=entry_price,
+                    qty=leg.size,
+                    status="filled",
+                )
+                ORDERS_TOTAL.inc(service="paper", action="open")
+                print(f"[paper] opened {leg.symbol} @ {entry_price} qty={leg.size}")
 
-    def _get_mark_price(self, symbol: str) -> float:
-        tickers = self.client.get_usdt_perp_tickers().get("data", [])
-        for t in tickers:
-            if t.get("symbol") == symbol:
-                return float(t.get("markPrice") or t.get("lastPr") or 0)
-        return 0.0
+            latency = self.schedule.latency(_now())
+            ENTRY_LATENCY_SECONDS.observe(latency, service="paper", warm=str(prep is not None).lower())
+            self.schedule.prep = None
+            insert_event("info", "paper_run_started", f"paper run started (entry +{latency:.3f}s)", self.run_id)
+            self.checkpoint.save(self._checkpoint_state())
+            notify_change(self.settings.mode)
+        print(f"[paper] run started {self.run_id} legs={len(legs)} entry_latency={latency:.3f}s")
+
+    def _warm_up(self, now: datetime) -> None:
+        with span("paper.warmup"):
+            prep = self.schedule.warm_up(self.engine, now)
+        print(
+            f"[paper] warmed up for {prep.entry_at:%H:%M} UTC:",
+            f"{len(prep.candidates)} candidates, {len(prep.specs)} contracts",
+        )
+
+    def _rebuild_from_legs(self) -> None:
+        # No usable checkpoint: realized PnL/carry from closed legs, trailing max from max_favorable_pnl_usdt
+        now_sec = _now().timestamp()
+        margin = self.settings.margin_per_leg_usdt
+        for sym, entry, exit_price, qty, status, _exit_ts, fees, funding, max_fav in get_legs(self.run_id):
+            if entry is None or qty is None:
+                continue
+            if status == "closed" and exit_price is not None:
+                self.portfolio.add_closed(pnl_usdt_short(float(entry), float(exit_price), float(qty)), margin)
+                self.ledger.add_closed(float(fees), float(funding))
+            elif status == "open":
+                leg = self.portfolio.open(sym, float(entry), float(qty), margin)
+                leg.max_pnl_pct = float(max_fav) / margin if margin > 0 else 0.0
+                self.ledger.restore_leg(sym, float(fees), float(funding), now_sec)
+
+    def _checkpoint_state(self) -> dict:
+        return self.checkpoint.build(self.run_id, self.portfolio, self.ledger)
 
     def _poll_and_update(self) -> None:
         if not self.run_id:
             return
 
-        poll_start = _now()
-        # Pull latest tickers once
-        tickers_resp = self.client.get_usdt_perp_tickers()
-        tickers = {t.get("symbol"): t for t in tickers_resp.get("data", [])}
-        tickers_done = _now()
+        poll_start = self._clock()
+        # Paused: nothing is marked, closed or written until the run resumes
+        latest = self.journal.active_run(get_active_run(mode="paper"))
+        if latest and latest.run_id == self.run_id and latest.status == "paused":
+            return
+
+        # Pull latest tickers once; only open legs are looked at
+        with span("paper.tickers"):
+            tickers_resp = self.client.get_usdt_perp_tickers()
+        tickers_done = self._clock()
 
-        poll_ts = _now()
-        snapshots_rows = []
+        poll_ts = self._clock()
+        poll_sec = poll_ts.timestamp()
+        policy = self.snapshots
+        policy.configure(
+            self.settings.snapshot_min_move_bps,
+            self.settings.snapshot_pnl_step_usdt,
+            self.settings.snapshot_max_interval_sec,
+        )
+        policy.begin()
         leg_max_rows = []
         leg_exit_rows = []
         order_rows = []
         event_rows = []
 
-        portfolio_pnl = 0.0
-        open_symbols: List[str] = list(self.legs.keys())
-        for sym in open_symbols:
-            t = tickers.get(sym, {})
-            mark = float(t.get("markPrice") or t.get("lastPr") or 0)
-            entry = self.legs[sym]["entry"]
-            qty = self.legs[sym]["qty"]
-            if mark <= 0:
-                continue
+        portfolio = self.portfolio
+        with span("paper.evaluate_legs", legs=len(portfolio)):
+            open_legs = portfolio.legs
+            for t in tickers_resp.get("data", []):
+                sym = t.get("symbol")
+                if sym not in open_legs:
+                    continue
+                mark = float(t.get("markPrice") or t.get("lastPr") or 0)
+                leg = portfolio.mark(sym, mark)
+                if leg is None:
+                    continue
 
-            # snapshot and pnl
-            pnl = _pnl_usdt_short(entry, mark, qty=qty)
-            snapshots_rows.append(
-                (
+                # snapshot and pnl; funding accrues only when an 8h settlement was crossed
+                self.ledger.accrue(sym, leg.qty, mark, float(t.get("fundingRate") or 0), poll_sec)
+                accrual = self.ledger.get(sym)
+                snapshot_row = (
                     poll_ts,
                     self.run_id,
                     self.settings.exchange,
                     sym,
                     mark,
-                    pnl,
-                    entry,
-                    qty,
-                    self.settings.margin_per_leg_usdt,
+                    leg.pnl,
+                    leg.entry,
+                    leg.qty,
+                    leg.margin,
                     self.settings.leverage,
+                    accrual.fees_usdt,
+                    accrual.funding_usdt,
                 )
-            )
-            leg_max_rows.append((pnl, pnl, self.run_id, sym))
-            pnl_pct = pnl / self.settings.margin_per_leg_usdt
-            if pnl_pct > self.max_leg_pnl_pct.get(sym, 0.0):
-                self.max_leg_pnl_pct[sym] = pnl_pct
-
-            # leg-level exit (S3 trailing)
-            leg_decision = self.engine.evaluate_leg_exit(
-                leg_pnl_pct=pnl_pct,
-                max_leg_pnl_pct=self.max_leg_pnl_pct.get(sym, 0.0),
-                strategy_tag=self.settings.strategy_tag.lower(),
-            )
-            if leg_decision.exit:
-                reason = leg_decision.reason or "leg_trailing_sl"
-                leg_exit_rows.append((mark, poll_ts, reason, self.run_id, sym))
-                order_rows.append(
-                    (
-                        self.run_id,
-                        sym,
-                        "buy",
-                        "close",
-                        mark,
-                        mark,
-                        qty,
-                        "filled",
-                        poll_ts,
-                    )
+                leg_row_due = policy.leg_row_due(sym, leg.pnl, accrual.fees_usdt, accrual.funding_usdt)
+                if leg_row_due:
+                    leg_max_rows.append((leg.pnl, leg.pnl, accrual.fees_usdt, accrual.funding_usdt, self.run_id, sym))
+
+                # leg-level exit (S3 trailing)
+                leg_decision = self.engine.evaluate_leg_exit(
+                    leg_pnl_pct=leg.pnl_pct,
+                    max_leg_pnl_pct=leg.max_pnl_pct,
+                    strategy_tag=self.settings.strategy_tag.lower(),
                 )
-                self.realized_pnl += _pnl_usdt_short(entry, mark, qty=qty)
-                event_rows.append((poll_ts, "info", "paper_leg_closed", f"{sym} {reason}", self.run_id))
-                print(f"[paper] closed {sym} reason={leg_decision.reason}")
-                self.legs.pop(sym, None)
-                self.max_leg_pnl_pct.pop(sym, None)
-                continue
+                policy.offer(sym, mark, leg.pnl, snapshot_row, closing=leg_decision.exit, force=leg_row_due)
+                if leg_decision.exit:
+                    reason = leg_decision.reason or "leg_trailing_sl"
+                    portfolio.close(sym, mark)
+                    closed = self.ledger.close_leg(sym, mark, leg.qty)
+                    leg_exit_rows.append((mark, poll_ts, reason, closed.fees_usdt, closed.funding_usdt, self.run_id, sym))
+                    order_rows.append(
+                        (
+                            self.run_id,
+                            sym,
+                            "buy",
+                            "close",
+                            mark,
+                            mark,
+                            leg.qty,
+                            "filled",
+                            poll_ts,
+                        )
+                    )
+                    ORDERS_TOTAL.inc(service="paper", action="close")
+                    event_rows.append((poll_ts, "info", "paper_leg_closed", f"{sym} {reason}", self.run_id))
+                    print(f"[paper] closed {sym} reason={leg_decision.reason}")
 
-            portfolio_pnl += pnl
-
-        # Evaluate exit
-        latest = get_active_run(mode="paper")
-        if latest and latest.run_id == self.run_id and latest.status == "paused":
-            return
+        offered = policy.offered
+        snapshots_rows = policy.select(poll_ts)
+        SNAPSHOT_ROWS.inc(len(snapshots_rows), service="paper", outcome="written")
+        if offered > len(snapshots_rows):
+            SNAPSHOT_ROWS.inc(offered - len(snapshots_rows), service="paper", outcome="skipped")
 
         hours_elapsed = 0.0
         if latest and latest.start_ts:
             try:
                 start_ts = datetime.fromisoformat(latest.start_ts)
-                hours_elapsed = ( _now() - start_ts ).total_seconds() / 3600
+                hours_elapsed = ( self._clock() - start_ts ).total_seconds() / 3600
             except Exception:
                 hours_elapsed = 0.0
 
-        if snapshots_rows or leg_max_rows or leg_exit_rows or order_rows or event_rows:
+        base_balance = self.initial_balance if self.initial_balance is not None else self.settings.initial_balance
+        current_balance = base_balance + portfolio.total_pnl + self.ledger.carry()
+
+        with span("paper.db_batch", snapshots=len(snapshots_rows)):
+            db_start = time.perf_counter()
             with get_conn() as conn:
                 with conn.cursor() as cur:
+                    # Fencing: a replica that lost the lease mid-tick rolls back instead of double-writing
+                    self.lease.check(cur)
                     if snapshots_rows:
                         cur.executemany(
                             """
                             insert into snapshots (
                                 ts, run_id, exchange, symbol, price, unrealized_pnl_usdt,
-                                entry_price, position_size, margin_usdt, leverage
+                                entry_price, position_size, margin_usdt, leverage, fees_usdt, funding_usdt
                             )
-                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                             """,
                             snapshots_rows,
                         )
@@ -248,7 +336,9 @@ class PaperTrader:
                             """
                             update legs
                             set max_favorable_pnl_usdt = greatest(max_favorable_pnl_usdt, %s),
-                                max_adverse_pnl_usdt = least(max_adverse_pnl_usdt, %s)
+                                max_adverse_pnl_usdt = least(max_adverse_pnl_usdt, %s),
+                                fees_usdt = %s,
+                                funding_usdt = %s
                             where run_id = %s and symbol = %s
                             """,
                             leg_max_rows,
@@ -257,7 +347,8 @@ class PaperTrader:
                         cur.executemany(
                             """
                             update legs
-                            set exit_price = %s, exit_ts = %s, exit_reason = %s, status = 'closed'
+                            set exit_price = %s, exit_ts = %s, exit_reason = %s, status = 'closed',
+                                fees_usdt = %s, funding_usdt = %s
                             where run_id = %s and symbol = %s
                             """,
                             leg_exit_rows,
@@ -278,72 +369,153 @@ class PaperTrader:
                             """,
                             event_rows,
                         )
+                    cur.execute(
+                        """
+                        update runs
+                        set current_balance = %s
+                        where run_id = %s
+                        """,
+                        (current_balance, self.run_id),
+                    )
+                    self.checkpoint.save(self._checkpoint_state(), cur)
+                    write_heartbeat("paper", self._tick_ms(), cur=cur)
+                    notify_change(self.settings.mode, cur)
                 conn.commit()
+            policy.commit()
+            self.heartbeat_sent = True
+            DB_SECONDS.observe(time.perf_counter() - db_start, group="tick_batch")
 
-        leg_count = max(0, len(self.legs))
-        if leg_count > 0:
-            portfolio_pnl_pct = portfolio_pnl / (self.settings.margin_per_leg_usdt * leg_count)
-        else:
-            portfolio_pnl_pct = 0.0
+        # Realized + unrealized over all margin opened this run, so closed legs keep their weight
         decision = self.engine.evaluate_portfolio_exit(
-            portfolio_pnl_pct,
+            portfolio.pnl_pct,
             hours_elapsed,
             self.settings.strategy_tag.lower(),
         )
-        if self.run_id:
-            base_balance = self.initial_balance if self.initial_balance is not None else self.settings.initial_balance
-            update_run_balance(self.run_id, current_balance=base_balance + self.realized_pnl + portfolio_pnl)
         if decision.exit:
-            # Close all legs
-            for sym in list(self.legs.keys()):
-                entry = self.legs[sym]["entry"]
-                mark = self._get_mark_price(sym)
-                self.realized_pnl += _pnl_usdt_short(entry, mark, qty=self.legs[sym]["qty"])
-                update_leg_exit(self.run_id, sym, mark, decision.reason or "24h")
-                insert_order(
-                    run_id=self.run_id,
-                    symbol=sym,
-                    side="buy",
-                    action="close",
-                    intent_price=mark,
-                    fill_price=mark,
-                    qty=self.legs[sym]["qty"],
-                    status="filled",
-                )
-                print(f"[paper] closed {sym} reason={decision.reason}")
-            update_run_status(self.run_id, "completed")
-            end_run(self.run_id)
-            insert_event("info", "paper_run_completed", f"exit {decision.reason}", self.run_id)
-            print(f"[paper] run completed reason={decision.reason}")
-            # Prevent duplicate close on next tick
-            self.legs.clear()
-            self.max_leg_pnl_pct.clear()
-            self.run_id = None
+            with span("paper.close_all", reason=decision.reason or ""):
+                # Close all legs at fresh marks (one tickers call for every leg)
+                marks = {
+                    t["symbol"]: float(t.get("markPrice") or t.get("lastPr") or 0)
+                    for t in self.client.get_usdt_perp_tickers().get("data", [])
+                    if t.get("symbol") in portfolio
+                }
+                for sym in portfolio:
+                    mark = marks.get(sym) or portfolio.get(sym).mark
+                    leg = portfolio.close(sym, mark)
+                    closed = self.ledger.close_leg(sym, mark, leg.qty)
+                    update_leg_exit(
+                        self.run_id,
+                        sym,
+                        mark,
+                        decision.reason or "24h",
+                        fees_usdt=closed.fees_usdt,
+                        funding_usdt=closed.funding_usdt,
+                    )
+                    insert_order(
+                        run_id=self.run_id,
+                        symbol=sym,
+                        side="buy",
+                        action="close",
+                        intent_price=mark,
+                        fill_price=mark,
+                        qty=leg.qty,
+                        status="filled",
+                    )
+                    ORDERS_TOTAL.inc(service="paper", action="close")
+                    print(f"[paper] closed {sym} reason={decision.reason}")
+                update_run_balance(self.run_id, current_balance=base_balance + portfolio.total_pnl + self.ledger.carry())
+                update_run_status(self.run_id, "completed")
+                end_run(self.run_id)
+                insert_event("info", "paper_run_completed", f"exit {decision.reason}", self.run_id)
+                notify_change(self.settings.mode)
+                if settings.reports_use_matview:
+                    refresh_report_series()
+                print(f"[paper] run completed reason={decision.reason}")
+                # Prevent duplicate close on next tick
+                self.portfolio.reset()
+                self.ledger.reset()
+                self.snapshots.reset()
+                self.checkpoint.clear()
+                self.run_id = None
             return
 
-        poll_end = _now()
+        poll_end = self._clock()
         print(
             "[paper] poll timing",
             f"tickers={(tickers_done - poll_start).total_seconds():.2f}s",
             f"total={(poll_end - poll_start).total_seconds():.2f}s",
         )
 
-    def run_once(self) -> None:
-        while True:
-            write_heartbeat("paper")
+    def step(self) -> float | None:
+        """One loop iteration; returns seconds until the next one, or None while on standby."""
+        if not self.lease.acquire():
+            # Standby: another replica owns paper trading; retry until its lease expires
+            self.stand_by()
+            return None
+        self.tick_start = time.perf_counter()
+        self.heartbeat_sent = False
+        with span("paper.tick"):
             self._refresh_settings()
+            self.profiler.sync(self.settings.profile_ticks, self.run_id)
+            self.profiler.start_tick()
             if not self.run_id:
                 self._select_and_open()
             print(f"[paper] poll tick {datetime.now(timezone.utc).isoformat()} interval={self.settings.poll_interval_sec}s")
             if self.run_id:
-                self._poll_and_update()
-            time.sleep(self.settings.poll_interval_sec)
+                try:
+                    with TICK_SECONDS.time(service="paper"), self.journal.tick(self):
+                        self._poll_and_update()
+                    mark_poll_success("paper")
+                except LeaseLost as exc:
+                    print(f"[paper] {exc}; standing by")
+                    self.stand_by()
+            OPEN_LEGS.set(len(self.portfolio), service="paper")
+            self.profiler.end_tick(self.run_id)
+            if not self.heartbeat_sent and self.lease.held:
+                # No run (or it just completed): heartbeat on its own
+                write_heartbeat("paper", self._tick_ms())
+        return self._next_interval()
+
+    def _next_interval(self) -> float:
+        # Between runs wake exactly at warmup and entry time rather than on the poll grid
+        if self.run_id or self.settings.status != "on":
+            return self.settings.poll_interval_sec
+        return self.schedule.wake_in(_now(), self.settings.poll_interval_sec)
+
+    def _clock(self) -> datetime:
+        # Wall-clock reads inside a poll tick go through the journal so a replay sees the same times
+        return self.journal.clock(_now())
+
+    def _tick_ms(self) -> float:
+        return (time.perf_counter() - self.tick_start) * 1000.0
+
+    def run_once(self) -> None:
+        start_metrics_server(self.settings.metrics_port)
+        configure_tracing("paper")
+        try:
+            while True:
+                interval = self.step()
+                if interval is None:
+                    time.sleep(settings.lease_retry_sec)
+                elif not self.lease.sleep(interval):
+                    self.stand_by()
+        finally:
+            # Clean shutdown hands over immediately instead of after the TTL
+            self.lease.release()
+
+    def stand_by(self) -> None:
+        # Not the leader: forget the run so taking the lease back resumes it from the checkpoint
+        if self.run_id:
+            print(f"[paper] lease not held; dropping in-memory state for run {self.run_id}")
+        self.run_id = None
+        self.portfolio.reset()
+        self.ledger.reset()
+        self.snapshots.reset()
 
     def _refresh_settings(self) -> None:
         try:
-            overrides = get_settings(self.settings.mode)
-            if overrides:
-                self.settings.apply_overrides(overrides)
+            # Version check each tick; rows are only re-read and re-parsed after a change
+            self.settings_store.refresh()
         except Exception:
             # ignore DB errors to keep trading loop alive
             return
@@ -0,0 +1,106 @@
+from typing import Any, Dict, Optional
+
+
+# Bitget settles USDT-M funding every 8h at 00:00/08:00/16:00 UTC
+FUNDING_INTERVAL_SEC = 8 * 3600
+
+
+def pnl_usdt_short(entry_price: float, mark_price: float, qty: float) -> float:
+    # Short PnL = (entry - mark) * qty; price move only, before fees/funding
+    return (entry_price - mark_price) * qty
+
+
+def funding_period(ts_sec: float) -> int:
+    return int(ts_sec // FUNDING_INTERVAL_SEC)
+
+
+class LegAccrual:
+    __slots__ = ("fees_usdt", "funding_usdt", "funding_period")
+
+    def __init__(self, fees_usdt: float = 0.0, funding_usdt: float = 0.0, period: int = 0) -> None:
+        self.fees_usdt = fees_usdt
+        # positive = received (shorts receive when the rate is positive)
+        self.funding_usdt = funding_usdt
+        self.funding_period = period
+
+
+class PnlLedger:
+    """Per-leg fees and funding ("carry") on top of price PnL, updated incrementally each tick.
+
+    Fees are taker_fee_rate * notional per fill. Funding is accrued once per 8h
+    settlement crossed since the leg's last accrual: a short receives
+    qty * mark * rate. Net PnL = price PnL (Portfolio) + carry().
+    """
+
+    def __init__(self, taker_fee_rate: float) -> None:
+        self.taker_fee_rate = taker_fee_rate
+        self.legs: Dict[str, LegAccrual] = {}
+        # funding - fees of legs already closed in the run
+        self.closed_carry = 0.0
+
+    def reset(self) -> None:
+        self.legs.clear()
+        self.closed_carry = 0.0
+
+    def fill_fee(self, price: float, qty: float) -> float:
+        return abs(price * qty) * self.taker_fee_rate
+
+    def open_leg(self, symbol: str, price: float, qty: float, ts_sec: float) -> float:
+        fee = self.fill_fee(price, qty)
+        self.legs[symbol] = LegAccrual(fees_usdt=fee, period=funding_period(ts_sec))
+        return fee
+
+    def restore_leg(self, symbol: str, fees_usdt: float, funding_usdt: float, ts_sec: float) -> None:
+        # Resume after restart; accrual restarts from the current period (downtime is not back-filled)
+        self.legs[symbol] = LegAccrual(fees_usdt, funding_usdt, funding_period(ts_sec))
+
+    def periods_due(self, symbol: str, ts_sec: float) -> int:
+        leg = self.legs.get(symbol)
+        if leg is None:
+            return 0
+        return max(0, funding_period(ts_sec) - leg.funding_period)
+
+    def accrue(self, symbol: str, qty: float, mark: float, rate: float, ts_sec: float, periods: Optional[int] = None) -> float:
+        leg = self.legs.get(symbol)
+        if leg is None:
+            leg = self.legs[symbol] = LegAccrual(period=funding_period(ts_sec))
+            return 0.0
+        if periods is None:
+            periods = self.periods_due(symbol, ts_sec)
+        if periods <= 0:
+            return 0.0
+        received = qty * mark * rate * periods
+        leg.funding_usdt += received
+        leg.funding_period = funding_period(ts_sec)
+        return received
+
+    def close_leg(self, symbol: str, exit_price: float, qty: float) -> LegAccrual:
+        leg = self.legs.pop(symbol, None) or LegAccrual()
+        leg.fees_usdt += self.fill_fee(exit_price, qty)
+        self.closed_carry += leg.funding_usdt - leg.fees_usdt
+        return leg
+
+    def add_closed(self, fees_usdt: float, funding_usdt: float) -> None:
+        # Resume: carry of legs closed before a restart
+        self.closed_carry += funding_usdt - fees_usdt
+
+    def open_carry(self) -> float:
+        # funding received minus fees paid on legs still open
+        return sum(leg.funding_usdt - leg.fees_usdt for leg in self.legs.values())
+
+    def carry(self) -> float:
+        return self.closed_carry + self.open_carry()
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "legs": {sym: [leg.fees_usdt, leg.funding_usdt, leg.funding_period] for sym, leg in self.legs.items()},
+            "closed_carry": self.closed_carry,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        # Unlike restore_leg, keeps each leg's funding period so settlements during downtime still accrue
+        self.legs = {sym: LegAccrual(fees, funding, int(period)) for sym, (fees, funding, period) in state["legs"].items()}
+        self.closed_carry = state["closed_carry"]
+
+    def get(self, symbol: str) -> LegAccrual:
+        return self.legs.get(symbol) or LegAccrual()
@@ -0,0 +1,137 @@
+from typing import Any, Dict, Iterator, Optional
+
+
+class LegState:
+    __slots__ = ("symbol", "entry", "qty", "margin", "mark", "pnl", "max_pnl_pct")
+
+    def __init__(self, symbol: str, entry: float, qty: float, margin: float) -> None:
+        self.symbol = symbol
+        self.entry = entry
+        self.qty = qty
+        self.margin = margin
+        self.mark = entry
+        self.pnl = 0.0
+        self.max_pnl_pct = 0.0
+
+    @property
+    def pnl_pct(self) -> float:
+        # vs the leg's margin (e.g. +1.0 = +100%)
+        return self.pnl / self.margin if self.margin > 0 else 0.0
+
+
+class Portfolio:
+    """Open short legs plus running unrealized/realized sums for one run.
+
+    Each mark update adjusts the running unrealized sum by that leg's PnL delta,
+    so portfolio totals never need a pass over the legs. The PnL % denominator is
+    the margin of every leg opened in the run, and closed legs move their PnL
+    into `realized`, so closing a leg changes neither basis.
+    """
+
+    __slots__ = ("legs", "unrealized", "realized", "margin_opened")
+
+    def __init__(self) -> None:
+        self.legs: Dict[str, LegState] = {}
+        self.unrealized = 0.0
+        self.realized = 0.0
+        self.margin_opened = 0.0
+
+    def reset(self) -> None:
+        self.legs.clear()
+        self.unrealized = 0.0
+        self.realized = 0.0
+        self.margin_opened = 0.0
+
+    def __len__(self) -> int:
+        return len(self.legs)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.legs
+
+    def __iter__(self) -> Iterator[str]:
+        # snapshot of keys so callers may close legs while iterating
+        return iter(list(self.legs))
+
+    def get(self, symbol: str) -> Optional[LegState]:
+        return self.legs.get(symbol)
+
+    def open(self, symbol: str, entry: float, qty: float, margin: float) -> LegState:
+        leg = LegState(symbol, entry, qty, margin)
+        self.legs[symbol] = leg
+        self.margin_opened += margin
+        return leg
+
+    def add_closed(self, realized_pnl: float, margin: float) -> None:
+        # Resume: legs closed before a restart still count toward both bases
+        self.realized += realized_pnl
+        self.margin_opened += margin
+
+    def mark(self, symbol: str, mark: float) -> Optional[LegState]:
+        # Short: pnl = (entry - mark) * qty
+        leg = self.legs.get(symbol)
+        if leg is None or mark <= 0:
+            return None
+        return self._set_pnl(leg, mark, (leg.entry - mark) * leg.qty)
+
+    def sync(self, symbol: str, entry: float, qty: float, mark: float, pnl: float, margin: float) -> LegState:
+        # Live: exchange reports entry/qty/pnl directly; unknown symbols are adopted
+        leg = self.legs.get(symbol)
+        if leg is None:
+            leg = self.open(symbol, entry, qty, margin)
+        else:
+            if margin > 0 and margin != leg.margin:
+                self.margin_opened += margin - leg.margin
+                leg.margin = margin
+            leg.entry = entry
+            leg.qty = qty
+        return self._set_pnl(leg, mark, pnl)
+
+    def _set_pnl(self, leg: LegState, mark: float, pnl: float) -> LegState:
+        self.unrealized += pnl - leg.pnl
+        leg.mark = mark
+        leg.pnl = pnl
+        pct = leg.pnl_pct
+        if pct > leg.max_pnl_pct:
+            leg.max_pnl_pct = pct
+        return leg
+
+    def close(self, symbol: str, exit_price: Optional[float] = None) -> Optional[LegState]:
+        leg = self.legs.pop(symbol, None)
+        if leg is None:
+            return None
+        self.unrealized -= leg.pnl
+        if exit_price is not None and exit_price > 0:
+            leg.mark = exit_price
+            leg.pnl = (leg.entry - exit_price) * leg.qty
+        self.realized += leg.pnl
+        return leg
+
+    def to_state(self) -> Dict[str, Any]:
+        # JSON-safe; see TraderCheckpoint
+        return {
+            "legs": {
+                sym: [leg.entry, leg.qty, leg.margin, leg.mark, leg.pnl, leg.max_pnl_pct]
+                for sym, leg in self.legs.items()
+            },
+            "realized": self.realized,
+            "margin_opened": self.margin_opened,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.reset()
+        for sym, (entry, qty, margin, mark, pnl, max_pnl_pct) in state["legs"].items():
+            leg = self.legs[sym] = LegState(sym, entry, qty, margin)
+            leg.mark = mark
+            leg.pnl = pnl
+            leg.max_pnl_pct = max_pnl_pct
+            self.unrealized += pnl
+        self.realized = state["realized"]
+        self.margin_opened = state["margin_opened"]
+
+    @property
+    def total_pnl(self) -> float:
+        return self.realized + self.unrealized
+
+    @property
+    def pnl_pct(self) -> float:
+        return self.total_pnl / self.margin_opened if self.margin_opened > 0 else 0.0
@@ -0,0 +1,83 @@
+import cProfile
+import io
+import os
+import pstats
+from datetime import datetime, timezone
+from typing import Optional
+
+from .config import getenv
+from .db_ops import insert_event, upsert_settings
+
+
+PROFILE_TOP_N = 15
+
+
+class TickProfiler:
+    """cProfile over the next N ticks, armed from the PROFILE_TICKS settings key.
+
+    Writing PROFILE_TICKS=N (API PUT /settings) profiles the next N ticks, dumps
+    a .pstats file plus an events row, then resets the key to 0 so the capture is
+    one-shot. Writing 0 mid-capture stops it early. When idle the per-tick cost is
+    a single attribute check.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.out_dir = getenv("PROFILE_DIR", "profiles")
+        self._profile: Optional[cProfile.Profile] = None
+        self._remaining = 0
+        self._total = 0
+
+    @property
+    def active(self) -> bool:
+        return self._profile is not None
+
+    def sync(self, requested_ticks: int, run_id: Optional[str]) -> None:
+        # Called after _refresh_settings on every tick
+        if self._profile is None:
+            if requested_ticks > 0:
+                self._profile = cProfile.Profile()
+                self._remaining = requested_ticks
+                self._total = requested_ticks
+                print(f"[{self.mode}] profiling next {requested_ticks} ticks")
+        elif requested_ticks <= 0:
+            self._finish(run_id, reset_setting=False)
+
+    def start_tick(self) -> None:
+        if self._profile is not None:
+            self._profile.enable()
+
+    def end_tick(self, run_id: Optional[str]) -> None:
+        if self._profile is None:
+            return
+        self._profile.disable()
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._finish(run_id, reset_setting=True)
+
+    def _finish(self, run_id: Optional[str], reset_setting: bool) -> None:
+        profile, self._profile = self._profile, None
+        ticks = self._total - max(self._remaining, 0)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(self.out_dir, f"{self.mode}-{stamp}.pstats")
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            profile.dump_stats(path)
+            buf = io.StringIO()
+            pstats.Stats(profile, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            summary = buf.getvalue()
+            print(summary)
+            insert_event(
+                "info",
+                f"{self.mode}_profile_dumped",
+                f"{ticks} ticks -> {path}\n{summary[-4000:]}",
+                run_id,
+            )
+        except Exception as exc:
+            print(f"[{self.mode}] profile dump failed: {exc}")
+        if reset_setting:
+            try:
+                upsert_settings(self.mode, {"PROFILE_TICKS": "0"})
+            except Exception:
+                # the next refresh would re-arm; better than crashing the loop
+                print(f"[{self.mode}] could not reset PROFILE_TICKS")
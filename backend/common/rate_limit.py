@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .metrics import BITGET_QUEUE_SECONDS, BITGET_RATE_LIMITED
+
+
+# Priority classes (lower is served first)
+PRIORITY_CLOSE = 0
+PRIORITY_OPEN = 1
+PRIORITY_POLL = 2
+PRIORITY_NAMES = {PRIORITY_CLOSE: "close", PRIORITY_OPEN: "open", PRIORITY_POLL: "poll"}
+
+# Documented Bitget v2 mix limits (requests/second). Order and position/account
+# limits are per UID, market data per IP; "global" caps the whole process.
+FAMILY_LIMITS: Dict[str, float] = {
+    "order": 10.0,
+    "leverage": 5.0,
+    "position": 5.0,
+    "account": 10.0,
+    "market": 20.0,
+    "global": 50.0,
+}
+
+# Used when a 429 carries no Retry-After header
+DEFAULT_RETRY_AFTER_SEC = 1.0
+
+
+def endpoint_family(path: str) -> str:
+    if path.startswith("/api/v2/mix/order/"):
+        return "order"
+    if path.startswith("/api/v2/mix/account/set-leverage"):
+        return "leverage"
+    if path.startswith("/api/v2/mix/position/"):
+        return "position"
+    if path.startswith("/api/v2/mix/account/"):
+        return "account"
+    return "market"
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    try:
+        return max(0.0, float(value)) if value else DEFAULT_RETRY_AFTER_SEC
+    except ValueError:
+        return DEFAULT_RETRY_AFTER_SEC
+
+
+class TokenBucket:
+    """rate tokens/second, up to burst; not locked (RequestScheduler holds its lock)."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        # set from a 429 Retry-After; no tokens are handed out before this
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        # Seconds until one token is available (0 = now)
+        self._refill(now)
+        wait = self.blocked_until - now
+        if self.tokens < 1.0:
+            wait = max(wait, (1.0 - self.tokens) / self.rate)
+        return max(0.0, wait)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def try_take(self, now: Optional[float] = None) -> float:
+        # Non-blocking: take a token and return 0, or return the wait without taking one
+        now = time.monotonic() if now is None else now
+        wait = self.wait_time(now)
+        if wait <= 0:
+            self.take(now)
+        return wait
+
+    def block(self, seconds: float, now: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = max(self.updated, now)
+
+
+class RequestScheduler:
+    """Token buckets per Bitget endpoint family with priority queueing.
+
+    acquire() blocks the calling thread until its request may be sent. Waiters
+    for the same family are served strictly by (priority, arrival); across
+    families the shared "global" bucket goes to the best waiter whose own
+    family has a token, so a kill-switch close-all is never stuck behind
+    market-data polls. A 429 blocks the family for its Retry-After.
+
+    One scheduler is shared per process (see BitgetClient), so the supervisor's
+    engines draw from the same buckets; separate service processes each keep
+    their own, which is why the defaults run below the documented limits.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, float]] = None, scale: float = 1.0) -> None:
+        limits = limits or FAMILY_LIMITS
+        self.enabled = scale > 0
+        self.buckets = {family: TokenBucket(rate * scale) for family, rate in limits.items()} if self.enabled else {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        # per family heap of (priority, seq)
+        self._waiters: Dict[str, List[Tuple[int, int]]] = {family: [] for family in self.buckets}
+
+    def _blocker(self, family: str, ticket: Tuple[int, int], now: float) -> Optional[float]:
+        # None = ticket may go now; else seconds to wait (0 = wait for another waiter)
+        if self._waiters[family][0] != ticket:
+            return 0.0
+        wait = self.buckets[family].wait_time(now)
+        glob = self.buckets.get("global")
+        if glob is not None:
+            wait = max(wait, glob.wait_time(now))
+            if wait <= 0:
+                for other, heap in self._waiters.items():
+                    if other != family and heap and heap[0] < ticket and self.buckets[other].wait_time(now) <= 0:
+                        # a better request elsewhere is also ready; let it have the global token
+                        return 0.0
+        return wait if wait > 0 else None
+
+    def acquire(self, family: str, priority: int = PRIORITY_POLL) -> float:
+        """Wait for a slot; returns the seconds spent queueing."""
+        if not self.enabled:
+            return 0.0
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heap = self._waiters[family]
+            heapq.heappush(heap, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._blocker(family, ticket, now)
+                    if wait is None:
+                        self.buckets[family].take(now)
+                        if "global" in self.buckets:
+                            self.buckets["global"].take(now)
+                        break
+                    # 0 = woken by another waiter; otherwise sleep until a token refills
+                    self._cond.wait(wait or None)
+            finally:
+                heap.remove(ticket)
+                heapq.heapify(heap)
+                self._cond.notify_all()
+        queued = time.monotonic() - start
+        BITGET_QUEUE_SECONDS.observe(queued, family=family, priority=PRIORITY_NAMES.get(priority, str(priority)))
+        return queued
+
+    def rate_limited(self, family: str, retry_after: float) -> None:
+        # Bitget returned 429: stop the family until retry_after has passed
+        BITGET_RATE_LIMITED.inc(family=family)
+        if not self.enabled:
+            # No buckets to block; still back off before the caller retries
+            time.sleep(retry_after)
+            return
+        with self._cond:
+            self.buckets[family].block(retry_after, time.monotonic())
+            self._cond.notify_all()
+
+
+_default: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> RequestScheduler:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RequestScheduler(scale=settings.bitget_rate_limit_scale)
+        return _default
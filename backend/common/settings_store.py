@@ -0,0 +1,34 @@
+from .config import RuntimeSettings, parse_overrides
+from .db_ops import get_settings_version, get_versioned_settings, insert_event
+
+
+class SettingsStore:
+    """DB overrides for one RuntimeSettings, reloaded only when the mode's settings version moves.
+
+    Each tick costs one primary-key lookup on settings_versions (bumped by a
+    trigger on every settings write). Rows are read and parsed only after a
+    change, so typed validation runs once per change instead of once per tick,
+    and invalid values are reported once as an event.
+    """
+
+    def __init__(self, runtime: RuntimeSettings) -> None:
+        self.runtime = runtime
+        # -1 = never loaded; 0 = the mode has no settings_versions row yet
+        self.version = -1
+
+    def refresh(self) -> bool:
+        """Apply overrides if they changed since the last call; True when reloaded."""
+        mode = self.runtime.mode
+        if get_settings_version(mode) == self.version:
+            return False
+        version, overrides = get_versioned_settings(mode)
+        typed, errors = parse_overrides(overrides)
+        if errors:
+            detail = ", ".join(f"{k}: {v}" for k, v in sorted(errors.items()))
+            print(f"[settings] {mode} v{version} ignoring invalid values ({detail})")
+            insert_event("warn", "settings_invalid", f"{mode} v{version}: {detail}", None)
+        self.runtime.apply_typed(typed)
+        if self.version >= 0:
+            print(f"[settings] {mode} reloaded v{self.version} -> v{version}")
+        self.version = version
+        return True
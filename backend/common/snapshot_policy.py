@@ -0,0 +1,235 @@
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+
+# Float slack when comparing reconstructed vs tracked series values
+_EPS = 1e-9
+
+
+class _LegWrite:
+    __slots__ = ("price", "pnl", "ts", "seen_price", "seen_pnl", "row", "max_pnl", "min_pnl", "fees", "funding")
+
+    def __init__(self) -> None:
+        # last persisted snapshot (ts None = never written)
+        self.price = 0.0
+        self.pnl = 0.0
+        self.ts: Optional[float] = None
+        # last observed snapshot, persisted or not
+        self.seen_price = 0.0
+        self.seen_pnl: Optional[float] = None
+        self.row: Optional[tuple] = None
+        # last persisted legs row extremes / carry
+        self.max_pnl: Optional[float] = None
+        self.min_pnl: Optional[float] = None
+        self.fees: Optional[float] = None
+        self.funding: Optional[float] = None
+
+
+_leg_values = attrgetter(*_LegWrite.__slots__)
+
+
+class SnapshotPolicy:
+    """Decides which per-leg snapshot rows a tick persists (deadband compression).
+
+    A leg is written when its price moved at least min_move_bps, its PnL moved at
+    least pnl_step_usdt, or max_interval_sec passed since its last row. Opening and
+    closing ticks, new per-leg PnL highs/lows and fee/funding changes are always
+    written, so per-leg MAE/MFE and carry read from snapshots stay exact. Readers
+    rebuild the run series as a step function (see run_pnl_series in schema.sql).
+
+    To keep report peak / min / max-DD exact, the policy also tracks the true
+    summed PnL of every tick: a tick that sets a new extreme, or whose
+    reconstruction would leave the true envelope, writes every stale leg.
+    All thresholds <= 0 disables compression (every leg, every tick).
+
+    Each tick runs between begin() and commit(); commit() is called once the
+    tick's DB batch committed. A tick that never commits (batch error, lost
+    lease) is undone by the next begin(), so the policy never believes in
+    rows or legs-row extremes the DB does not have.
+    """
+
+    def __init__(self, min_move_bps: float = 0.0, pnl_step_usdt: float = 0.0, max_interval_sec: float = 0.0) -> None:
+        self.legs: Dict[str, _LegWrite] = {}
+        self._pending: Dict[str, Tuple[bool, bool]] = {}
+        # state as of the last committed tick while a tick is open, and the legs it forgot
+        self._saved: Optional[tuple] = None
+        self._forgotten: List[str] = []
+        self.configure(min_move_bps, pnl_step_usdt, max_interval_sec)
+        self.reset()
+
+    def configure(self, min_move_bps: float, pnl_step_usdt: float, max_interval_sec: float) -> None:
+        self.min_move = max(0.0, min_move_bps) / 10_000
+        self.pnl_step = max(0.0, pnl_step_usdt)
+        self.max_interval = max(0.0, max_interval_sec)
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_move > 0 or self.pnl_step > 0 or self.max_interval > 0
+
+    def reset(self) -> None:
+        self.legs.clear()
+        self._pending.clear()
+        self._saved = None
+        self._forgotten.clear()
+        # sum of last persisted pnl = what a reader reconstructs right now
+        self.written_sum = 0.0
+        # sum of last observed pnl = the true series (unpriced legs carried forward)
+        self.seen_sum = 0.0
+        self.peak: Optional[float] = None
+        self.trough: Optional[float] = None
+        self.max_dd = 0.0
+
+    def begin(self) -> None:
+        """Start a tick, first rolling back a previous one that was never committed."""
+        if self._saved is not None:
+            self._rollback()
+        self._saved = (
+            {sym: _leg_values(rec) for sym, rec in self.legs.items()},
+            self.written_sum,
+            self.seen_sum,
+            self.peak,
+            self.trough,
+            self.max_dd,
+        )
+
+    def commit(self) -> None:
+        # The tick's rows (and legs updates) are in the DB
+        self._saved = None
+        self._forgotten.clear()
+
+    def _rollback(self) -> None:
+        saved_legs, self.written_sum, self.seen_sum, self.peak, self.trough, self.max_dd = self._saved
+        self.legs.clear()
+        for sym, values in saved_legs.items():
+            rec = self.legs[sym] = _LegWrite()
+            for slot, value in zip(_LegWrite.__slots__, values):
+                setattr(rec, slot, value)
+        self._pending.clear()
+        self._saved = None
+        # Legs the trader closed in memory stay closed; only the written state is rolled back
+        forgotten, self._forgotten = self._forgotten, []
+        for sym in forgotten:
+            self.forget(sym)
+
+    def _leg(self, symbol: str) -> _LegWrite:
+        rec = self.legs.get(symbol)
+        if rec is None:
+            rec = self.legs[symbol] = _LegWrite()
+        return rec
+
+    def forget(self, symbol: str) -> None:
+        # Leg closed; it drops out of the reconstruction after its last row
+        rec = self.legs.pop(symbol, None)
+        if rec is None:
+            return
+        if self._saved is not None:
+            self._forgotten.append(symbol)
+        if rec.ts is not None:
+            self.written_sum -= rec.pnl
+        if rec.seen_pnl is not None:
+            self.seen_sum -= rec.seen_pnl
+
+    def leg_row_due(self, symbol: str, pnl: float, fees: float, funding: float) -> bool:
+        # legs.max_favorable/max_adverse/fees/funding only need a write when one of them
+        # changes; callers force that tick's snapshot too so both tables agree
+        rec = self._leg(symbol)
+        due = False
+        if rec.max_pnl is None or pnl > rec.max_pnl:
+            rec.max_pnl = pnl
+            due = True
+        if rec.min_pnl is None or pnl < rec.min_pnl:
+            rec.min_pnl = pnl
+            due = True
+        if fees != rec.fees or funding != rec.funding:
+            rec.fees = fees
+            rec.funding = funding
+            due = True
+        return due
+
+    @property
+    def offered(self) -> int:
+        return len(self._pending)
+
+    def offer(self, symbol: str, price: float, pnl: float, row: tuple, closing: bool = False, force: bool = False) -> None:
+        # row is the snapshots insert tuple; row[0] must be its ts
+        rec = self._leg(symbol)
+        self.seen_sum += pnl - (rec.seen_pnl if rec.seen_pnl is not None else 0.0)
+        rec.seen_price = price
+        rec.seen_pnl = pnl
+        rec.row = row
+        self._pending[symbol] = (closing, force or closing)
+
+    def _due(self, rec: _LegWrite, ts_sec: float) -> bool:
+        if rec.ts is None:
+            return True
+        if self.min_move > 0 and rec.price > 0 and abs(rec.seen_price - rec.price) >= self.min_move * rec.price:
+            return True
+        if self.pnl_step > 0 and abs(rec.seen_pnl - rec.pnl) >= self.pnl_step:
+            return True
+        return self.max_interval > 0 and ts_sec - rec.ts >= self.max_interval
+
+    def _stale(self, sym: str, rec: _LegWrite) -> bool:
+        if rec.row is None:
+            return False
+        if rec.ts is None or rec.pnl != rec.seen_pnl:
+            return True
+        return sym in self._pending and self._pending[sym][1]
+
+    def _track(self, total: float) -> bool:
+        # Same definitions as run_series_stats: dd is measured from max(running peak, 0)
+        extreme = False
+        if self.peak is None or total > self.peak + _EPS:
+            self.peak = total
+            extreme = True
+        if self.trough is None or total < self.trough - _EPS:
+            self.trough = total
+            extreme = True
+        dd = total - max(self.peak, 0.0)
+        if dd < self.max_dd - _EPS:
+            self.max_dd = dd
+            extreme = True
+        return extreme
+
+    def _outside(self, total: float) -> bool:
+        return (
+            total > self.peak + _EPS
+            or total < self.trough - _EPS
+            or total - max(self.peak, 0.0) < self.max_dd - _EPS
+        )
+
+    def select(self, ts: datetime) -> List[tuple]:
+        """Rows to persist this tick; updates the written state."""
+        ts_sec = ts.timestamp()
+        legs = self.legs
+        pending = self._pending
+        extreme = self._track(self.seen_sum)
+
+        if not self.enabled:
+            chosen = list(pending)
+        else:
+            chosen = [sym for sym, (_closing, force) in pending.items() if force or self._due(legs[sym], ts_sec)]
+            if chosen and not extreme:
+                recon = self.written_sum
+                for sym in chosen:
+                    rec = legs[sym]
+                    recon += rec.seen_pnl - (rec.pnl if rec.ts is not None else 0.0)
+                extreme = self._outside(recon)
+            if extreme:
+                # Flush every leg whose persisted value is stale so this sample is exact
+                chosen = [sym for sym, rec in legs.items() if self._stale(sym, rec)]
+
+        rows = []
+        for sym in chosen:
+            rec = legs[sym]
+            self.written_sum += rec.seen_pnl - (rec.pnl if rec.ts is not None else 0.0)
+            rec.price = rec.seen_price
+            rec.pnl = rec.seen_pnl
+            rec.ts = ts_sec
+            # a leg without a price this tick re-emits its last observed row at this tick's ts
+            rows.append(rec.row if sym in pending else (ts,) + rec.row[1:])
+        for sym, (closing, _force) in pending.items():
+            if closing:
+                self.forget(sym)
+        pending.clear()
+        return rows
@@ -21,6 +21,13 @@ class ExitDecision:
     reason: Optional[str] = None
 
 
+def _contract_spec(item: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        "minTradeNum": float(item.get("minTradeNum", 0)),
+        "sizeMultiplier": float(item.get("sizeMultiplier", 1)),
+    }
+
+
 class StrategyEngine:
     def __init__(self, client: BitgetClient, settings: RuntimeSettings) -> None:
         self.client = client
@@ -50,12 +57,14 @@ class StrategyEngine:
         for item in resp.get("data", []):
             sym = item.get("symbol")
             if sym in symbols:
-                specs[sym] = {
-                    "minTradeNum": float(item.get("minTradeNum", 0)),
-                    "sizeMultiplier": float(item.get("sizeMultiplier", 1)),
-                }
+                specs[sym] = _contract_spec(item)
         return specs
 
+    def load_contract_specs(self) -> Dict[str, Dict[str, float]]:
+        # Size rules for every contract (entry warmup caches these ahead of time)
+        resp = self.client.get_contracts()
+        return {item["symbol"]: _contract_spec(item) for item in resp.get("data", []) if item.get("symbol")}
+
     def compute_size(self, symbol: str, last_price: float, specs: Dict[str, Dict[str, float]]) -> float:
         # notional = margin * leverage
         notional = self.settings.margin_per_leg_usdt * self.settings.leverage
@@ -77,7 +86,9 @@ class StrategyEngine:
             size = 0.0
         return float(size)
 
-    def build_leg_plan_from_tickers(self, tickers: Dict[str, Any]) -> List[LegPlan]:
+    def build_leg_plan_from_tickers(
+        self, tickers: Dict[str, Any], specs: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> List[LegPlan]:
         # 1) filter full universe by max pump
         universe = tickers.get("data", []) if isinstance(tickers, dict) else []
         universe = self.apply_max_pump_filter(universe)
@@ -85,7 +96,9 @@ class StrategyEngine:
         candidates = self.select_top_gainers_from_tickers({"data": universe}, self.settings.num_legs)
 
         symbols = [c.get("symbol") for c in candidates if c.get("symbol")]
-        specs = self.get_contract_specs(symbols)
+        # Prefetched specs are reused unless a selected symbol is missing from them
+        if specs is None or any(sym not in specs for sym in symbols):
+            specs = self.get_contract_specs(symbols)
 
         legs: List[LegPlan] = []
         for item in candidates:
@@ -0,0 +1,218 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from .config import getenv
+
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attrs", "start_ns", "end_ns", "status", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]) -> None:
+        self.trace_id = parent.trace_id if parent else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = "ok"
+        self._token: Optional[contextvars.Token] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = "error"
+            self.attrs["error"] = f"{type(error).__name__}: {error}"
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                # ended from another context; just drop back to the parent
+                _current.set(None)
+        _tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    def set(self, key: str, value: Any) -> None:
+        return
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        return
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileExporter:
+    """Appends finished spans as JSON lines; flushed once per root span (tick)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(json.dumps(span.to_dict(), default=str))
+            if span.parent_id is None:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(self._buffer) + "\n")
+                self._buffer.clear()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpExporter:
+    """Posts spans as OTLP/HTTP JSON, one request per root span (tick)."""
+
+    def __init__(self, endpoint: str, service_name: str) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self._buffer: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            if span.parent_id is not None:
+                return
+            spans, self._buffer = self._buffer, []
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "thescammershort"},
+                            "spans": [
+                                {
+                                    "traceId": s.trace_id,
+                                    "spanId": s.span_id,
+                                    "parentSpanId": s.parent_id or "",
+                                    "name": s.name,
+                                    "kind": 1,
+                                    "startTimeUnixNano": str(s.start_ns),
+                                    "endTimeUnixNano": str(s.end_ns),
+                                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attrs.items()],
+                                    "status": {"code": 2 if s.status == "error" else 1},
+                                }
+                                for s in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+        try:
+            httpx.post(self.endpoint, json=payload, timeout=2.0)
+        except httpx.HTTPError as exc:
+            # tracing must never break the trading loop
+            print(f"[tracing] otlp export failed: {exc}")
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.exporter = None
+
+    def configure(self, service_name: str) -> None:
+        kind = (getenv("TRACE_EXPORTER", "") or "").lower()
+        if kind == "file":
+            self.exporter = FileExporter(getenv("TRACE_FILE", f"traces-{service_name}.jsonl"))
+        elif kind == "otlp":
+            self.exporter = OtlpExporter(
+                getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"), service_name
+            )
+        else:
+            self.exporter = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+
+_tracer = Tracer()
+
+
+def configure_tracing(service_name: str) -> None:
+    _tracer.configure(service_name)
+
+
+def start_span(name: str, **attrs: Any):
+    # Caller must end() it on every path, errors included; span() does that
+    if _tracer.exporter is None:
+        return NOOP_SPAN
+    span_obj = Span(name, _current.get(), attrs)
+    span_obj._token = _current.set(span_obj)
+    return span_obj
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Any]:
+    if _tracer.exporter is None:
+        yield NOOP_SPAN
+        return
+    span_obj = start_span(name, **attrs)
+    try:
+        yield span_obj
+    except BaseException as exc:
+        span_obj.end(error=exc)
+        raise
+    span_obj.end()
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer.exporter is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,307 @@
+import argparse
+import base64
+import os
+import sys
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import psycopg
+from psycopg import sql
+
+from backend.common.config import settings
+
+
+# Seeded copy of the schema; dropped afterwards unless --keep
+SCHEMA = "explain_check"
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+AUTH_USER = "explain"
+AUTH_PASS = "check"
+SERVICES = ("worker", "paper", "live")
+# One row per service by design; reading all of it is the intended plan
+BOUNDED_TABLES = {"service_status"}
+
+
+class PlanRecorder:
+    """EXPLAINs every statement run through a psycopg cursor before it executes.
+
+    Sessions run with enable_seqscan=off, so a Seq Scan left in a plan means
+    the planner had no index it could use at all, not that a scan was cheaper
+    on a small seeded table. executemany/COPY (bulk seeding, CSV export) and
+    the bodies of plpgsql functions are not covered.
+    """
+
+    def __init__(self) -> None:
+        self.explained = 0
+        # (relation, statement) per Seq Scan node
+        self.seq_scans: List[Tuple[str, str]] = []
+
+    def record(self, statement: str, plan: Any) -> None:
+        self.explained += 1
+        for relation in _seq_scans(plan[0]["Plan"]):
+            if relation not in BOUNDED_TABLES:
+                self.seq_scans.append((relation, statement))
+
+    def install(self) -> Callable[[], None]:
+        """Patch Cursor/AsyncCursor.execute; returns a function that undoes it."""
+        sync_execute = psycopg.Cursor.execute
+        async_execute = psycopg.AsyncCursor.execute
+        recorder = self
+
+        def execute(cur, query, params=None, **kwargs):
+            text = _query_text(query, cur)
+            if text is not None:
+                sync_execute(cur, "explain (format json) " + text, params)
+                recorder.record(text, cur.fetchone()[0])
+            return sync_execute(cur, query, params, **kwargs)
+
+        async def aexecute(cur, query, params=None, **kwargs):
+            text = _query_text(query, cur)
+            if text is not None:
+                await async_execute(cur, "explain (format json) " + text, params)
+                recorder.record(text, (await cur.fetchone())[0])
+            return await async_execute(cur, query, params, **kwargs)
+
+        psycopg.Cursor.execute = execute
+        psycopg.AsyncCursor.execute = aexecute
+
+        def restore() -> None:
+            psycopg.Cursor.execute = sync_execute
+            psycopg.AsyncCursor.execute = async_execute
+
+        return restore
+
+
+def _query_text(query: Any, cur: Any) -> Optional[str]:
+    # Statement text to EXPLAIN, or None for anything that isn't a plannable DML statement
+    if isinstance(query, sql.Composable):
+        query = query.as_string(cur)
+    elif isinstance(query, bytes):
+        query = query.decode("utf-8")
+    text = query.strip()
+    first = text.split(None, 1)[0].lower() if text else ""
+    return text if first in EXPLAINABLE else None
+
+
+def _seq_scans(node: dict) -> List[str]:
+    found = [node.get("Relation Name", "?")] if node.get("Node Type") == "Seq Scan" else []
+    for child in node.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _reset_schema(create: bool = True) -> None:
+    with psycopg.connect(settings.database_url, autocommit=True) as conn:
+        conn.execute(sql.SQL("drop schema if exists {} cascade").format(sql.Identifier(SCHEMA)))
+        if create:
+            conn.execute(sql.SQL("create schema {}").format(sql.Identifier(SCHEMA)))
+
+
+def _seed(n_runs: int) -> None:
+    # History in bulk (executemany is not explained), then analyze so plans see real stats
+    from backend.benchmarks.synthetic import make_run_history
+    from backend.common.db import get_conn
+    from backend.common.time_utils import now_utc
+
+    history = make_run_history(n_runs=n_runs, legs_per_run=10, ticks_per_run=48)
+    now = now_utc()
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                insert into runs (run_id, exchange, mode, entry_time_utc, start_ts, end_ts, status, strategy_tag,
+                                  num_legs, margin_per_leg_usdt, leverage, max_pump_pct, global_kill_dd_pct,
+                                  initial_balance, current_balance)
+                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                history["runs"],
+            )
+            cur.executemany(
+                """
+                insert into legs (run_id, symbol, side, entry_price, entry_ts, qty, exit_price, exit_ts,
+                                  exit_reason, status)
+                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                history["legs"],
+            )
+            cur.executemany(
+                """
+                insert into snapshots (ts, run_id, exchange, symbol, price, unrealized_pnl_usdt,
+                                       entry_price, position_size, margin_usdt, leverage)
+                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                history["snapshots"],
+            )
+            cur.executemany(
+                "insert into heartbeats (ts, service, status, slot) values (%s, %s, 'ok', %s)",
+                [
+                    (now - timedelta(seconds=settings.heartbeat_log_sec * slot), service, slot)
+                    for service in SERVICES
+                    for slot in range(settings.heartbeat_log_slots)
+                ],
+            )
+            cur.executemany(
+                "insert into events (ts, level, type, message, run_id) values (%s, 'info', %s, 'seed', %s)",
+                [(row[4], kind, row[0]) for row in history["runs"] for kind in ("paper_run_completed", "snapshot")],
+            )
+            cur.execute("analyze")
+        conn.commit()
+
+
+def _exercise_db_ops() -> str:
+    """Call every db_ops query (and the heartbeat writer) once; returns the active paper run id."""
+    from backend.common import db_ops
+    from backend.common.db import get_conn
+    from backend.worker.telemetry_writer import write_heartbeat
+
+    run_id = str(uuid.uuid4())
+    db_ops.create_run(run_id, "bitget", "paper", "04:00", 2, 100.0, 3.0, 0.15, 0.3, "S1", 1000.0, 1000.0)
+    db_ops.get_latest_run()
+    db_ops.get_latest_run("paper")
+    db_ops.get_active_run()
+    db_ops.get_active_run("paper")
+    db_ops.insert_leg(run_id, "AAAUSDT", 1.0, 100.0)
+    db_ops.upsert_live_leg(run_id, "BBBUSDT", 2.0, 50.0)
+    db_ops.get_open_legs(run_id)
+    db_ops.get_legs(run_id)
+    db_ops.update_leg_max(run_id, "AAAUSDT", 5.0)
+    db_ops.update_leg_exit(run_id, "AAAUSDT", 0.9, "leg_tp", 0.1, 0.0)
+    db_ops.insert_order(run_id, "AAAUSDT", "sell", "open", 1.0, 1.0, 100.0, "filled", "open-x", "1")
+    db_ops.insert_snapshot(run_id, "bitget", "BBBUSDT", 2.0, 0.0, 2.0, 50.0, 100.0, 3.0)
+    db_ops.update_run_balance(run_id, current_balance=1001.0)
+    db_ops.get_run_balances(run_id)
+    db_ops.update_run_status(run_id, "paused")
+    db_ops.insert_event("info", "command_pause", "pause requested", None)
+    db_ops.get_latest_command()
+    db_ops.get_latest_command("2000-01-01T00:00:00+00:00")
+    db_ops.upsert_settings("paper", {"HOLD_HOURS": "24"})
+    db_ops.get_settings("paper")
+    db_ops.get_settings_version("paper")
+    db_ops.get_versioned_settings("paper")
+    db_ops.save_checkpoint("paper", run_id, 1, {"legs": {}})
+    db_ops.get_checkpoint("paper")
+    db_ops.delete_checkpoint("paper")
+    token = db_ops.acquire_lease("trader:paper", "explain-check", 30.0)
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            db_ops.lease_valid("trader:paper", "explain-check", token or 0, cur)
+            db_ops.notify_change("paper", cur)
+        conn.commit()
+    db_ops.release_lease("trader:paper", "explain-check")
+    live_id = str(uuid.uuid4())
+    db_ops.create_run(live_id, "bitget", "live", "04:00", 2, 100.0, 3.0, 0.15, 0.3, "S1")
+    db_ops.end_run(live_id)
+    db_ops.refresh_report_series()
+    for service in SERVICES:
+        write_heartbeat(service, 12.5)
+    db_ops.update_run_status(run_id, "running")
+    return run_id
+
+
+def _exercise_api(run_id: str) -> None:
+    from fastapi.testclient import TestClient
+
+    from backend.api.main import app
+
+    auth = {"Authorization": "Basic " + base64.b64encode(f"{AUTH_USER}:{AUTH_PASS}".encode()).decode()}
+    gets = [
+        "/runs/latest",
+        "/runs/latest?mode=paper",
+        "/positions/open",
+        f"/positions/open?run_id={run_id}",
+        f"/legs?run_id={run_id}",
+        f"/snapshots/latest?run_id={run_id}",
+        f"/snapshots/series?run_id={run_id}",
+        f"/snapshots/series?run_id={run_id}&symbol=BBBUSDT",
+        "/reports/runs",
+        "/reports/runs?mode=paper&strategy=s1&date_from=2025-01-01&date_to=2030-01-01",
+        f"/reports/run?run_id={run_id}",
+        "/reports/aggregate?mode=paper",
+        "/heartbeats/latest",
+        "/heartbeats/history?service=worker",
+        "/health/worker",
+        "/events/latest",
+        f"/events/latest?run_id={run_id}",
+        "/dashboard",
+        "/dashboard?mode=paper",
+        # A mode with no runs takes the events fallback
+        "/dashboard?mode=none&events=5",
+    ]
+    # First and second keyset page of every history listing, unfiltered and per filter
+    histories = [
+        "/history/events",
+        f"/history/events?run_id={run_id}&level=info",
+        "/history/events?type=paper_run_completed",
+        "/history/events?level=warn",
+        "/history/events?symbol=AAAUSDT",
+        f"/history/snapshots?run_id={run_id}",
+        f"/history/snapshots?run_id={run_id}&symbol=BBBUSDT",
+        "/history/orders",
+        f"/history/orders?run_id={run_id}&symbol=AAAUSDT",
+        "/history/runs",
+        "/history/runs?mode=paper&status=completed",
+    ]
+    with TestClient(app) as client:
+        for use_matview in (False, True):
+            settings.reports_use_matview = use_matview
+            for path in gets:
+                client.get(path).raise_for_status()
+        for path in histories:
+            sep = "&" if "?" in path else "?"
+            page = client.get(f"{path}{sep}limit=2").raise_for_status().json()
+            if page["next_cursor"]:
+                client.get(f"{path}{sep}limit=2&cursor={page['next_cursor']}").raise_for_status()
+        client.get("/settings?mode=paper", headers=auth).raise_for_status()
+        client.put("/settings?mode=paper", headers=auth, json={"settings": {"HOLD_HOURS": "12"}}).raise_for_status()
+        client.post("/commands/pause").raise_for_status()
+        client.post("/reports/refresh", headers=auth).raise_for_status()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN every db_ops/API query against a seeded copy of the schema; fails on seq scans"
+    )
+    parser.add_argument("--runs", type=int, default=40, help="completed runs to seed")
+    parser.add_argument("--keep", action="store_true", help=f"leave the {SCHEMA} schema in place afterwards")
+    args = parser.parse_args()
+    if not settings.database_url:
+        raise SystemExit("DATABASE_URL is not set")
+
+    # Every connection in this process (pools, LISTEN, migrations) lands in the scratch schema
+    os.environ["PGOPTIONS"] = f"-c search_path={SCHEMA},public -c enable_seqscan=off"
+    os.environ["SETTINGS_USER"] = AUTH_USER
+    os.environ["SETTINGS_PASS"] = AUTH_PASS
+
+    from backend.common.db import close_pool, open_pool
+    from backend.db.migrate import migrate
+
+    _reset_schema()
+    recorder = PlanRecorder()
+    try:
+        with psycopg.connect(settings.database_url, autocommit=True) as conn:
+            migrate(conn)
+        open_pool()
+        _seed(args.runs)
+        restore = recorder.install()
+        try:
+            run_id = _exercise_db_ops()
+            _exercise_api(run_id)
+        finally:
+            restore()
+    finally:
+        close_pool()
+        if not args.keep:
+            _reset_schema(create=False)
+
+    print(f"[explain] {recorder.explained} statements explained, {len(recorder.seq_scans)} seq scans")
+    for relation, statement in recorder.seq_scans:
+        print(f"[explain] Seq Scan on {relation}: {' '.join(statement.split())[:200]}")
+    if recorder.seq_scans:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import hashlib
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import psycopg
+
+from backend.common.config import settings
+
+
+DB_DIR = Path(__file__).resolve().parent
+SCHEMA_PATH = DB_DIR / "schema.sql"
+MIGRATIONS_DIR = DB_DIR / "migrations"
+
+# schema.sql is version 0: the idempotent baseline, re-applied whenever it changes
+BASELINE_VERSION = 0
+# Session advisory lock so two deploys never migrate concurrently
+LOCK_KEY = 7_412_019_045
+# First-line marker for files that cannot run in a transaction (create index concurrently)
+NO_TRANSACTION = "-- migrate: no-transaction"
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+TRACKING_SQL = """
+    create table if not exists schema_migrations (
+      version int primary key,
+      name text not null,
+      checksum text not null,
+      applied_ts timestamptz not null default now()
+    )
+"""
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: Path) -> None:
+        self.version = version
+        self.name = name
+        self.sql = path.read_text(encoding="utf-8")
+        self.checksum = hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+        self.transactional = not self.sql.lstrip().startswith(NO_TRANSACTION)
+
+    @property
+    def label(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """schema.sql followed by migrations/NNNN_name.sql in version order."""
+    migrations = [Migration(BASELINE_VERSION, "schema", SCHEMA_PATH)]
+    seen = {BASELINE_VERSION}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILE_RE.match(path.name)
+        if not match:
+            raise ValueError(f"migration file {path.name} is not named NNNN_name.sql")
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f"duplicate migration version {version:04d}")
+        seen.add(version)
+        migrations.append(Migration(version, match.group(2), path))
+    return migrations
+
+
+def _statements(sql: str) -> List[str]:
+    # A multi-statement string runs as one implicit transaction, which concurrent index builds
+    # reject; no-transaction files are split on ";" at line ends, so keep them to plain DDL
+    statements = []
+    for chunk in re.split(r";\s*$", sql, flags=re.MULTILINE):
+        body = "\n".join(line for line in chunk.splitlines() if not line.strip().startswith("--")).strip()
+        if body:
+            statements.append(body)
+    return statements
+
+
+def applied(conn: psycopg.Connection) -> Dict[int, str]:
+    conn.execute(TRACKING_SQL)
+    return {version: checksum for version, checksum in conn.execute("select version, checksum from schema_migrations")}
+
+
+def pending(conn: psycopg.Connection, migrations: List[Migration]) -> List[Migration]:
+    done = applied(conn)
+    todo = []
+    for m in migrations:
+        if m.version not in done:
+            todo.append(m)
+        elif done[m.version] != m.checksum:
+            if m.version != BASELINE_VERSION:
+                raise RuntimeError(f"migration {m.label} was edited after it was applied; add a new migration instead")
+            todo.append(m)
+    return todo
+
+
+def _record(conn: psycopg.Connection, m: Migration) -> None:
+    conn.execute(
+        """
+        insert into schema_migrations (version, name, checksum)
+        values (%s, %s, %s)
+        on conflict (version) do update set checksum = excluded.checksum, applied_ts = now()
+        """,
+        (m.version, m.name, m.checksum),
+    )
+
+
+def apply(conn: psycopg.Connection, m: Migration) -> None:
+    if m.transactional:
+        with conn.transaction():
+            conn.execute(m.sql)
+            _record(conn, m)
+        return
+    try:
+        for statement in _statements(m.sql):
+            conn.execute(statement)
+    except psycopg.Error:
+        # A failed concurrent build leaves an INVALID index that "if not exists" would skip on rerun
+        print(f"[migrate] {m.label} failed; drop any INVALID index it left (pg_index.indisvalid) before rerunning")
+        raise
+    _record(conn, m)
+
+
+def migrate(conn: psycopg.Connection, migrations: Optional[List[Migration]] = None, dry_run: bool = False) -> List[Migration]:
+    """Apply pending migrations on an autocommit connection; returns what was (or would be) applied."""
+    if not conn.autocommit:
+        raise ValueError("migrate() needs an autocommit connection")
+    migrations = migrations if migrations is not None else discover()
+    conn.execute("select pg_advisory_lock(%s)", (LOCK_KEY,))
+    try:
+        todo = pending(conn, migrations)
+        for m in todo:
+            print(f"[migrate] {'would apply' if dry_run else 'applying'} {m.label}")
+            if not dry_run:
+                apply(conn, m)
+        return todo
+    finally:
+        conn.execute("select pg_advisory_unlock(%s)", (LOCK_KEY,))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply backend/db/schema.sql and pending migrations")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    args = parser.parse_args()
+    if not settings.database_url:
+        raise SystemExit("DATABASE_URL is not set")
+    with psycopg.connect(settings.database_url, autocommit=True) as conn:
+        done = migrate(conn, dry_run=args.dry_run)
+    if not done:
+        print("[migrate] up to date")
+
+
+if __name__ == "__main__":
+    main()
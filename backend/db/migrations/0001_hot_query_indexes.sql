@@ -0,0 +1,27 @@
+-- migrate: no-transaction
+-- Covering/partial indexes for the per-tick and per-poll queries. Built concurrently so
+-- applying them does not block the traders' writes.
+
+-- get_latest_command: newest operator command (index-only)
+create index concurrently if not exists idx_events_commands_ts on events(ts desc) include (type, message)
+  where type in ('command_pause', 'command_resume', 'command_close_all');
+
+-- /events/latest without run_id
+create index concurrently if not exists idx_events_ts on events(ts desc);
+
+-- get_latest_run / /runs/latest with a mode
+create index concurrently if not exists idx_runs_mode_start on runs(mode, start_ts desc) include (run_id, status, end_ts);
+
+-- get_latest_run without a mode, and the API's latest run id
+create index concurrently if not exists idx_runs_start on runs(start_ts desc) include (run_id, status, end_ts);
+
+-- get_active_run without a mode (with a mode: idx_runs_active_mode)
+create index concurrently if not exists idx_runs_active_start on runs(start_ts desc) include (run_id, mode, status)
+  where status in ('running', 'paused') and end_ts is null;
+
+-- reports (status = 'completed', optional mode/strategy/date filters) and run_report_series
+create index concurrently if not exists idx_runs_completed_start on runs(start_ts desc)
+  include (mode, strategy_tag, end_ts, initial_balance) where status = 'completed';
+
+-- /heartbeats/latest
+create index concurrently if not exists idx_heartbeats_ts on heartbeats(ts desc);
@@ -0,0 +1,18 @@
+-- Latest heartbeat per service, upserted by each tick; health checks read it by primary key
+create table if not exists service_status (
+  service text primary key, -- worker, paper or live
+  last_seen_ts timestamptz not null, -- end of the service's last tick
+  status text not null check (status in ('ok', 'degraded')), -- health status
+  tick_ms double precision, -- duration of that tick
+  version text, -- APP_VERSION / deploy commit of the writer
+  host text, -- hostname:pid of the writer
+  message text -- optional details
+);
+
+-- heartbeats becomes a bounded history: a ring of HEARTBEAT_LOG_SLOTS rows per service,
+-- slot = (epoch / HEARTBEAT_LOG_SEC) mod slots, overwritten one lap later
+alter table heartbeats add column if not exists slot int;
+alter table heartbeats add column if not exists tick_ms double precision;
+-- Drop the per-tick log written before the ring
+delete from heartbeats where slot is null;
+create unique index if not exists idx_heartbeats_service_slot on heartbeats(service, slot);
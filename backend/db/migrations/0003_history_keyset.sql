@@ -0,0 +1,15 @@
+-- migrate: no-transaction
+-- Indexes for the keyset pages of /history/{table} where no (..., ts) index existed yet.
+-- Already covered: events and orders by run (idx_events_run_ts, idx_orders_run_ts), events
+-- overall (idx_events_ts), snapshots by run (idx_snapshots_run_ts), runs overall or by mode
+-- (idx_runs_start, idx_runs_mode_start).
+
+-- /history/events?type= and ?level= across runs
+create index concurrently if not exists idx_events_type_ts on events(type, ts);
+create index concurrently if not exists idx_events_level_ts on events(level, ts);
+
+-- /history/orders across runs
+create index concurrently if not exists idx_orders_ts on orders(ts);
+
+-- /history/snapshots?symbol= (and /snapshots/series?symbol=) within a run
+create index concurrently if not exists idx_snapshots_run_symbol_ts on snapshots(run_id, symbol, ts);
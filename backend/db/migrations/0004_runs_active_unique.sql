@@ -0,0 +1,22 @@
+-- migrate: no-transaction
+-- At most one running/paused run per mode; create_run inserts with "on conflict do nothing"
+-- against this index. Databases from before the trader lease can hold several active runs
+-- for a mode, which would fail the build, so all but the newest of each mode are stopped first.
+
+update runs
+set status = 'stopped',
+    end_ts = now(),
+    notes = concat_ws('; ', notes, 'stopped by migration 0004: newer active run in the same mode')
+where end_ts is null
+  and status in ('running', 'paused')
+  and exists (
+    select 1
+    from runs newer
+    where newer.mode = runs.mode
+      and newer.end_ts is null
+      and newer.status in ('running', 'paused')
+      and (newer.start_ts, newer.run_id) > (runs.start_ts, runs.run_id)
+  );
+
+create unique index concurrently if not exists idx_runs_active_mode on runs(mode)
+  where end_ts is null and status in ('running', 'paused');
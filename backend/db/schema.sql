@@ -38,6 +38,8 @@ create table if not exists legs (
   exit_reason text check (exit_reason in ('24h', 'leg_tp', 'portfolio_tp', 'portfolio_sl', 'manual', 'kill_switch')), -- why we exited
   max_favorable_pnl_usdt numeric(18,8) default 0, -- best unrealized PnL
   max_adverse_pnl_usdt numeric(18,8) default 0, -- worst unrealized PnL
+  fees_usdt numeric(18,8) default 0, -- taker fees paid on entry + exit fills
+  funding_usdt numeric(18,8) default 0, -- funding received (+) or paid (-) while open
   status text not null check (status in ('open', 'closed')), -- position state
   unique (run_id, symbol)
 );
@@ -55,7 +57,8 @@ create table if not exists orders (
   qty numeric(18,8), -- order quantity
   status text not null check (status in ('submitted', 'filled', 'rejected', 'canceled')), -- order state
   exchange_order_id text, -- exchange order id
-  ts timestamptz not null -- order timestamp
+  ts timestamptz not null, -- order timestamp
+  client_oid text -- idempotency key sent as Bitget clientOid (live only)
 );
 
 -- 30s snapshots (price + PnL)
@@ -71,7 +74,9 @@ create table if not exists snapshots (
   entry_price numeric(18,8), -- average entry price from exchange (live) or simulated (paper)
   position_size numeric(18,8), -- live position size (contracts/units)
   margin_usdt numeric(18,8), -- live margin used for this position
-  leverage numeric(10,4) -- live leverage for this position
+  leverage numeric(10,4), -- live leverage for this position
+  fees_usdt numeric(18,8), -- cumulative fees for the leg at this poll
+  funding_usdt numeric(18,8) -- cumulative funding for the leg at this poll
 );
 
 -- Heartbeats
@@ -105,8 +110,127 @@ create table if not exists settings (
   primary key (mode, key)
 );
 
+-- Settings version per mode, bumped by trigger on every settings write; consumers
+-- compare versions and only reload + re-validate settings when it moved
+create table if not exists settings_versions (
+  mode text primary key check (mode in ('paper', 'live')),
+  version bigint not null, -- increases on every insert/update/delete in settings for the mode
+  updated_ts timestamptz not null default now()
+);
+
+-- Leader leases: one holder per name ('worker', 'trader:paper', 'trader:live'), renewed while alive
+create table if not exists leases (
+  name text primary key,
+  holder text not null, -- host:pid:nonce of the current holder
+  token bigint not null, -- fencing token, +1 on every change of holder
+  acquired_ts timestamptz not null,
+  renewed_ts timestamptz not null,
+  expires_ts timestamptz not null -- a standby may take over once this has passed
+);
+
+-- Trader state saved in each tick's DB transaction; a restart resumes from it
+create table if not exists trader_checkpoints (
+  mode text primary key check (mode in ('paper', 'live')),
+  run_id uuid not null references runs(run_id) on delete cascade, -- run the state belongs to
+  seq bigint not null, -- increases with every save for the run (continues across restarts)
+  ts timestamptz not null default now(),
+  state jsonb not null -- portfolio legs (incl. trailing max), realized PnL, fees/funding, pending orders
+);
+
+-- Columns added after the initial schema (no-ops on fresh databases)
+alter table legs add column if not exists fees_usdt numeric(18,8) default 0;
+alter table legs add column if not exists funding_usdt numeric(18,8) default 0;
+alter table snapshots add column if not exists fees_usdt numeric(18,8);
+alter table snapshots add column if not exists funding_usdt numeric(18,8);
+alter table orders add column if not exists client_oid text;
+
 -- Indexes
 create index if not exists idx_snapshots_run_ts on snapshots(run_id, ts);
 create index if not exists idx_orders_run_ts on orders(run_id, ts);
+-- not unique: a tick that crashed after submitting logs the recovered order again
+create index if not exists idx_orders_client_oid on orders(client_oid) where client_oid is not null;
 create index if not exists idx_legs_run on legs(run_id);
 create index if not exists idx_events_run_ts on events(run_id, ts);
+-- At most one active run per mode: idx_runs_active_mode, built by migrations/0004_runs_active_unique.sql
+-- after stopping duplicates an older database may hold
+
+-- Summed unrealized PnL of each run at every snapshot ts, as a step function.
+-- Traders only write a leg when it changed enough (snapshot deadband), so each leg's
+-- last row is carried forward; a closed leg drops out after its last row.
+create or replace function run_pnl_series(p_run_ids uuid[])
+returns table (run_id uuid, ts timestamptz, pnl numeric)
+language sql stable as $$
+  with leg_rows as (
+    select s.run_id, s.ts, s.unrealized_pnl_usdt as pnl,
+           s.unrealized_pnl_usdt - coalesce(lag(s.unrealized_pnl_usdt) over w, 0) as delta,
+           lead(s.ts) over w is null and l.status = 'closed' as leaves
+    from snapshots s
+    left join legs l on l.run_id = s.run_id and l.symbol = s.symbol
+    where s.run_id = any(p_run_ids)
+    window w as (partition by s.run_id, s.symbol order by s.ts)
+  ),
+  per_ts as (
+    select r.run_id, r.ts, sum(r.delta) as delta, coalesce(sum(r.pnl) filter (where r.leaves), 0) as leaving
+    from leg_rows r
+    group by r.run_id, r.ts
+  )
+  -- running sum of per-leg changes, minus legs whose last row came before this ts
+  select p.run_id, p.ts,
+         sum(p.delta) over w - (sum(p.leaving) over w - p.leaving)
+  from per_ts p
+  window w as (partition by p.run_id order by p.ts rows between unbounded preceding and current row)
+$$;
+
+-- Report stats over the summed unrealized PnL series of each run.
+-- max_dd is peak-to-trough: the lowest point below the running peak (run start counts as 0).
+create or replace function run_series_stats(p_run_ids uuid[])
+returns table (run_id uuid, max_dd numeric, min_pnl numeric, peak_pnl numeric, peak_ts timestamptz, samples bigint)
+language sql stable as $$
+  with per_ts as (
+    select * from run_pnl_series(p_run_ids)
+  ),
+  running as (
+    select p.run_id, p.ts, p.pnl,
+           max(p.pnl) over (partition by p.run_id order by p.ts rows between unbounded preceding and current row) as running_peak,
+           row_number() over (partition by p.run_id order by p.pnl desc, p.ts asc) as peak_rank
+    from per_ts p
+  )
+  select r.run_id,
+         min(r.pnl - greatest(r.running_peak, 0)),
+         min(r.pnl),
+         max(r.pnl),
+         min(r.ts) filter (where r.peak_rank = 1),
+         count(*)
+  from running r
+  group by r.run_id
+$$;
+
+-- Precomputed series stats for completed runs (used when REPORTS_USE_MATVIEW=true)
+create materialized view if not exists run_report_series as
+  select * from run_series_stats(array(select run_id from runs where status = 'completed'));
+create unique index if not exists idx_run_report_series_run on run_report_series(run_id);
+
+-- Bump settings_versions and notify listeners (payload 'settings:<mode>') on any settings write
+create or replace function bump_settings_version()
+returns trigger
+language plpgsql as $$
+declare
+  m text;
+begin
+  if tg_op = 'DELETE' then
+    m := old.mode;
+  else
+    m := new.mode;
+  end if;
+  insert into settings_versions (mode, version, updated_ts)
+  values (m, 1, now())
+  on conflict (mode) do update set version = settings_versions.version + 1, updated_ts = now();
+  perform pg_notify('scammer_changes', 'settings:' || m);
+  return null;
+end
+$$;
+
+drop trigger if exists trg_settings_version on settings;
+create trigger trg_settings_version
+after insert or update or delete on settings
+for each row execute function bump_settings_version();
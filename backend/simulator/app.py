@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from backend.common.rate_limit import FAMILY_LIMITS, TokenBucket, endpoint_family
+from backend.simulator.exchange import ExchangeSim, MarketReplay, SimClock, SimConfig
+
+
+def create_app(sim: ExchangeSim, latency_jitter_ms: float = 0.0, seed: int = 0, rate_limit: float = 0.0) -> FastAPI:
+    """Serves the Bitget v2 mix paths BitgetClient uses; auth headers are accepted and ignored.
+
+    rate_limit > 0 enforces that multiple of Bitget's per-family limits and
+    answers excess requests with 429 + Retry-After, like the real API.
+    """
+    app = FastAPI(title="bitget-sim")
+    app.state.sim = sim
+    app.state.rate_limited = 0
+    rng = random.Random(seed)
+
+    if rate_limit > 0:
+        buckets = {
+            family: TokenBucket(rate * rate_limit) for family, rate in FAMILY_LIMITS.items() if family != "global"
+        }
+
+        @app.middleware("http")
+        async def enforce_limits(request: Request, call_next):
+            path = request.url.path
+            if not path.startswith("/api/v2/mix/"):
+                return await call_next(request)
+            wait = buckets[endpoint_family(path)].try_take()
+            if wait > 0:
+                app.state.rate_limited += 1
+                return JSONResponse(
+                    {"code": "429", "msg": "Too Many Requests", "requestTime": sim.clock.now_ms(), "data": None},
+                    status_code=429,
+                    headers={"Retry-After": f"{wait:.3f}"},
+                )
+            return await call_next(request)
+
+    async def _latency() -> None:
+        delay = sim.config.latency_ms
+        if latency_jitter_ms:
+            delay += rng.uniform(0, latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    @app.get("/api/v2/mix/market/tickers")
+    async def tickers(productType: str = "USDT-FUTURES"):
+        await _latency()
+        return sim.tickers()
+
+    @app.get("/api/v2/mix/market/contracts")
+    async def contracts(productType: str = "USDT-FUTURES", symbol: Optional[str] = None):
+        await _latency()
+        return sim.contract_list(symbol)
+
+    @app.get("/api/v2/mix/market/history-fund-rate")
+    async def funding_history(symbol: str, productType: str = "USDT-FUTURES", pageSize: int = 10):
+        await _latency()
+        return sim.funding_history(symbol, pageSize)
+
+    @app.get("/api/v2/mix/position/all-position")
+    async def all_position(productType: str = "USDT-FUTURES", symbol: Optional[str] = None):
+        await _latency()
+        return sim.positions(symbol)
+
+    @app.get("/api/v2/mix/account/accounts")
+    async def accounts(productType: str = "USDT-FUTURES"):
+        await _latency()
+        return sim.accounts()
+
+    @app.post("/api/v2/mix/order/place-order")
+    async def place_order(request: Request):
+        await _latency()
+        return sim.place_order(await request.json())
+
+    @app.get("/api/v2/mix/order/detail")
+    async def order_detail(
+        symbol: str, productType: str = "USDT-FUTURES", clientOid: Optional[str] = None, orderId: Optional[str] = None
+    ):
+        await _latency()
+        detail = sim.order_detail(symbol, clientOid, orderId)
+        if detail is None:
+            # Bitget answers unknown orders with HTTP 400 / 40109
+            return JSONResponse(
+                {"code": "40109", "msg": "The data of the order cannot be found", "requestTime": sim.clock.now_ms(), "data": None},
+                status_code=400,
+            )
+        return detail
+
+    @app.post("/api/v2/mix/account/set-leverage")
+    async def set_leverage(request: Request):
+        await _latency()
+        body = await request.json()
+        return sim.set_leverage(body.get("symbol", ""), float(body.get("leverage", sim.config.default_leverage)))
+
+    @app.get("/api/v2/public/time")
+    async def server_time():
+        now = sim.clock.now_ms()
+        return {"code": "00000", "msg": "success", "requestTime": now, "data": {"serverTime": str(now)}}
+
+    @app.get("/sim/state")
+    async def state():
+        return {**sim.state(), "rate_limited": app.state.rate_limited}
+
+    @app.post("/sim/reset")
+    async def reset():
+        sim.reset()
+        return sim.state()
+
+    return app
+
+
+def record(out_path: str, interval_sec: float, count: int) -> None:
+    # Appends live Bitget tickers responses as JSONL for later replay
+    from backend.common.bitget_client import BitgetClient
+
+    client = BitgetClient()
+    n = 0
+    while count <= 0 or n < count:
+        resp = client.get_usdt_perp_tickers()
+        with open(out_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(resp) + "\n")
+        n += 1
+        print(f"[sim] recorded frame {n} ({len(resp.get('data', []))} tickers)")
+        time.sleep(interval_sec)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Bitget exchange simulator (point BITGET_BASE_URL at it)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_serve = sub.add_parser("serve")
+    p_serve.add_argument("--data", default="sample_output.json", help="tickers JSON or JSONL recording")
+    p_serve.add_argument("--contracts", default="", help="optional recorded contracts response")
+    p_serve.add_argument("--speed", type=float, default=1.0, help="exchange clock speed vs wall time")
+    p_serve.add_argument("--start-ms", type=int, default=0, help="exchange clock start (default: first frame)")
+    p_serve.add_argument("--balance", type=float, default=1000.0)
+    p_serve.add_argument("--taker-fee", type=float, default=0.0006)
+    p_serve.add_argument("--spread-bps", type=float, default=2.0, help="used when frames lack bid/ask")
+    p_serve.add_argument("--latency-ms", type=float, default=0.0)
+    p_serve.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    p_serve.add_argument("--seed", type=int, default=0)
+    p_serve.add_argument("--rate-limit", type=float, default=0.0, help="enforce this multiple of Bitget's limits (0 = off)")
+    p_serve.add_argument("--port", type=int, default=8010)
+    p_rec = sub.add_parser("record")
+    p_rec.add_argument("--out", default="market-recording.jsonl")
+    p_rec.add_argument("--interval", type=float, default=30.0)
+    p_rec.add_argument("--count", type=int, default=0, help="0 = until interrupted")
+    args = parser.parse_args()
+
+    if args.cmd == "record":
+        record(args.out, args.interval, args.count)
+        return
+
+    import uvicorn
+
+    market = MarketReplay.load(args.data)
+    contracts = None
+    if args.contracts:
+        with open(args.contracts, "r", encoding="utf-8") as f:
+            contracts = json.load(f)
+    clock = SimClock(args.start_ms or market.start_ms, speed=args.speed)
+    config = SimConfig(
+        initial_balance=args.balance,
+        taker_fee_rate=args.taker_fee,
+        default_spread_bps=args.spread_bps,
+        latency_ms=args.latency_ms,
+    )
+    sim = ExchangeSim(market, clock, config, contracts)
+    print(f"[sim] {len(market.frames)} frames, speed={args.speed}x, listening on :{args.port}")
+    uvicorn.run(create_app(sim, args.latency_jitter_ms, args.seed, args.rate_limit), host="0.0.0.0", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
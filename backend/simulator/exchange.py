@@ -0,0 +1,380 @@
+import json
+import math
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+FUNDING_INTERVAL_MS = 8 * 3600 * 1000
+
+
+class SimClock:
+    """Exchange time that runs `speed` times faster than wall time from `start_ms`."""
+
+    def __init__(self, start_ms: int, speed: float = 1.0) -> None:
+        self.start_ms = start_ms
+        self.speed = speed
+        self._t0 = time.monotonic()
+
+    def now_ms(self) -> int:
+        return self.start_ms + int((time.monotonic() - self._t0) * 1000 * self.speed)
+
+
+class MarketReplay:
+    """Recorded ticker frames (Bitget tickers responses), looked up by exchange time.
+
+    Accepts a JSONL file with one tickers response per line (see `record` in app.py)
+    or a single JSON response such as sample_output.json.
+    """
+
+    def __init__(self, frames: List[Dict[str, Any]]) -> None:
+        if not frames:
+            raise ValueError("market data has no frames")
+        frames = sorted(frames, key=lambda f: int(f.get("requestTime", 0)))
+        self.frames = frames
+        self.times = [int(f.get("requestTime", 0)) for f in frames]
+        self._by_symbol: List[Dict[str, Dict[str, Any]]] = [
+            {t["symbol"]: t for t in f.get("data", []) if t.get("symbol")} for f in frames
+        ]
+
+    @classmethod
+    def load(cls, path: str) -> "MarketReplay":
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        if text.startswith("{") and "\n{" not in text:
+            return cls([json.loads(text)])
+        return cls([json.loads(line) for line in text.splitlines() if line.strip()])
+
+    @property
+    def start_ms(self) -> int:
+        return self.times[0]
+
+    def index_at(self, now_ms: int) -> int:
+        # Last frame at or before now; holds the final frame once the recording ends
+        return max(0, bisect_right(self.times, now_ms) - 1)
+
+    def frame_at(self, now_ms: int) -> Dict[str, Any]:
+        return self.frames[self.index_at(now_ms)]
+
+    def ticker(self, symbol: str, now_ms: int) -> Optional[Dict[str, Any]]:
+        return self._by_symbol[self.index_at(now_ms)].get(symbol)
+
+
+def _mark(ticker: Dict[str, Any]) -> float:
+    return float(ticker.get("markPrice") or ticker.get("lastPr") or 0)
+
+
+def _default_step(price: float) -> float:
+    # ~$1 per contract step when no recorded contract specs are supplied
+    if price <= 0:
+        return 1.0
+    return min(1000.0, max(0.0001, 10 ** math.floor(math.log10(1.0 / price))))
+
+
+@dataclass
+class SimConfig:
+    initial_balance: float = 1000.0
+    taker_fee_rate: float = 0.0006
+    default_spread_bps: float = 2.0
+    # extra spreads paid per multiple of top-of-book size beyond the first, capped
+    depth_spreads_cap: float = 10.0
+    latency_ms: float = 0.0
+    default_leverage: float = 3.0
+
+
+@dataclass
+class SimPosition:
+    symbol: str
+    hold_side: str
+    total: float
+    open_price_avg: float
+    leverage: float
+    funding_usdt: float = 0.0
+    fees_usdt: float = 0.0
+
+
+@dataclass
+class SimAccount:
+    balance: float
+    positions: Dict[tuple, SimPosition] = field(default_factory=dict)
+    leverage: Dict[str, float] = field(default_factory=dict)
+    fills: int = 0
+    fees_paid: float = 0.0
+    funding_paid: float = 0.0
+    # clientOid -> order detail, for duplicate rejection and /order/detail
+    orders: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+class ExchangeSim:
+    """Deterministic Bitget USDT-M futures account over replayed market data.
+
+    Market orders fill at the touch (bid for sells, ask for buys) plus one spread for
+    every multiple of the top-of-book size, pay the taker fee on notional, and open
+    positions are charged/credited funding at each 8h boundary of exchange time
+    using the frame's fundingRate (longs pay positive rates, shorts receive).
+    """
+
+    def __init__(self, market: MarketReplay, clock: SimClock, config: Optional[SimConfig] = None,
+                 contracts: Optional[Dict[str, Any]] = None) -> None:
+        self.market = market
+        self.clock = clock
+        self.config = config or SimConfig()
+        self.contracts = contracts
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.account = SimAccount(balance=self.config.initial_balance)
+            self._funded_until = self.clock.now_ms() // FUNDING_INTERVAL_MS
+
+    # --- time ---
+
+    def _settle_funding(self, now_ms: int) -> None:
+        period = now_ms // FUNDING_INTERVAL_MS
+        while self._funded_until < period:
+            self._funded_until += 1
+            boundary = self._funded_until * FUNDING_INTERVAL_MS
+            for pos in self.account.positions.values():
+                ticker = self.market.ticker(pos.symbol, boundary)
+                if not ticker:
+                    continue
+                rate = float(ticker.get("fundingRate") or 0)
+                notional = pos.total * _mark(ticker)
+                payment = notional * rate * (1 if pos.hold_side == "long" else -1)
+                pos.funding_usdt -= payment
+                self.account.balance -= payment
+                self.account.funding_paid += payment
+
+    # --- market data ---
+
+    def tickers(self) -> Dict[str, Any]:
+        now = self.clock.now_ms()
+        frame = self.market.frame_at(now)
+        return {"code": "00000", "msg": "success", "requestTime": now, "data": frame.get("data", [])}
+
+    def contract_list(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        if self.contracts is not None:
+            data = self.contracts.get("data", [])
+        else:
+            data = []
+            for t in self.market.frame_at(self.clock.now_ms()).get("data", []):
+                step = _default_step(_mark(t))
+                data.append({"symbol": t["symbol"], "minTradeNum": f"{step:g}", "sizeMultiplier": f"{step:g}"})
+        if symbol:
+            data = [c for c in data if c.get("symbol") == symbol]
+        return {"code": "00000", "msg": "success", "requestTime": self.clock.now_ms(), "data": data}
+
+    def funding_history(self, symbol: str, page_size: int = 10) -> Dict[str, Any]:
+        # Rates "settled" at the most recent 8h boundaries, newest first
+        now = self.clock.now_ms()
+        last = now // FUNDING_INTERVAL_MS * FUNDING_INTERVAL_MS
+        data = []
+        for i in range(page_size):
+            boundary = last - i * FUNDING_INTERVAL_MS
+            ticker = self.market.ticker(symbol, boundary)
+            if ticker is None:
+                break
+            data.append(
+                {"symbol": symbol, "fundingRate": ticker.get("fundingRate") or "0", "fundingTime": str(boundary)}
+            )
+        return {"code": "00000", "msg": "success", "requestTime": now, "data": data}
+
+    # --- account ---
+
+    def _unrealized(self, pos: SimPosition, mark: float) -> float:
+        sign = 1 if pos.hold_side == "long" else -1
+        return (mark - pos.open_price_avg) * pos.total * sign
+
+    def positions(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            now = self.clock.now_ms()
+            self._settle_funding(now)
+            data = []
+            for pos in self.account.positions.values():
+                if symbol and pos.symbol != symbol:
+                    continue
+                ticker = self.market.ticker(pos.symbol, now) or {}
+                mark = _mark(ticker) or pos.open_price_avg
+                data.append(
+                    {
+                        "symbol": pos.symbol,
+                        "marginCoin": "USDT",
+                        "holdSide": pos.hold_side,
+                        "openPriceAvg": f"{pos.open_price_avg:.10g}",
+                        "total": f"{pos.total:.10g}",
+                        "available": f"{pos.total:.10g}",
+                        "leverage": f"{pos.leverage:g}",
+                        "marginSize": f"{pos.total * pos.open_price_avg / pos.leverage:.8f}",
+                        "markPrice": f"{mark:.10g}",
+                        "unrealizedPL": f"{self._unrealized(pos, mark):.8f}",
+                        "marginMode": "crossed",
+                        "posMode": "hedge_mode",
+                    }
+                )
+        return {"code": "00000", "msg": "success", "requestTime": now, "data": data}
+
+    def accounts(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self.clock.now_ms()
+            self._settle_funding(now)
+            unrealized = 0.0
+            margin = 0.0
+            for pos in self.account.positions.values():
+                ticker = self.market.ticker(pos.symbol, now) or {}
+                unrealized += self._unrealized(pos, _mark(ticker) or pos.open_price_avg)
+                margin += pos.total * pos.open_price_avg / pos.leverage
+            equity = self.account.balance + unrealized
+        return {
+            "code": "00000",
+            "msg": "success",
+            "requestTime": now,
+            "data": [
+                {
+                    "marginCoin": "USDT",
+                    "available": f"{equity - margin:.8f}",
+                    "locked": "0",
+                    "accountEquity": f"{equity:.8f}",
+                    "usdtEquity": f"{equity:.8f}",
+                    "unrealizedPL": f"{unrealized:.8f}",
+                }
+            ],
+        }
+
+    def set_leverage(self, symbol: str, leverage: float) -> Dict[str, Any]:
+        with self._lock:
+            self.account.leverage[symbol] = leverage
+        return {
+            "code": "00000",
+            "msg": "success",
+            "requestTime": self.clock.now_ms(),
+            "data": {
+                "symbol": symbol,
+                "marginCoin": "USDT",
+                "longLeverage": f"{leverage:g}",
+                "shortLeverage": f"{leverage:g}",
+                "marginMode": "crossed",
+            },
+        }
+
+    def _fill_price(self, ticker: Dict[str, Any], side: str, size: float) -> float:
+        mark = _mark(ticker)
+        bid = float(ticker.get("bidPr") or 0) or mark * (1 - self.config.default_spread_bps / 20000)
+        ask = float(ticker.get("askPr") or 0) or mark * (1 + self.config.default_spread_bps / 20000)
+        spread = max(ask - bid, 0.0)
+        top = float((ticker.get("askSz") if side == "buy" else ticker.get("bidSz")) or 0)
+        extra = min(self.config.depth_spreads_cap, max(0.0, size / top - 1)) if top > 0 else 0.0
+        if side == "buy":
+            return ask + spread * extra
+        return bid - spread * extra
+
+    def place_order(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = body.get("symbol", "")
+        side = body.get("side", "")
+        try:
+            size = float(body.get("size", 0))
+        except (TypeError, ValueError):
+            size = 0.0
+        now = self.clock.now_ms()
+        ticker = self.market.ticker(symbol, now)
+        if ticker is None:
+            return {"code": "40034", "msg": f"Parameter {symbol} does not exist", "requestTime": now, "data": None}
+        if side not in ("buy", "sell") or size <= 0:
+            return {"code": "40017", "msg": "Parameter verification failed", "requestTime": now, "data": None}
+
+        client_oid = body.get("clientOid")
+        if client_oid and client_oid in self.account.orders:
+            return {"code": "40786", "msg": "Duplicate clientOid", "requestTime": now, "data": None}
+
+        trade_side = body.get("tradeSide")
+        # Hedge mode: open uses side as the direction; close repeats the position's
+        # side (sell closes a short), matching BitgetClient.close_position_market.
+        if trade_side == "close" or (trade_side is None and body.get("reduceOnly") == "YES"):
+            hold_side = "short" if side == "sell" else "long"
+            fill_side = "buy" if hold_side == "short" else "sell"
+            closing = True
+        else:
+            hold_side = "short" if side == "sell" else "long"
+            fill_side = side
+            closing = False
+
+        with self._lock:
+            self._settle_funding(now)
+            price = self._fill_price(ticker, fill_side, size)
+            fee = size * price * self.config.taker_fee_rate
+            key = (symbol, hold_side)
+            pos = self.account.positions.get(key)
+            if closing:
+                if pos is None:
+                    return {"code": "22002", "msg": "No position to close", "requestTime": now, "data": None}
+                qty = min(size, pos.total)
+                self.account.balance += self._unrealized(pos, price) * qty / pos.total
+                pos.total -= qty
+                if pos.total <= 1e-12:
+                    self.account.positions.pop(key, None)
+            else:
+                leverage = self.account.leverage.get(symbol, self.config.default_leverage)
+                if pos is None:
+                    pos = SimPosition(symbol, hold_side, size, price, leverage)
+                    self.account.positions[key] = pos
+                else:
+                    pos.open_price_avg = (pos.open_price_avg * pos.total + price * size) / (pos.total + size)
+                    pos.total += size
+            if pos is not None:
+                pos.fees_usdt += fee
+            self.account.balance -= fee
+            self.account.fees_paid += fee
+            self.account.fills += 1
+            order_id = f"{9_000_000_000 + self.account.fills}"
+            client_oid = client_oid or f"sim-{order_id}"
+            self.account.orders[client_oid] = {
+                "symbol": symbol,
+                "orderId": order_id,
+                "clientOid": client_oid,
+                "size": str(size),
+                "baseVolume": str(qty if closing else size),
+                "priceAvg": str(price),
+                "fee": str(-fee),
+                "side": side,
+                "tradeSide": trade_side or ("close" if closing else "open"),
+                "orderType": body.get("orderType", "market"),
+                "state": "filled",
+                "cTime": str(now),
+                "uTime": str(now),
+            }
+        return {
+            "code": "00000",
+            "msg": "success",
+            "requestTime": now,
+            "data": {"orderId": order_id, "clientOid": client_oid},
+            # not part of Bitget's response; handy when soak-testing fills
+            "sim": {"fillPrice": price, "fee": fee},
+        }
+
+    def order_detail(self, symbol: str, client_oid: Optional[str] = None, order_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if client_oid:
+                order = self.account.orders.get(client_oid)
+            else:
+                order = next((o for o in self.account.orders.values() if o["orderId"] == order_id), None)
+        if order is None or order["symbol"] != symbol:
+            return None
+        return {"code": "00000", "msg": "success", "requestTime": self.clock.now_ms(), "data": dict(order)}
+
+    def state(self) -> Dict[str, Any]:
+        now = self.clock.now_ms()
+        with self._lock:
+            self._settle_funding(now)
+            return {
+                "clock_ms": now,
+                "speed": self.clock.speed,
+                "frame_index": self.market.index_at(now),
+                "frames": len(self.market.frames),
+                "balance": self.account.balance,
+                "fees_paid": self.account.fees_paid,
+                "funding_paid": self.account.funding_paid,
+                "fills": self.account.fills,
+                "positions": len(self.account.positions),
+            }
@@ -0,0 +1,77 @@
+import pytest
+
+from backend.common import orders
+from backend.common.bitget_client import BitgetAPIError
+
+
+class _Exchange:
+    """place/get_order_detail stand-in keeping one order per clientOid, like Bitget."""
+
+    def __init__(self, existing=None):
+        self.orders = dict(existing or {})
+        self.placed = []
+
+    def place(self, client_oid, **order):
+        if client_oid in self.orders:
+            return {"code": "40786", "msg": "Duplicate clientOid", "data": None}
+        self.placed.append(client_oid)
+        self.orders[client_oid] = {"clientOid": client_oid, "orderId": str(len(self.orders)), "state": "filled"}
+        return {"code": orders.SUCCESS, "msg": "success", "data": {"orderId": self.orders[client_oid]["orderId"]}}
+
+    def get_order_detail(self, symbol, client_oid=None, priority=None):
+        if client_oid not in self.orders:
+            raise BitgetAPIError(400, "/api/v2/mix/order/detail", "not found", "40109")
+        return {"code": orders.SUCCESS, "data": self.orders[client_oid]}
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(orders.time, "sleep", lambda _sec: None)
+
+
+def _submit(exchange, oid):
+    return orders.submit_order(exchange, exchange.place, oid, closing=True, symbol="BTCUSDT", size="1")
+
+
+def test_generations_name_different_orders():
+    first = orders.client_oid("run", "BTCUSDT", "close")
+    assert first == orders.client_oid("run", "BTCUSDT", "close", 0)
+    assert orders.client_oid("run", "BTCUSDT", "close", 1) not in (first, orders.client_oid("run", "BTCUSDT", "close", 2))
+
+
+@pytest.mark.parametrize("state", ["live", "partially_filled", "filled"])
+def test_duplicate_of_a_working_order_is_recovered(state):
+    exchange = _Exchange({"oid": {"clientOid": "oid", "orderId": "7", "state": state}})
+    resp = _submit(exchange, "oid")
+    assert resp["code"] == orders.SUCCESS and resp["recovered"]
+    assert resp["data"]["orderId"] == "7" and exchange.placed == []
+
+
+@pytest.mark.parametrize("state", ["canceled", "cancelled", "rejected", None])
+def test_duplicate_of_a_dead_order_is_spent_not_success(state):
+    exchange = _Exchange({"oid": {"clientOid": "oid", "orderId": "7", "state": state}})
+    resp = _submit(exchange, "oid")
+    assert resp["code"] != orders.SUCCESS and resp["spent"]
+    assert orders.order_status(resp) == "rejected"
+
+
+def test_retry_after_timeout_recovers_the_order_that_landed():
+    exchange = _Exchange()
+    calls = []
+
+    def place(**order):
+        calls.append(order["client_oid"])
+        resp = exchange.place(**order)
+        if len(calls) == 1:
+            raise BitgetAPIError(504, "/api/v2/mix/order/place-order", "gateway timeout")
+        return resp
+
+    resp = orders.submit_order(exchange, place, "oid", closing=True, symbol="BTCUSDT", size="1")
+    assert resp["recovered"] and calls == ["oid"]
+
+
+def test_rejection_without_an_order_is_returned_as_is():
+    exchange = _Exchange()
+    exchange.place = lambda client_oid, **order: {"code": "22002", "msg": "No position to close", "data": None}
+    resp = _submit(exchange, "oid")
+    assert resp["code"] == "22002" and not resp.get("spent")
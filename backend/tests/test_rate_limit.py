@@ -0,0 +1,184 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from backend.common import bitget_client
+from backend.common.bitget_client import BitgetAPIError, BitgetClient
+from backend.common.rate_limit import (
+    FAMILY_LIMITS,
+    PRIORITY_CLOSE,
+    PRIORITY_OPEN,
+    PRIORITY_POLL,
+    RequestScheduler,
+    TokenBucket,
+    endpoint_family,
+)
+
+
+def _served_in_order(scheduler, requests):
+    """Queue requests (name, family, priority) behind exhausted buckets; names in the order they get through."""
+    served = []
+    threads = []
+    for name, family, priority in requests:
+        thread = threading.Thread(target=lambda n=name, f=family, p=priority: (scheduler.acquire(f, p), served.append(n)))
+        thread.start()
+        threads.append(thread)
+        # wait until it is queued, so arrival order is the list order
+        deadline = time.monotonic() + 2.0
+        while sum(len(heap) for heap in scheduler._waiters.values()) + len(served) < len(threads):
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(timeout=5.0)
+    return served
+
+
+def test_close_before_open_before_poll_within_a_family():
+    scheduler = RequestScheduler(limits={"order": 5.0, "global": 1000.0})
+    for _ in range(5):
+        scheduler.acquire("order", PRIORITY_OPEN)
+    served = _served_in_order(
+        scheduler,
+        [("poll", "order", PRIORITY_POLL), ("open", "order", PRIORITY_OPEN), ("close", "order", PRIORITY_CLOSE)],
+    )
+    assert served == ["close", "open", "poll"]
+
+
+def test_global_budget_goes_to_the_best_waiter_across_families():
+    scheduler = RequestScheduler(limits={"order": 100.0, "market": 100.0, "global": 5.0})
+    for _ in range(5):
+        scheduler.acquire("market", PRIORITY_POLL)
+    served = _served_in_order(
+        scheduler,
+        [("poll", "market", PRIORITY_POLL), ("close", "order", PRIORITY_CLOSE)],
+    )
+    assert served == ["close", "poll"]
+
+
+def _burst(scheduler, family, n):
+    start = time.monotonic()
+    threads = [threading.Thread(target=scheduler.acquire, args=(family,)) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10.0)
+    return time.monotonic() - start
+
+
+def test_family_budget_limits_only_its_family():
+    scheduler = RequestScheduler(limits={"order": 20.0, "market": 1000.0, "global": 1000.0})
+    # 20 go on the burst, the other 10 at 20/s
+    assert _burst(scheduler, "order", 30) >= 0.45
+    assert _burst(scheduler, "market", 30) < 0.2
+
+
+def test_global_budget_spans_families():
+    scheduler = RequestScheduler(limits={"order": 1000.0, "market": 1000.0, "global": 40.0})
+    start = time.monotonic()
+    threads = [threading.Thread(target=_burst, args=(scheduler, family, 30)) for family in ("order", "market")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10.0)
+    # 60 requests, 40 on the global burst, 20 at 40/s
+    assert time.monotonic() - start >= 0.45
+
+
+class _Exchange:
+    """MockTransport handler enforcing `scale` x Bitget's per-family limits like `simulator serve --rate-limit`.
+
+    Excess requests get 429 + Retry-After; paths in `throttled` additionally get
+    that many 429s (Retry-After `retry_after`) before being served.
+    """
+
+    def __init__(self, scale=0.0, throttled=None, retry_after="0.3"):
+        self.buckets = {
+            family: TokenBucket(rate * scale) for family, rate in FAMILY_LIMITS.items() if family != "global"
+        } if scale > 0 else {}
+        self.throttled = dict(throttled or {})
+        self.retry_after = retry_after
+        self.rate_limited = 0
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        path = request.url.path
+        with self._lock:
+            self.sent.append((path, time.monotonic()))
+            retry_after = None
+            if self.throttled.get(path, 0) > 0:
+                self.throttled[path] -= 1
+                retry_after = self.retry_after
+            elif self.buckets:
+                wait = self.buckets[endpoint_family(path)].try_take()
+                if wait > 0:
+                    retry_after = f"{wait:.3f}"
+            if retry_after is not None:
+                self.rate_limited += 1
+                return httpx.Response(429, headers={"Retry-After": retry_after}, json={"code": "429", "msg": "Too Many Requests"})
+        return httpx.Response(200, json={"code": "00000", "msg": "success", "data": []})
+
+
+def _client(exchange, scale):
+    client = BitgetClient(http=httpx.Client(transport=httpx.MockTransport(exchange)), scheduler=RequestScheduler(scale=scale))
+    client.base_url = "https://bitget.test"
+    return client
+
+
+def _positions_burst(client, n):
+    errors = []
+
+    def one():
+        try:
+            client.get_positions()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=one) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30.0)
+    return errors
+
+
+def test_scheduler_stays_under_the_enforced_limits():
+    exchange = _Exchange(scale=2.0)
+    # 0.8 of what the exchange enforces: position family 8/s against 10/s
+    assert _positions_burst(_client(exchange, 1.6), 20) == []
+    assert exchange.rate_limited == 0
+
+
+def test_unscheduled_burst_is_rate_limited(monkeypatch):
+    monkeypatch.setattr(bitget_client.settings, "bitget_max_retries_429", 0)
+    exchange = _Exchange(scale=2.0)
+    errors = _positions_burst(_client(exchange, 0), 20)
+    # burst of 10 served, the rest rejected
+    assert exchange.rate_limited == 10
+    assert len(errors) == 10 and all(isinstance(exc, BitgetAPIError) and exc.status_code == 429 for exc in errors)
+
+
+def test_429_blocks_the_family_for_retry_after():
+    exchange = _Exchange(throttled={"/api/v2/mix/position/all-position": 1})
+    client = _client(exchange, 1.0)
+    client.get_positions()
+    (_, first), (_, retried) = exchange.sent
+    assert retried - first >= 0.29
+    # The family stays closed for every caller until Retry-After passed; other families do not wait
+    client.scheduler.rate_limited("position", 0.3)
+    start = time.monotonic()
+    client.get_accounts()
+    assert time.monotonic() - start < 0.1
+    client.get_positions()
+    assert time.monotonic() - start >= 0.29
+
+
+def test_429_retries_are_bounded(monkeypatch):
+    monkeypatch.setattr(bitget_client.settings, "bitget_max_retries_429", 2)
+    exchange = _Exchange(throttled={"/api/v2/mix/position/all-position": 100}, retry_after="0")
+    with pytest.raises(BitgetAPIError) as exc_info:
+        _client(exchange, 1.0).get_positions()
+    assert exc_info.value.status_code == 429
+    assert len(exchange.sent) == 3
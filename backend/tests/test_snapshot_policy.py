@@ -0,0 +1,137 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.common.snapshot_policy import SnapshotPolicy, _leg_values
+
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+SYMBOLS = ("AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT", "EEEUSDT")
+
+
+def _path(seed, ticks=400):
+    """Random per-leg price walk; yields (ts, {sym: (price, pnl, closing)}) with legs closing along the way."""
+    rng = random.Random(seed)
+    entry = {sym: rng.uniform(0.5, 50.0) for sym in SYMBOLS}
+    price = dict(entry)
+    close_at = {sym: rng.randrange(ticks // 4, ticks * 2) for sym in SYMBOLS}
+    for i in range(ticks):
+        marks = {}
+        for sym in list(price):
+            price[sym] *= 1.0 + rng.gauss(0.0, 0.004)
+            # a leg sometimes misses a tick, like a symbol absent from the tickers payload
+            if rng.random() < 0.05 and i < close_at[sym]:
+                continue
+            closing = i >= close_at[sym]
+            marks[sym] = (price[sym], (entry[sym] - price[sym]) * 100.0 / entry[sym], closing)
+            if closing:
+                del price[sym]
+        yield T0 + timedelta(seconds=30 * i), marks
+
+
+def _tick(policy, ts, marks):
+    policy.begin()
+    for sym, (price, pnl, closing) in marks.items():
+        policy.offer(sym, price, pnl, (ts, sym, pnl), closing=closing)
+    return policy.select(ts)
+
+
+def _stats(series):
+    # Same definitions as run_series_stats: dd from max(running peak, 0)
+    peak = float("-inf")
+    max_dd = 0.0
+    for value in series:
+        peak = max(peak, value)
+        max_dd = min(max_dd, value - max(peak, 0.0))
+    return min(series), max(series), max_dd
+
+
+def _reconstruct(rows, closed):
+    """Python port of run_pnl_series: step function over persisted rows; closed legs leave after their last row."""
+    last_ts = {}
+    for ts, sym, _pnl in rows:
+        last_ts[sym] = ts
+    current = {}
+    series = []
+    for ts in sorted({row[0] for row in rows}):
+        for sym in [s for s in current if s in closed and last_ts[s] < ts]:
+            del current[sym]
+        for row_ts, sym, pnl in rows:
+            if row_ts == ts:
+                current[sym] = pnl
+        series.append(sum(current.values()))
+    return series
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_compressed_rows_keep_series_extremes(seed):
+    policy = SnapshotPolicy(min_move_bps=50.0, pnl_step_usdt=1.0, max_interval_sec=600.0)
+    rows = []
+    raw = []
+    offered = 0
+    closed = set()
+    open_pnl = {}
+    for ts, marks in _path(seed):
+        rows.extend(_tick(policy, ts, marks))
+        policy.commit()
+        offered += len(marks)
+        for sym, (_price, pnl, closing) in marks.items():
+            open_pnl[sym] = pnl
+        raw.append(sum(open_pnl.values()))
+        for sym, (_price, _pnl, closing) in marks.items():
+            if closing:
+                closed.add(sym)
+                del open_pnl[sym]
+
+    assert len(rows) < offered / 2
+    assert _stats(_reconstruct(rows, closed)) == pytest.approx(_stats(raw), abs=1e-6)
+    assert (policy.peak, policy.trough) == pytest.approx(_stats(raw)[1::-1], abs=1e-6)
+
+
+def test_disabled_policy_writes_every_offer():
+    policy = SnapshotPolicy()
+    for ts, marks in _path(3, ticks=50):
+        assert len(_tick(policy, ts, marks)) == len(marks)
+        policy.commit()
+
+
+def _state(policy):
+    legs = {sym: _leg_values(rec) for sym, rec in policy.legs.items()}
+    return legs, policy.written_sum, policy.seen_sum, policy.peak, policy.trough, policy.max_dd
+
+
+def test_uncommitted_tick_is_rolled_back_by_next_begin():
+    ticks = list(_path(5, ticks=120))
+    failed_ts, failed_marks = ticks[60]
+    steady = SnapshotPolicy(min_move_bps=50.0, pnl_step_usdt=1.0, max_interval_sec=600.0)
+    flaky = SnapshotPolicy(min_move_bps=50.0, pnl_step_usdt=1.0, max_interval_sec=600.0)
+    for ts, marks in ticks[:60]:
+        _tick(steady, ts, marks)
+        steady.commit()
+        _tick(flaky, ts, marks)
+        flaky.commit()
+    before = _state(flaky)
+
+    # Batch fails: the failed tick's rows never reach the DB and commit() is not called
+    bumped = {sym: (price * 1.5, pnl - 40.0, False) for sym, (price, pnl, _closing) in failed_marks.items()}
+    assert _tick(flaky, failed_ts, bumped)
+    flaky.begin()
+    assert _state(flaky) == before
+    flaky.commit()
+
+    for ts, marks in ticks[60:]:
+        assert _tick(flaky, ts, marks) == _tick(steady, ts, marks)
+        flaky.commit()
+        steady.commit()
+
+
+def test_leg_closed_during_uncommitted_tick_stays_forgotten():
+    policy = SnapshotPolicy(min_move_bps=50.0)
+    _tick(policy, T0, {"AAAUSDT": (1.0, 0.0, False), "BBBUSDT": (2.0, 0.0, False)})
+    policy.commit()
+
+    _tick(policy, T0 + timedelta(seconds=30), {"AAAUSDT": (1.1, -10.0, True), "BBBUSDT": (2.0, 0.0, False)})
+    policy.begin()
+    assert set(policy.legs) == {"BBBUSDT"}
+    assert policy.written_sum == pytest.approx(0.0)
@@ -3,8 +3,12 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
+import httpx
+
+from backend.common.bitget_client import BitgetClient
 from backend.common.paper_trader import PaperTrader
 
 
 if __name__ == "__main__":
-    PaperTrader().run_once()
+    # Keep-alive session, so connections opened by the entry warmup are reused at entry time
+    PaperTrader(BitgetClient(http=httpx.Client(timeout=10.0))).run_once()
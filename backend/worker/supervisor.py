@@ -0,0 +1,141 @@
+import asyncio
+import signal
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import httpx
+
+from backend.common.bitget_client import BitgetClient, TickerCache
+from backend.common.config import settings
+from backend.common.db import close_pool, open_pool
+from backend.common.db_ops import insert_event
+from backend.common.lease import Lease
+from backend.common.live_trader import LiveTrader
+from backend.common.metrics import ENGINE_RESTARTS, start_metrics_server
+from backend.common.paper_trader import PaperTrader
+from backend.common.tracing import configure_tracing
+from backend.worker.worker_service import WorkerService
+
+
+# Crash restarts back off exponentially up to this, and reset after a clean step
+RESTART_BACKOFF_MIN_SEC = 1.0
+RESTART_BACKOFF_MAX_SEC = 60.0
+
+
+class Supervisor:
+    """Runs the worker, paper and live engines as asyncio tasks in one process.
+
+    The engines keep their synchronous step(); each step runs in a worker
+    thread while the event loop handles sleeps and lease renewals, so the
+    engines share one keep-alive Bitget session, one tickers cache, one DB
+    pool and one metrics registry instead of three copies of the stack.
+
+    An exception in one engine only restarts that engine: its lease is
+    released and a fresh instance resumes the active run from its checkpoint
+    after a backoff, while the other engines keep ticking. Each engine still
+    holds its own lease, so a supervisor can run next to standalone services.
+    """
+
+    def __init__(self, engines: list[str]) -> None:
+        self.http = httpx.Client(timeout=10.0)
+        self.client = BitgetClient(http=self.http, ticker_cache=TickerCache(settings.ticker_cache_ttl_sec))
+        factories: Dict[str, Callable[[], Any]] = {
+            "worker": WorkerService,
+            "paper": lambda: PaperTrader(self.client),
+            "live": lambda: LiveTrader(self.client),
+        }
+        unknown = [name for name in engines if name not in factories]
+        if unknown:
+            raise ValueError(f"unknown engines: {', '.join(unknown)}")
+        self.factories = {name: factories[name] for name in engines}
+
+    @staticmethod
+    async def _call(fn: Callable[[], Any]) -> Any:
+        # Blocking engine code runs in a thread; on shutdown wait for it rather than abandon it mid-tick
+        future = asyncio.ensure_future(asyncio.to_thread(fn))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait({future})
+            raise
+
+    async def _sleep(self, lease: Lease, seconds: float) -> bool:
+        # Lease.sleep() for the event loop: renew every ttl/3, False once the lease is lost
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        step = max(lease.ttl_sec / 3, 1.0)
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return lease.held
+            await asyncio.sleep(min(step, remaining))
+            if deadline - loop.time() > 0 and not await self._call(lease.acquire):
+                return False
+
+    async def _run_engine(self, name: str, factory: Callable[[], Any]) -> None:
+        backoff = RESTART_BACKOFF_MIN_SEC
+        while True:
+            engine = factory()
+            try:
+                while True:
+                    interval = await self._call(engine.step)
+                    backoff = RESTART_BACKOFF_MIN_SEC
+                    if interval is None:
+                        await asyncio.sleep(settings.lease_retry_sec)
+                    elif not await self._sleep(engine.lease, interval):
+                        engine.stand_by()
+            except asyncio.CancelledError:
+                await asyncio.to_thread(engine.lease.release)
+                raise
+            except Exception as exc:
+                ENGINE_RESTARTS.inc(service=name)
+                print(f"[supervisor] {name} crashed: {exc!r}; restarting in {backoff:.0f}s")
+                await asyncio.to_thread(self._on_crash, name, engine, exc)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RESTART_BACKOFF_MAX_SEC)
+
+    def _on_crash(self, name: str, engine: Any, exc: Exception) -> None:
+        # Hand the lease back so the restarted engine (or a standby replica) resumes at once
+        engine.lease.release()
+        try:
+            insert_event("error", "engine_restart", f"{name}: {exc!r}", getattr(engine, "run_id", None))
+        except Exception:
+            pass
+
+    async def run(self) -> None:
+        tasks = [asyncio.create_task(self._run_engine(name, f), name=name) for name, f in self.factories.items()]
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
+        print(f"[supervisor] running {', '.join(self.factories)}")
+        try:
+            await stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # In-flight steps finish before each engine releases its lease
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    start_metrics_server(settings.supervisor_metrics_port)
+    configure_tracing("supervisor")
+    if settings.database_url:
+        open_pool()
+    supervisor = Supervisor(settings.supervisor_engines)
+    try:
+        asyncio.run(supervisor.run())
+    finally:
+        supervisor.http.close()
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from backend.common.db import get_conn
+from backend.worker.telemetry_writer import write_heartbeat
 
 
 def main() -> None:
@@ -43,13 +44,7 @@ def main() -> None:
                 (now, test_run_id, "bitget", "BTCUSDT", 50000.0, -12.34),
             )
 
-            cur.execute(
-                """
-                insert into heartbeats (ts, service, status, message)
-                values (%s, %s, %s, %s)
-                """,
-                (now, "worker", "ok", "test heartbeat"),
-            )
+            write_heartbeat("worker", message="test heartbeat", cur=cur)
         conn.commit()
 
     print("Inserted test run + snapshot + heartbeat")
@@ -1,23 +1,72 @@
 from datetime import datetime, timezone
+import os
+import socket
 import sys
 from pathlib import Path
+from typing import Optional
 
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
+import psycopg
+
+from backend.common.config import settings
 from backend.common.db import get_conn
 
 
-def write_heartbeat(service: str = "worker") -> None:
+HOST = f"{socket.gethostname()}:{os.getpid()}"
+
+# One statement: upsert the service's status row, and claim its heartbeats ring slot for
+# this HEARTBEAT_LOG_SEC bucket unless the slot already holds a row from this lap
+HEARTBEAT_SQL = """
+    with status_row as (
+        insert into service_status (service, last_seen_ts, status, tick_ms, version, host, message)
+        values (%(service)s, %(ts)s, %(status)s, %(tick_ms)s, %(version)s, %(host)s, %(message)s)
+        on conflict (service) do update set
+            last_seen_ts = excluded.last_seen_ts,
+            status = excluded.status,
+            tick_ms = excluded.tick_ms,
+            version = excluded.version,
+            host = excluded.host,
+            message = excluded.message
+    )
+    insert into heartbeats (ts, service, status, message, tick_ms, slot)
+    values (%(ts)s, %(service)s, %(status)s, %(message)s, %(tick_ms)s, %(slot)s)
+    on conflict (service, slot) do update set
+        ts = excluded.ts,
+        status = excluded.status,
+        message = excluded.message,
+        tick_ms = excluded.tick_ms
+    where heartbeats.ts < excluded.ts - make_interval(secs => %(log_sec)s)
+"""
+
+
+def write_heartbeat(
+    service: str = "worker",
+    tick_ms: Optional[float] = None,
+    status: str = "ok",
+    message: Optional[str] = None,
+    cur: Optional[psycopg.Cursor] = None,
+) -> None:
+    # When given a cursor the heartbeat commits with that transaction (the tick batch)
     now = datetime.now(timezone.utc)
+    log_sec = max(settings.heartbeat_log_sec, 1)
+    params = {
+        "service": service,
+        "ts": now,
+        "status": status,
+        "tick_ms": tick_ms,
+        "version": settings.app_version or None,
+        "host": HOST,
+        "message": message,
+        "slot": int(now.timestamp() // log_sec) % max(settings.heartbeat_log_slots, 1),
+        "log_sec": log_sec,
+    }
+    if cur is not None:
+        cur.execute(HEARTBEAT_SQL, params)
+        return
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into heartbeats (ts, service, status, message)
-                values (%s, %s, %s, %s)
-                """,
-                (now, service, "ok", "heartbeat"),
-            )
+            cur.execute(HEARTBEAT_SQL, params)
         conn.commit()
 
 
@@ -0,0 +1,125 @@
+import argparse
+import json
+import sys
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+
+def load_spans(path: str) -> list[dict]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(spans: list[dict], ticks: int, top: int) -> None:
+    by_trace: dict[str, list[dict]] = defaultdict(list)
+    for s in spans:
+        by_trace[s["trace_id"]].append(s)
+
+    roots = [s for s in spans if not s.get("parent_id")]
+    roots.sort(key=lambda s: s["duration_ms"], reverse=True)
+
+    print(f"{len(roots)} ticks, {len(spans)} spans")
+    for root in roots[:ticks]:
+        print(f"\n{root['name']} trace={root['trace_id'][:12]} total={root['duration_ms']:.1f}ms status={root['status']}")
+        children = [s for s in by_trace[root["trace_id"]] if s["span_id"] != root["span_id"]]
+        children.sort(key=lambda s: s["duration_ms"], reverse=True)
+        for s in children[:top]:
+            attrs = " ".join(f"{k}={v}" for k, v in s.get("attrs", {}).items())
+            share = (s["duration_ms"] / root["duration_ms"] * 100.0) if root["duration_ms"] else 0.0
+            print(f"  {s['duration_ms']:9.1f}ms {share:5.1f}%  {s['name']} {attrs}")
+
+    by_name: dict[str, list[float]] = defaultdict(list)
+    for s in spans:
+        by_name[s["name"]].append(s["duration_ms"])
+    print(f"\n{'span':36} {'n':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total ms':>11}")
+    for name, durations in sorted(by_name.items(), key=lambda kv: sum(kv[1]), reverse=True):
+        print(
+            f"{name:36} {len(durations):>6} {_percentile(durations, 50):>9.1f} "
+            f"{_percentile(durations, 99):>9.1f} {max(durations):>9.1f} {sum(durations):>11.1f}"
+        )
+
+
+def _otlp_attr(value: dict):
+    for key in ("stringValue", "doubleValue", "boolValue"):
+        if key in value:
+            return value[key]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def collect(port: int, out_path: str) -> None:
+    # Minimal OTLP/HTTP JSON collector stub: writes spans in the same JSONL format as TRACE_EXPORTER=file
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", "0"))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            lines = []
+            for rs in payload.get("resourceSpans", []):
+                for ss in rs.get("scopeSpans", []):
+                    for s in ss.get("spans", []):
+                        start = int(s["startTimeUnixNano"])
+                        end = int(s["endTimeUnixNano"])
+                        lines.append(
+                            json.dumps(
+                                {
+                                    "trace_id": s["traceId"],
+                                    "span_id": s["spanId"],
+                                    "parent_id": s.get("parentSpanId") or None,
+                                    "name": s["name"],
+                                    "start_ns": start,
+                                    "duration_ms": (end - start) / 1e6,
+                                    "status": "error" if s.get("status", {}).get("code") == 2 else "ok",
+                                    "attrs": {a["key"]: _otlp_attr(a["value"]) for a in s.get("attributes", [])},
+                                }
+                            )
+                        )
+            if lines:
+                with open(out_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format: str, *args) -> None:
+            return
+
+    print(f"[trace] collecting OTLP/JSON on :{port} -> {out_path}")
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize trader trace files (slowest spans per tick)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_sum = sub.add_parser("summary")
+    p_sum.add_argument("path")
+    p_sum.add_argument("--ticks", type=int, default=5, help="slowest ticks to break down")
+    p_sum.add_argument("--top", type=int, default=10, help="spans shown per tick")
+    p_col = sub.add_parser("collect")
+    p_col.add_argument("--port", type=int, default=4318)
+    p_col.add_argument("--out", default="traces-otlp.jsonl")
+    args = parser.parse_args()
+
+    if args.cmd == "summary":
+        summarize(load_spans(args.path), args.ticks, args.top)
+    else:
+        collect(args.port, args.out)
+
+
+if __name__ == "__main__":
+    main()
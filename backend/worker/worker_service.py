@@ -6,7 +6,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
-from backend.common.config import live_settings, paper_settings
+from backend.common.config import live_settings, paper_settings, settings
 from backend.common.db_ops import (
     create_run,
     get_active_run,
@@ -15,13 +15,19 @@ from backend.common.db_ops import (
     insert_event,
     update_run_status,
 )
+from backend.common.lease import Lease
 from backend.common.time_utils import now_utc, parse_entry_time_utc
 from backend.worker.telemetry_writer import write_heartbeat
 
 
+TICK_INTERVAL_SEC = 5
+
+
 class WorkerService:
     def __init__(self) -> None:
         self.last_command_ts = None
+        # Only the lease holder schedules runs and handles commands; other replicas stand by
+        self.lease = Lease("worker")
 
     def _should_run_today(self, trade_weekends: bool) -> bool:
         if trade_weekends:
@@ -66,8 +72,8 @@ class WorkerService:
 
     def tick(self) -> None:
         now = now_utc()
+        tick_start = time.perf_counter()
         print(f"[worker] tick {now.isoformat()}")
-        write_heartbeat("worker")
 
         active_by_mode: dict[str, str] = {}
         for mode in ("paper", "live"):
@@ -97,7 +103,7 @@ class WorkerService:
                 continue
 
             run_id = str(uuid.uuid4())
-            create_run(
+            created = create_run(
                 run_id=run_id,
                 exchange=runtime.exchange,
                 mode=runtime.mode,
@@ -109,13 +115,34 @@ class WorkerService:
                 global_kill_dd_pct=runtime.global_kill_dd_pct,
                 strategy_tag=runtime.strategy_tag,
             )
+            if not created:
+                print(f"[worker] skip {mode}: another active run was created first")
+                continue
             insert_event("info", "run_started", f"{mode} run created", run_id)
             print(f"[worker] {mode} run created {run_id}")
 
+        write_heartbeat("worker", (time.perf_counter() - tick_start) * 1000.0)
+
+    def step(self) -> float | None:
+        """One loop iteration; returns seconds until the next one, or None while on standby."""
+        if not self.lease.acquire():
+            print(f"[worker] standby ({self.lease.holder})")
+            return None
+        self.tick()
+        return TICK_INTERVAL_SEC
+
+    def stand_by(self) -> None:
+        # Nothing is cached between ticks; commands are re-read from the DB by whoever leads
+        return
+
     def run_forever(self) -> None:
-        while True:
-            self.tick()
-            time.sleep(5)
+        try:
+            while True:
+                interval = self.step()
+                time.sleep(settings.lease_retry_sec if interval is None else interval)
+        finally:
+            # Clean shutdown hands over immediately instead of after the TTL
+            self.lease.release()
 
 
 if __name__ == "__main__":
@@ -22,22 +22,15 @@ export function useApiData(mode: "paper" | "live", pollMs: number = 5000) {
 
     const fetchAll = async () => {
       try {
-        const r = await api.getLatestRun(mode)
-        const runId = r.run?.run_id
-        const [p, s, l, h, e] = await Promise.all([
-          api.getOpenPositions(runId),
-          api.getLatestSnapshots(200, runId),
-          api.getLegs(runId),
-          api.getLatestHeartbeats(20),
-          api.getLatestEvents(50, runId),
-        ])
+        // One request per poll; /dashboard reads every panel in a single query
+        const d = await api.getDashboard(mode)
         if (!mounted) return
-        setRun(r.run || null)
-        setPositions(p.positions || [])
-        setSnapshots(s.snapshots || [])
-        setLegs(l.legs || [])
-        setHeartbeats(h.heartbeats || [])
-        setEvents(e.events || [])
+        setRun(d.run || null)
+        setPositions(d.positions || [])
+        setSnapshots(d.snapshots || [])
+        setLegs(d.legs || [])
+        setHeartbeats(d.heartbeats || [])
+        setEvents(d.events || [])
       } catch (err) {
         // swallow errors to keep UI alive
         console.error(err)
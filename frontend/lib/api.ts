@@ -1,7 +1,8 @@
 export const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:8000"
 
-async function getJson<T>(path: string): Promise<T> {
-  const res = await fetch(`${API_BASE}${path}`, { cache: "no-store" })
+// "no-cache" keeps the response but revalidates it every time, so an unchanged ETag costs a 304
+async function getJson<T>(path: string, cache: RequestCache = "no-store"): Promise<T> {
+  const res = await fetch(`${API_BASE}${path}`, { cache })
   if (!res.ok) {
     throw new Error(`GET ${path} failed: ${res.status}`)
   }
@@ -20,7 +21,18 @@ async function postJson<T>(path: string, body?: Record<string, unknown>): Promis
   return res.json()
 }
 
+export type Dashboard = {
+  run: any | null
+  positions: any[]
+  snapshots: any[]
+  legs: any[]
+  heartbeats: any[]
+  events: any[]
+}
+
 export const api = {
+  getDashboard: (mode: "paper" | "live", snapshots = 200, events = 50) =>
+    getJson<Dashboard>(`/dashboard?mode=${mode}&snapshots=${snapshots}&events=${events}`, "no-cache"),
   getLatestRun: (mode: "paper" | "live") =>
     getJson<{ run: any }>(`/runs/latest?mode=${mode}`),
   getOpenPositions: (runId?: string) =>